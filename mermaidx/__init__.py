@@ -11,18 +11,51 @@ mermaidx — Mermaid diagram rendering, no browser, Node.js, or npm required.
     d.numpy()                                      # np.ndarray, no Pillow needed
     d.pdf()                                         # bytes -- fully supported
     d.save("out.svg") / d.save("out.png") / d.save("out.pdf")
+    d.stats                                        # per-phase timings + counters (mermaidx.stats)
 
     mermaidx.backends()          # ['quickjs']  (+ 'v8'/mmdr's backends if installed)
     mermaidx.render_many(sources, workers=4)   # real parallelism (multiprocessing)
+    mermaidx.rasterize_many(svgs, "png")       # ... for rasterizing, too
+    mermaidx.render_array(sources, 224, 224)   # (N, 224, 224, 4) uint8, letterboxed
+    mermaidx.configure_engine("v8", workers=4) # thread-safe pool of V8 child processes
     mermaidx.render_ascii(source)              # terminal-friendly text (always available)
+    mermaidx.render_markdown(["docs/"], "build/")  # every ```mermaid fence, each diagram once
 """
 
+from typing import TYPE_CHECKING
+
 from .__about__ import __version__
-from .diagram import Diagram, DiagramBase, DiagramRust, render
-from .backends import backends
-from .raster import svg_to_png, svg_to_raw
-from .pool import render_many
-from .ascii import render_ascii
+from .backends import backends  # eager: importing the submodule would otherwise shadow the function
+
+# Everything else is imported on first attribute access (PEP 562), so
+# `import mermaidx` -- and `mermaidx --version` -- doesn't pay for QuickJS,
+# resvg, termaid, ... until something actually needs them.
+_LAZY = {
+    "render": ".diagram",
+    "Diagram": ".diagram",
+    "DiagramBase": ".diagram",
+    "DiagramRust": ".diagram",
+    "configure_engine": ".diagram",
+    "engine_heap_stats": ".diagram",
+    "RecyclePolicy": ".engines.recycle",
+    "svg_to_png": ".raster",
+    "svg_to_raw": ".raster",
+    "render_many": ".pool",
+    "rasterize_many": ".pool",
+    "render_array": ".pool",
+    "render_ascii": ".ascii",
+    "render_markdown": ".markdown",
+}
+_LAZY_MODULES = ("stats", "synthetic", "bench", "batch", "watch", "tiles")
+
+if TYPE_CHECKING:
+    from . import batch, bench, stats, synthetic, tiles, watch
+    from .ascii import render_ascii
+    from .diagram import Diagram, DiagramBase, DiagramRust, configure_engine, engine_heap_stats, render
+    from .engines.recycle import RecyclePolicy
+    from .markdown import render_markdown
+    from .pool import rasterize_many, render_array, render_many
+    from .raster import svg_to_png, svg_to_raw
 
 __all__ = [
     "__version__",
@@ -30,9 +63,33 @@ __all__ = [
     "Diagram",
     "DiagramBase",
     "DiagramRust",
+    "configure_engine",
+    "engine_heap_stats",
+    "RecyclePolicy",
     "backends",
     "svg_to_png",
     "svg_to_raw",
     "render_many",
+    "rasterize_many",
+    "render_array",
     "render_ascii",
+    "render_markdown",
+    "stats",
 ]
+
+
+def __getattr__(name: str):
+    import importlib
+
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    elif name in _LAZY_MODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # cache: __getattr__ only runs for missing names
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY) | set(_LAZY_MODULES))
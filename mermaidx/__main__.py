@@ -14,23 +14,37 @@ Examples:
     mermaidx --info
     mermaidx --list-backends
     mermaidx -i diagram.mermaid --backend merman -o diagram.svg
+    mermaidx -i 'docs/**/*.mmd' -o 'out/{stem}.png' -j 4  # batch, see mermaidx/batch.py
+    mermaidx --jsonl < requests.jsonl              # JSON lines in/out, see mermaidx/protocol.py
+    mermaidx bench --baseline baseline.json        # see mermaidx/bench.py
+    mermaidx serve &                               # warm daemon, used automatically
+    mermaidx md docs/ -o build/docs                # see mermaidx/markdown.py
+    mermaidx watch diagrams/                       # see mermaidx/watch.py
 """
 
 import argparse
+import importlib
 import json
 import sys
 from pathlib import Path
 
 import mermaidx
-from mermaidx.diagram import Diagram
+from mermaidx.protocol import EXTENSION_FORMATS
+
+# `mermaidx <name> ...` hands the rest of argv to <module>.main(argv), which
+# returns the exit status. Modules are only imported when their command runs.
+_SUBCOMMANDS = {
+    "bench": "mermaidx.bench",
+    "serve": "mermaidx.daemon",
+    "md": "mermaidx.markdown",
+    "watch": "mermaidx.watch",
+}
 
 
 def _get_version() -> str:
-    try:
-        import importlib.metadata
-        return importlib.metadata.version("mermaidx")
-    except Exception:
-        return "unknown"
+    # __about__ is the version's single source (see pyproject.toml) -- no
+    # need to pay for importlib.metadata to read it back.
+    return mermaidx.__version__
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -51,6 +65,15 @@ examples:
   mermaidx --info
   mermaidx --list-backends
   mermaidx -i diagram.mermaid --backend merman -o diagram.svg
+  mermaidx -i a.mmd -i b.mmd -o out/                  # batch: out/a.svg, out/b.svg
+  mermaidx -i 'docs/**/*.mmd' -o 'out/{stem}.png' -j 4
+  mermaidx --jsonl -j 4 < requests.jsonl > results.jsonl
+
+subcommands (each has its own --help):
+  mermaidx bench                                      # benchmark + regression check
+  mermaidx serve                                      # warm render daemon (see --daemon)
+  mermaidx md docs/ -o build/docs                     # render the ```mermaid fences of Markdown docs
+  mermaidx watch diagrams/                            # re-render on every save, on a warm engine
         """,
     )
 
@@ -62,10 +85,17 @@ examples:
     parser.add_argument("--backend", default=None, metavar="NAME",
                         help="Rendering backend to use (default: quickjs). "
                              "See --list-backends for what's available.")
-    parser.add_argument("-i", "--input", metavar="FILE",
-                        help="Input Mermaid file, or '-' to read from stdin")
+    parser.add_argument("-i", "--input", action="append", metavar="FILE",
+                        help="Input Mermaid file, or '-' to read from stdin. Repeat it, or give a "
+                             "glob (quote it; '**' recurses), to convert many files in one go.")
     parser.add_argument("-o", "--output", default=None, metavar="FILE",
-                        help="Output file (.svg/.png/.pdf). Omit to write SVG to stdout.")
+                        help="Output file (.svg/.png/.pdf). Omit to write SVG to stdout. For many "
+                             "inputs: a directory (gets <stem>.svg files) or a name template using "
+                             "{stem}, {name} and {dir}, e.g. 'out/{stem}.png'.")
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N",
+                        help="Many inputs or --jsonl only: render on N worker processes (0 = one per CPU)")
+    parser.add_argument("--force", action="store_true",
+                        help="Many inputs only: re-render outputs that are already up to date")
     parser.add_argument("-w", "--width", type=float, default=None, metavar="N",
                         help="Output width in pixels (PNG/PDF-fit)")
     parser.add_argument("-H", "--height", type=float, default=None, metavar="N",
@@ -90,11 +120,25 @@ examples:
                         help="PDF margin e.g. '1cm' (default: 0)")
     parser.add_argument("-q", "--quiet", action="store_true",
                         help="Suppress informational messages (e.g. 'saved to ... bytes')")
-    parser.add_argument("--embed-font", action="store_true",
+    parser.add_argument("--embed-font", nargs="?", const=True, default=False, metavar="MODE",
+                        choices=["latin-1", "exact", "external"],
                         help="SVG output only: embed the DejaVu Sans glyphs actually used "
                              "as @font-face, so the SVG renders with correct label widths "
                              "in a browser too, not just via mermaidx's own .png()/.pdf(). "
+                             "MODE: latin-1 (default: a shared Latin-1 subset when it covers "
+                             "the text), exact (only the glyphs used) or, for many inputs, "
+                             "external (one font file next to the outputs, linked by every SVG). "
                              "Requires fontTools (pip install mermaidx[embed]).")
+    parser.add_argument("--daemon", choices=["auto", "on", "off"], default="auto",
+                        help="Render through a running `mermaidx serve` daemon: 'auto' (default) "
+                             "if one is running, else in-process; 'on' requires one; 'off' never")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Read render requests from stdin, one JSON object per line ({\"source\", "
+                             "\"format\", \"id\", ...}, see mermaidx/protocol.py), and write one JSON "
+                             "result per line to stdout as each finishes")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print per-function call counts and times of the JS DOM shim "
+                             "to stderr after rendering (backend='quickjs'/'v8' only)")
 
     return parser
 
@@ -108,7 +152,7 @@ def _read_source(input_arg: str) -> str:
 def _print_info() -> None:
     import xml.etree.ElementTree as ET
 
-    svg_str = Diagram("info").svg()
+    svg_str = mermaidx.render("info").svg()
     root = ET.fromstring(svg_str)
     texts = [
         el.text.strip()
@@ -125,9 +169,113 @@ def _print_backends() -> None:
         print(f"{name}{marker}")
 
 
-def main() -> None:
+def _request_options(args, fmt: str, render_kwargs: dict) -> dict:
+    """The protocol.py request fields (all but ``source``) for this
+    command line and output format."""
+    options = {"format": fmt, "backend": args.backend, **render_kwargs,
+               "width": args.width, "height": args.height, "scale": args.scale, "background": args.background}
+    options.pop("profile", None)
+    if fmt == "svg":
+        options["embed_font"] = args.embed_font
+    elif fmt == "pdf":
+        options.update(pdf_format=args.pdf_format, pdf_landscape=args.landscape, pdf_margin=args.margin)
+    return options
+
+
+def _render_via_daemon(args, source: str, render_kwargs: dict) -> bool:
+    """Render and write the output through the running daemon (see
+    mermaidx/daemon.py). False if there's none -- or the output format is
+    one only save() itself can report an error for -- so the caller
+    renders in-process instead."""
+    if args.output is None:
+        fmt = "svg"
+    else:
+        fmt = EXTENSION_FORMATS.get(Path(args.output).suffix.lower())
+        if fmt is None:
+            return False
+
+    from mermaidx import daemon, protocol
+
+    request = {"source": source, **_request_options(args, fmt, render_kwargs)}
+    response = daemon.request(request)
+    if response is None:
+        if args.daemon == "on":
+            address = daemon.default_address() or f"this platform's default (set ${daemon.ENV_VAR})"
+            sys.exit(f"error: no mermaidx daemon running on {address} "
+                     "(start one with `mermaidx serve`)")
+        return False
+    output = protocol.decode(response)  # raises RuntimeError on a failed render, like render() does
+
+    if args.output is None:
+        sys.stdout.buffer.write(output.encode("utf-8"))
+        return True
+    path = Path(args.output)
+    if isinstance(output, bytes):
+        path.write_bytes(output)
+    else:
+        path.write_text(output, encoding="utf-8")
+    if not args.quiet:
+        print(f"saved to {path}  ({path.stat().st_size:,} bytes)", file=sys.stderr)
+    return True
+
+
+def _is_batch(args) -> bool:
+    import glob
+
+    from mermaidx.batch import is_template
+
+    return (len(args.input) > 1 or any(glob.has_magic(p) for p in args.input)
+            or (args.output is not None and is_template(args.output)))
+
+
+def _run_batch(parser, args, render_kwargs: dict) -> int:
+    """Convert every input to its templated output, one line per file on
+    stderr as it finishes and a summary at the end; exit status 1 if any
+    file failed."""
+    import os
+    import time
+
+    from mermaidx import batch
+
+    if "-" in args.input:
+        parser.error("stdin ('-') can't be combined with other inputs")
+    if args.output is None or (not batch.is_template(args.output) and Path(args.output).suffix):
+        parser.error("many inputs need -o: a directory or a name template like 'out/{stem}.svg'")
+    if args.profile:
+        parser.error("--profile reports on a single render; give one input")
+
+    def report(result: batch.FileResult) -> None:
+        if result.status == "failed":
+            print(f"  FAILED    {result.input}: {result.error}", file=sys.stderr)
+        elif not args.quiet:
+            timing = f"  ({result.seconds:.2f}s)" if result.status == "rendered" else ""
+            print(f"  {result.status:<9} {result.input} -> {result.output}{timing}", file=sys.stderr)
+
+    # The extension picks each output's format; the options are the same
+    # for all, so build them for the template's format.
+    fmt = EXTENSION_FORMATS.get(Path(batch.output_path(args.output, Path("x"))).suffix.lower(), "svg")
+    start = time.perf_counter()
+    try:
+        results = batch.convert(args.input, args.output, jobs=args.jobs or os.cpu_count() or 1,
+                                force=args.force, on_result=report, **_request_options(args, fmt, render_kwargs))
+    except ValueError as exc:
+        parser.error(str(exc))
+    if not results:
+        parser.error(f"no input files match {' '.join(args.input)}")
+
+    counts = {status: sum(r.status == status for r in results) for status in ("rendered", "skipped", "failed")}
+    print(f"{len(results)} files: {counts['rendered']} rendered, {counts['skipped']} skipped, "
+          f"{counts['failed']} failed in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+def main(argv: list = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in _SUBCOMMANDS:
+        sys.exit(importlib.import_module(_SUBCOMMANDS[argv[0]]).main(argv[1:]))
+
     parser = _build_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if args.info:
         _print_info()
@@ -137,22 +285,43 @@ def main() -> None:
         _print_backends()
         return
 
+    if args.jsonl:
+        import os
+
+        from mermaidx import protocol
+
+        failed = protocol.serve_jsonl(sys.stdin, sys.stdout, jobs=args.jobs or os.cpu_count() or 1)
+        sys.exit(1 if failed else 0)
+
     if not args.input:
         parser.error("the following arguments are required: -i/--input")
 
-    source = _read_source(args.input)
     config = json.loads(Path(args.config).read_text(encoding="utf-8")) if args.config else None
     css = Path(args.css).read_text(encoding="utf-8") if args.css else None
 
     backend = args.backend or "quickjs"
     render_kwargs = {"theme": args.theme}
     if backend in ("quickjs", "v8"):
-        render_kwargs.update(config=config, css=css)
+        render_kwargs.update(config=config, css=css, profile=args.profile)
     elif config or css:
         print(f"warning: --config/--css are ignored for backend={backend!r} "
               "(only 'quickjs'/'v8' support them)", file=sys.stderr)
 
+    if _is_batch(args):
+        sys.exit(_run_batch(parser, args, render_kwargs))
+    if args.embed_font == "external":
+        parser.error("--embed-font external shares one font file between many outputs; give several inputs")
+    source = _read_source(args.input[0])
+
+    # --profile reports on an in-process render, so it skips the daemon.
+    if args.daemon != "off" and not args.profile and _render_via_daemon(args, source, render_kwargs):
+        return
+
     d = mermaidx.render(source, backend=args.backend, **render_kwargs)
+    if args.profile:
+        d.svg()
+        if d.stats.profile is not None:
+            print(mermaidx.stats.format_profile(d.stats.profile), file=sys.stderr)
 
     if args.output is None:
         sys.stdout.buffer.write(d.svg(embed_font=args.embed_font).encode("utf-8"))
@@ -1105,6 +1105,10 @@ class ResizeObserverStub { observe(){} unobserve(){} disconnect(){} }
 globalThis.ResizeObserver = ResizeObserverStub;
 class MutationObserverStub { observe(){} disconnect(){} takeRecords(){return [];} }
 globalThis.MutationObserver = MutationObserverStub;
+// Keep the engine's own high-resolution clock, if it has one (QuickJS-ng
+// does, mini-racer's V8 doesn't), for profile=True renders (render_glue).
+globalThis.__hrNow = (globalThis.performance && typeof performance.now === "function")
+  ? performance.now.bind(performance) : Date.now;
 globalThis.performance = { now: () => Date.now() };
 globalThis.matchMedia = () => ({ matches:false, addListener(){}, removeListener(){} });
 globalThis.SVGElement = Element;
@@ -1113,7 +1117,11 @@ globalThis.Node = Node;
 
 // console.log("dom shim loaded ok");
 
-globalThis.__resetDocument = function() {
+globalThis.__resetDocument = function(keepInjectedCss) {
   document_.body.childNodes = [];
-  document_.head.childNodes = [];
+  // keepInjectedCss: leave the engine's own <style id="mermaidx-css"> in
+  // place, for a render reusing the previous render's theme/config/css.
+  document_.head.childNodes = keepInjectedCss
+    ? document_.head.childNodes.filter((n) => n.getAttribute && n.getAttribute("id") === "mermaidx-css")
+    : [];
 };
\ No newline at end of file
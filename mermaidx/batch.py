@@ -0,0 +1,258 @@
+"""
+mermaidx.batch — convert many files in one go (``mermaidx -i 'docs/**/*.mmd' -o out/{stem}.png``).
+
+One process, one warm engine per worker, instead of one process launch
+(and one mermaid.js load) per file:
+
+    - inputs are paths or globs (``**`` recurses);
+    - the output is a name template -- ``{stem}`` (file name without
+      extension), ``{name}`` (with it) and ``{dir}`` (the input's
+      directory) are filled in per input, and the extension picks the
+      format -- or an existing directory / path ending in a separator,
+      which means ``<dir>/{stem}.svg``;
+    - ``jobs`` > 1 renders on a pool of worker processes that live for the
+      whole batch, each rendering and writing whole files;
+    - an output whose input, options and mermaidx version are unchanged
+      since it was last written (content hash, recorded in a
+      ``.mermaidx-manifest.json`` next to the outputs) and that nobody has
+      touched since (mtime) is skipped, unless ``force=True``;
+    - ``embed_font="external"`` gives every SVG output @font-face rules
+      pointing at one shared font file per weight, written once, next to
+      the outputs (their common directory), instead of a copy inlined in
+      each (see font_embed.link_dejavu_font()).
+
+Every render goes through protocol.handle(), so it takes exactly the
+options a single CLI render does.
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from mermaidx.protocol import EXTENSION_FORMATS
+
+MANIFEST_NAME = ".mermaidx-manifest.json"
+
+
+@dataclass
+class FileResult:
+    """What happened to one input: ``status`` is "rendered", "skipped" or
+    "failed" (then ``error`` says why); ``seconds`` is its render + write
+    time."""
+
+    input: Path
+    output: Path
+    status: str
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def expand_inputs(patterns: list) -> list:
+    """Every pattern as-is if it names a file, else its glob matches
+    (sorted, ``**`` recursive), in order and without duplicates."""
+    seen, paths = set(), []
+    for pattern in map(os.fspath, patterns):
+        matches = [pattern] if os.path.isfile(pattern) or not glob.has_magic(pattern) else \
+            sorted(glob.glob(pattern, recursive=True))
+        for match in matches:
+            path = Path(match)
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+
+def is_template(output: str) -> bool:
+    """Whether ``output`` names many files (a template or a directory)
+    rather than one."""
+    return "{" in output or output.endswith(("/", os.sep)) or os.path.isdir(output)
+
+
+def output_path(output: str, input_path: Path) -> Path:
+    """The output file for ``input_path`` under template/directory ``output``."""
+    if "{" not in output:
+        output = os.path.join(output, "{stem}.svg")
+    return Path(output.format(stem=input_path.stem, name=input_path.name, dir=str(input_path.parent)))
+
+
+def _output_format(path: Path) -> str:
+    fmt = EXTENSION_FORMATS.get(path.suffix.lower())
+    if fmt is None:
+        raise ValueError(
+            f"Cannot infer output format from {str(path)!r}; use one of these extensions: "
+            f"{sorted(EXTENSION_FORMATS)}"
+        )
+    return fmt
+
+
+def _fingerprint(request: dict) -> str:
+    from mermaidx import __version__
+
+    blob = json.dumps({"request": request, "version": __version__}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class _Manifests:
+    """The ``.mermaidx-manifest.json`` of every output directory touched:
+    output file name -> ``{"key": fingerprint, "mtime_ns": ...}``."""
+
+    def __init__(self) -> None:
+        self._by_dir: dict = {}
+        self._dirty: set = set()
+
+    def _load(self, directory: Path) -> dict:
+        if directory not in self._by_dir:
+            try:
+                self._by_dir[directory] = json.loads((directory / MANIFEST_NAME).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._by_dir[directory] = {}
+        return self._by_dir[directory]
+
+    def up_to_date(self, output: Path, key: str) -> bool:
+        entry = self._load(output.parent).get(output.name)
+        try:
+            mtime_ns = output.stat().st_mtime_ns
+        except OSError:
+            return False
+        return entry is not None and entry.get("key") == key and entry.get("mtime_ns") == mtime_ns
+
+    def record(self, output: Path, key: str) -> None:
+        self._load(output.parent)[output.name] = {"key": key, "mtime_ns": output.stat().st_mtime_ns}
+        self._dirty.add(output.parent)
+
+    def save(self) -> None:
+        for directory in self._dirty:
+            text = json.dumps(self._by_dir[directory], indent=1, sort_keys=True)
+            (directory / MANIFEST_NAME).write_text(text + "\n", encoding="utf-8")
+        self._dirty.clear()
+
+
+def _convert_one(task: tuple) -> tuple:
+    """Worker entry point: render one request and write it to ``output``.
+    Returns ``(index, error or None, seconds)``."""
+    from mermaidx.protocol import decode, handle
+
+    index, request, output, font_prefix = task
+    start = time.perf_counter()
+    try:
+        data = decode(handle(request))
+        if font_prefix is not None:
+            from mermaidx.font_embed import link_dejavu_font
+
+            data = link_dejavu_font(data, font_prefix)
+        path = Path(output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, bytes):
+            path.write_bytes(data)
+        else:
+            path.write_text(data, encoding="utf-8")
+    except Exception as exc:  # reported per file; the batch carries on
+        return index, str(exc) or type(exc).__name__, time.perf_counter() - start
+    return index, None, time.perf_counter() - start
+
+
+def convert(
+    inputs: list,
+    output: str,
+    *,
+    jobs: int = 1,
+    force: bool = False,
+    on_result: Optional[Callable[[FileResult], None]] = None,
+    **options,
+) -> list:
+    """
+    Convert every file matched by ``inputs`` (paths or globs) to the
+    files named by ``output`` (a template or directory, see the module
+    docstring). ``options`` are protocol.py request fields applied to every
+    file (backend, theme, config, css, width, scale, background, ...).
+
+    Returns one FileResult per input, in input order; ``on_result`` is
+    also called with each one as soon as it's known (completion order when
+    ``jobs`` > 1). Raises ValueError up front for an output extension it
+    can't render, or an output name two inputs would both write.
+
+    With ``embed_font="external"``, the shared font files are (re)written
+    after the renders, subset to the characters of every SVG output --
+    skipped ones included -- whenever any SVG was rendered or they're
+    missing.
+    """
+    paths = expand_inputs(inputs)
+    outputs = [output_path(output, p) for p in paths]
+    clashes = {o for o in outputs if outputs.count(o) > 1}
+    if clashes:
+        raise ValueError(f"Several inputs map to {sorted(map(str, clashes))[0]!r}; "
+                         "add {dir} or {name} to the output template.")
+
+    font_dir = None
+    if options.get("embed_font") == "external":
+        from mermaidx.font_embed import _check_subset
+
+        _check_subset("latin-1")  # the font files need fontTools: fail before rendering anything
+        options = {k: v for k, v in options.items() if k != "embed_font"}
+        svg_dirs = [str(o.resolve().parent) for o in outputs if _output_format(o) == "svg"]
+        font_dir = Path(os.path.commonpath(svg_dirs)) if svg_dirs else None
+
+    manifests = _Manifests()
+    results: list = [None] * len(paths)
+    tasks, keys = [], {}
+    for i, (src, dst) in enumerate(zip(paths, outputs)):
+        request = {**options, "source": src.read_text(encoding="utf-8"), "format": _output_format(dst)}
+        font_prefix = None
+        if font_dir is not None and request["format"] == "svg":
+            relative = os.path.relpath(font_dir, dst.resolve().parent)
+            font_prefix = "" if relative == "." else Path(relative).as_posix() + "/"
+            key = _fingerprint({**request, "embed_font": "external", "font_prefix": font_prefix})
+        else:
+            key = _fingerprint(request)
+        if not force and manifests.up_to_date(dst, key):
+            results[i] = FileResult(src, dst, "skipped")
+            if on_result:
+                on_result(results[i])
+            continue
+        keys[i] = key
+        tasks.append((i, request, str(dst), font_prefix))
+
+    def finish(index: int, error: Optional[str], seconds: float) -> None:
+        src, dst = paths[index], outputs[index]
+        if error is None:
+            manifests.record(dst, keys[index])
+            results[index] = FileResult(src, dst, "rendered", seconds)
+        else:
+            results[index] = FileResult(src, dst, "failed", seconds, error)
+        if on_result:
+            on_result(results[index])
+
+    try:
+        workers = min(max(1, jobs), len(tasks))
+        if workers <= 1:
+            for task in tasks:
+                finish(*_convert_one(task))
+        else:
+            import multiprocessing as mp
+
+            # Same reasoning as pool.py: 'spawn' workers start clean, no
+            # inherited native (QuickJS/resvg) state.
+            with mp.get_context("spawn").Pool(workers) as pool:
+                for outcome in pool.imap_unordered(_convert_one, tasks):
+                    finish(*outcome)
+    finally:
+        manifests.save()  # whatever did get written stays skippable next time
+    if font_dir is not None:
+        _write_shared_fonts(font_dir, [r for r in results if _output_format(r.output) == "svg"])
+    return results
+
+
+def _write_shared_fonts(font_dir: Path, results: list) -> None:
+    """(Re)write embed_font="external"'s font files for these SVG results,
+    unless nothing changed since they were last written."""
+    from mermaidx.font_embed import font_file_name, write_font_files
+
+    if any(r.status == "rendered" for r in results) or not (font_dir / font_file_name("regular")).exists():
+        write_font_files((r.output.read_text(encoding="utf-8") for r in results if r.status != "failed"), font_dir)
@@ -0,0 +1,405 @@
+"""
+mermaidx.bench — the benchmark harness (``mermaidx bench``).
+
+Renders every ``tests/samples/*.mmd`` plus synthetic diagrams of
+increasing size (see synthetic.py) on each backend and reports, per backend:
+
+    cold_start_s        first render in a fresh process: engine boot + render
+                        (up to the first sample that renders; None, with
+                        cold_start_error, if none does)
+    latency_s           warm SVG render latency, p50/p95/p99 over every sample
+    throughput_per_s    warm renders per second
+    peak_rss_bytes      peak resident memory of the benchmark process *and*
+                        its children (the V8 engine lives in a child)
+    phases_s            mean seconds per warm render for each RenderStats
+                        phase (see mermaidx.stats)
+    samples             per sample: p50, svg_bytes, png_bytes, the engine's
+                        heap_used_bytes right after it (or an error)
+    scaling             the synthetic samples again, per kind, ordered by node
+                        count -- render time and heap against size
+    failures            how many samples failed (each has its "error")
+
+Each backend runs in its own freshly spawned process, so cold start and
+peak RSS aren't polluted by whatever ran before it. The result is plain
+JSON; keep one from a known-good commit and pass it back as ``--baseline``
+to flag regressions beyond ``--tolerance`` (or any new failure)::
+
+    mermaidx bench -o baseline.json
+    ...change things...
+    mermaidx bench --baseline baseline.json      # exit status 1 on regression
+
+``--plot DIR`` also draws the scaling numbers as one chart per diagram kind
+and metric -- rendered by mermaidx itself, as a mermaid xychart.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_SIZES = (10, 25, 50)
+DEFAULT_KINDS = ("flowchart",)
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+
+# metric path -> True if a *larger* value is a regression, False if smaller is.
+_COMPARED = {
+    ("cold_start_s",): True,
+    ("latency_s", "p50"): True,
+    ("latency_s", "p95"): True,
+    ("latency_s", "p99"): True,
+    ("throughput_per_s",): False,
+    ("peak_rss_bytes",): True,
+}
+
+_CTX = mp.get_context("spawn")
+
+_SYNTHETIC_NAME = re.compile(r"synthetic_(\w+)_(\d+)$")
+
+# xychart line colours, one per backend in report order.
+_PLOT_COLORS = (("blue", "#1f77b4"), ("orange", "#ff7f0e"), ("green", "#2ca02c"), ("red", "#d62728"),
+                ("purple", "#9467bd"))
+_PLOT_METRICS = {"time": ("p50_s", "seconds", 1.0), "heap": ("heap_used_bytes", "MiB", 1 / 2**20)}
+
+
+def default_samples_dir() -> Optional[Path]:
+    """``tests/samples`` of the current directory, else of the source
+    checkout mermaidx is imported from; None if neither exists (e.g. an
+    installed wheel run outside the repo -- then only synthetic diagrams
+    are benchmarked)."""
+    for root in (Path.cwd(), Path(__file__).resolve().parent.parent):
+        candidate = root / "tests" / "samples"
+        if candidate.is_dir():
+            return candidate
+    return None
+
+
+def collect_sources(samples_dir: Optional[Path] = None, sizes=DEFAULT_SIZES, kinds=DEFAULT_KINDS) -> dict:
+    """``{name: mermaid source}`` for every sample in ``samples_dir`` plus
+    one synthetic diagram (``synthetic_<kind>_<nodes>``) per kind and size."""
+    from mermaidx.synthetic import generate
+
+    sources = {}
+    if samples_dir is not None:
+        for path in sorted(Path(samples_dir).glob("*.mmd")):
+            sources[path.stem] = path.read_text(encoding="utf-8")
+    for kind in kinds:
+        for n in sizes:
+            sources[f"synthetic_{kind}_{n}"] = generate(kind, n)
+    return sources
+
+
+def _percentile(values: list, q: float) -> float:
+    """Linearly interpolated percentile (q in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    unit = 1 if sys.platform == "darwin" else 1024
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak * unit
+
+
+def bench_backend(backend: str, sources: dict, repeat: int = DEFAULT_REPEAT) -> dict:
+    """Benchmark one backend in *this* process -- run_benchmark() calls it
+    in a fresh one. The first render is the cold start; every sample is
+    then rendered ``repeat`` more times, each on a fresh (uncached)
+    Diagram, for the warm numbers."""
+    from mermaidx.diagram import _engines, engine_heap_stats, render
+
+    names = list(sources)
+    cold_start, cold_error = None, None
+    start = time.perf_counter()
+    for name in names:
+        try:
+            render(sources[name], backend=backend).svg()
+        except Exception as exc:  # recorded: a failed render isn't a fast one
+            cold_error = f"{type(exc).__name__}: {exc}".splitlines()[0]
+            continue
+        cold_start, cold_error = time.perf_counter() - start, None
+        break
+
+    latencies, samples, phases = [], {}, {}
+    renders = 0
+    warm_start = time.perf_counter()
+    for name in names:
+        times = []
+        try:
+            for _ in range(repeat):
+                d = render(sources[name], backend=backend)
+                t0 = time.perf_counter()
+                svg = d.svg()
+                times.append(time.perf_counter() - t0)
+                for phase, seconds in d.stats.phases.items():
+                    phases[phase] = phases.get(phase, 0.0) + seconds
+                renders += 1
+            png = d.png()
+        except Exception as exc:
+            samples[name] = {"error": f"{type(exc).__name__}: {exc}".splitlines()[0]}
+            continue
+        latencies.extend(times)
+        samples[name] = {
+            "p50_s": _percentile(times, 50),
+            "svg_bytes": len(svg.encode("utf-8")),
+            "png_bytes": len(png),
+            "heap_used_bytes": _heap_used(engine_heap_stats(backend) if backend in ("quickjs", "v8") else None),
+        }
+    warm_total = time.perf_counter() - warm_start
+
+    # Closing reaps the V8 child, so its peak RSS lands in RUSAGE_CHILDREN.
+    engine = _engines.pop(backend, None)
+    if engine is not None:
+        engine.close()
+    result = {
+        "cold_start_s": cold_start,
+        "latency_s": {f"p{q}": _percentile(latencies, q) for q in (50, 95, 99)} if latencies else {},
+        "throughput_per_s": renders / warm_total if warm_total else 0.0,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "phases_s": {phase: seconds / renders for phase, seconds in phases.items()} if renders else {},
+        "samples": samples,
+        "scaling": _scaling(samples),
+        "failures": sum("error" in sample for sample in samples.values()),
+    }
+    if cold_error:
+        result["cold_start_error"] = cold_error
+    return result
+
+
+def _heap_used(heap_stats) -> Optional[int]:
+    if heap_stats is None:
+        return None
+    if isinstance(heap_stats, list):  # a workers=N v8 pool
+        return sum(h["heap_used_bytes"] for h in heap_stats)
+    return heap_stats["heap_used_bytes"]
+
+
+def _scaling(samples: dict) -> dict:
+    """The synthetic samples' numbers regrouped as ``{kind: [point, ...]}``,
+    each point ``{"nodes", "p50_s", "heap_used_bytes"}`` (or ``"error"``),
+    by increasing node count."""
+    scaling: dict = {}
+    for name, result in samples.items():
+        match = _SYNTHETIC_NAME.match(name)
+        if match is None:
+            continue
+        point = {"nodes": int(match.group(2))}
+        if "error" in result:
+            point["error"] = result["error"]
+        else:
+            point.update(p50_s=result["p50_s"], heap_used_bytes=result["heap_used_bytes"])
+        scaling.setdefault(match.group(1), []).append(point)
+    for points in scaling.values():
+        points.sort(key=lambda p: p["nodes"])
+    return scaling
+
+
+def run_benchmark(
+    backends: Optional[list] = None,
+    *,
+    samples_dir: Optional[Path] = None,
+    sizes=DEFAULT_SIZES,
+    kinds=DEFAULT_KINDS,
+    repeat: int = DEFAULT_REPEAT,
+    isolate: bool = True,
+) -> dict:
+    """
+    Benchmark ``backends`` (default: the in-tree JS backends that are
+    installed, i.e. quickjs and v8) and return the JSON-able report
+    described in the module docstring.
+
+    ``isolate=False`` runs every backend in this process instead of a fresh
+    one each -- faster, but cold start and peak RSS then only mean
+    something for the first backend.
+    """
+    from mermaidx import __version__
+    from mermaidx.backends import backends as available_backends
+
+    if backends is None:
+        backends = [b for b in available_backends() if b in ("quickjs", "v8")]
+    if samples_dir is None:
+        samples_dir = default_samples_dir()
+    sources = collect_sources(samples_dir, sizes, kinds)
+
+    results = {}
+    for backend in backends:
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1, mp_context=_CTX) as pool:
+                results[backend] = pool.submit(bench_backend, backend, sources, repeat).result()
+        else:
+            results[backend] = bench_backend(backend, sources, repeat)
+
+    return {
+        "mermaidx": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "backends": results,
+    }
+
+
+def _lookup(report: dict, path: tuple):
+    for key in path:
+        if not isinstance(report, dict) or key not in report:
+            return None
+        report = report[key]
+    return report
+
+
+def compare(result: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """
+    Regressions of ``result`` against ``baseline`` (both run_benchmark()
+    reports), as human-readable strings -- empty if nothing got worse by
+    more than ``tolerance`` (a fraction: 0.25 means 25%), or failed more
+    samples. Only backends and metrics present in both reports are
+    compared.
+    """
+    regressions = []
+    for backend, current in result.get("backends", {}).items():
+        previous = baseline.get("backends", {}).get(backend)
+        if previous is None:
+            continue
+        failures, failures_before = current.get("failures"), previous.get("failures")
+        if failures is not None and failures_before is not None and failures > failures_before:
+            regressions.append(f"{backend}: failures {failures_before} -> {failures}")
+        for path, larger_is_worse in _COMPARED.items():
+            now, before = _lookup(current, path), _lookup(previous, path)
+            if not now or not before:
+                continue
+            change = (now - before) / before
+            if (change if larger_is_worse else -change) > tolerance:
+                regressions.append(
+                    f"{backend}: {'.'.join(path)} {before:.4g} -> {now:.4g} ({change:+.0%})"
+                )
+    return regressions
+
+
+def scaling_chart(report: dict, kind: str, metric: str = "time") -> Optional[str]:
+    """
+    Mermaid ``xychart-beta`` source plotting one ``metric`` ("time": p50
+    seconds, or "heap": JS heap MiB) against node count for synthetic
+    ``kind`` diagrams -- one line per backend, coloured in report order
+    (named in the title, since xychart has no legend). None if no backend
+    has a successful point for that kind.
+    """
+    key, unit, factor = _PLOT_METRICS[metric]
+    series = {}
+    for backend, result in report["backends"].items():
+        points = {p["nodes"]: p.get(key) for p in result.get("scaling", {}).get(kind, [])}
+        if any(v is not None for v in points.values()):
+            series[backend] = points
+    if not series:
+        return None
+
+    sizes = sorted({n for points in series.values() for n in points})
+    colors = _PLOT_COLORS[:len(series)]
+    legend = ", ".join(f"{backend} {name}" for backend, (name, _) in zip(series, colors))
+    palette = ", ".join(hex_ for _, hex_ in colors)
+    lines = [
+        '%%{init: {"themeVariables": {"xyChart": {"plotColorPalette": "' + palette + '"}}}}%%',
+        "xychart-beta",
+        f'    title "{kind}: {metric} vs nodes ({legend})"',
+        f'    x-axis "nodes" [{", ".join(map(str, sizes))}]',
+        f'    y-axis "{unit}"',
+    ]
+    for points in series.values():
+        # xychart can't skip a point; a failed size is drawn at 0.
+        values = [(points.get(n) or 0) * factor for n in sizes]
+        lines.append(f"    line [{', '.join(f'{v:.4g}' for v in values)}]")
+    return "\n".join(lines)
+
+
+def plot(report: dict, directory: Path) -> list:
+    """Render every scaling_chart() of ``report`` into ``directory`` as
+    ``<kind>_<metric>.svg``; returns the paths written."""
+    from mermaidx.diagram import render
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    kinds = sorted({k for result in report["backends"].values() for k in result.get("scaling", {})})
+    written = []
+    for kind in kinds:
+        for metric in _PLOT_METRICS:
+            source = scaling_chart(report, kind, metric)
+            if source is None:
+                continue
+            path = directory / f"{kind}_{metric}.svg"
+            render(source).save(str(path))
+            written.append(path)
+    return written
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="mermaidx bench",
+        description="Benchmark mermaidx rendering and compare against a baseline.",
+    )
+    parser.add_argument("--backend", action="append", default=None, metavar="NAME",
+                        help="Backend to benchmark; repeat for several "
+                             "(default: quickjs, plus v8 if installed)")
+    parser.add_argument("--samples", default=None, metavar="DIR",
+                        help="Directory of *.mmd samples (default: tests/samples, if found)")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), metavar="N,N,...",
+                        help="Node counts of the synthetic diagrams; empty for none "
+                             f"(default: {','.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument("--kinds", default=",".join(DEFAULT_KINDS), metavar="KIND,...",
+                        help="Synthetic diagram kinds: flowchart, sequence, state, class, er, "
+                             f"mindmap (default: {','.join(DEFAULT_KINDS)})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, metavar="N",
+                        help=f"Warm renders per sample (default: {DEFAULT_REPEAT})")
+    parser.add_argument("-o", "--output", default=None, metavar="FILE",
+                        help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", default=None, metavar="FILE",
+                        help="Earlier JSON report to compare against; exit status 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, metavar="FRACTION",
+                        help=f"Allowed slowdown vs. --baseline (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--plot", default=None, metavar="DIR",
+                        help="Also write render-time and heap vs. size charts (SVG) here")
+    return parser
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    sizes = [int(n) for n in args.sizes.split(",") if n.strip()]
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    report = run_benchmark(
+        args.backend,
+        samples_dir=Path(args.samples) if args.samples else None,
+        sizes=sizes,
+        kinds=kinds,
+        repeat=max(1, args.repeat),
+    )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.plot:
+        for path in plot(report, Path(args.plot)):
+            print(f"saved to {path}", file=sys.stderr)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
@@ -0,0 +1,358 @@
+"""
+mermaidx.daemon — a long-running render server (``mermaidx serve``).
+
+Every ``mermaidx -i x.mmd -o x.svg`` starts an interpreter and loads
+mermaid.js from scratch, which dominates small renders. ``mermaidx serve``
+does that once and keeps its engines warm; while it's running, the CLI
+(``--daemon auto``, the default) hands its render to the daemon instead and
+only falls back to rendering in-process when no daemon answers.
+
+The daemon listens on a Unix socket (default: ``daemon.sock`` in a private
+``mermaidx-<uid>`` directory under $XDG_RUNTIME_DIR or the temp directory).
+The client only talks to a socket that is owned by the same user. TCP has no
+such check and no authentication, so the daemon only listens on it when
+asked to explicitly (``--address 127.0.0.1:7463 --allow-tcp``). Platforms
+without Unix sockets have no default address. The ``MERMAIDX_DAEMON``
+environment variable sets the address for both sides.
+
+Wire format: newline-delimited JSON in both directions, any number of
+requests per connection, answered in order. A render request/response is
+protocol.py's, except that the daemon never writes files: a request with
+``output`` is refused, and the client writes the returned data itself.
+Besides those, ``{"op": "ping"}`` answers with the daemon's version and pid,
+and ``{"op": "shutdown"}`` stops it. A line that isn't a JSON object gets
+an error response and ends the connection. Requests on different
+connections render concurrently, each on the shared engines
+(``--v8-workers N`` gives v8 a pool of N child processes to render on).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+ENV_VAR = "MERMAIDX_DAEMON"
+DEFAULT_TCP_PORT = 7463
+
+_CONNECT_TIMEOUT_S = 0.5
+
+
+def default_address() -> Optional[str]:
+    """``$MERMAIDX_DAEMON`` if set, else the per-user Unix socket path --
+    or None on platforms without Unix sockets, where a (TCP) daemon is only
+    used when its address is given explicitly."""
+    if os.environ.get(ENV_VAR):
+        return os.environ[ENV_VAR]
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    return _user_socket_path()
+
+
+def _user_socket_path() -> str:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return str(Path(runtime_dir) / f"mermaidx-{os.getuid()}" / "daemon.sock")
+
+
+def _is_own_socket(path: str) -> bool:
+    """Whether ``path`` is a Unix socket owned by this user -- anything else
+    (a missing path, a regular file, another user's socket) isn't a daemon
+    this user started."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def parse_address(address: str) -> Union[str, tuple]:
+    """``"host:port"`` -> ``(host, port)`` for TCP; anything else is a
+    Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address and "\\" not in address:
+        return host or "127.0.0.1", int(port)
+    return address
+
+
+# ── server ───────────────────────────────────────────────────────────────────
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        from mermaidx import __version__
+        from mermaidx.protocol import handle
+
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as exc:
+                # Not a client of ours (e.g. an HTTP request aimed at a TCP
+                # daemon): answer once and stop reading.
+                self._send({"ok": False, "error": f"invalid request: {exc}"})
+                return
+            else:
+                op = request.get("op", "render")
+                if op == "ping":
+                    response = {"ok": True, "version": __version__, "pid": os.getpid()}
+                elif op == "shutdown":
+                    self._send({"ok": True})
+                    # shutdown() waits for serve_forever() to return -- not
+                    # from inside one of its own handler threads.
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+                elif op == "render" and "output" in request:
+                    response = {"ok": False, "error": "the daemon doesn't write files; "
+                                                      "drop 'output' and write the returned data"}
+                    if "id" in request:
+                        response = {"id": request["id"], **response}
+                elif op == "render":
+                    response = handle(request)
+                else:
+                    response = {"ok": False, "error": f"unknown op {op!r}"}
+            self._send(response)
+
+    def _send(self, response: dict) -> None:
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+        def server_close(self) -> None:
+            super().server_close()
+            try:
+                os.unlink(self.server_address)
+            except OSError:
+                pass
+
+
+def make_server(address: Optional[str] = None, *, allow_tcp: bool = False) -> socketserver.BaseServer:
+    """Bind a (not yet serving) daemon server to ``address`` (default:
+    default_address()). A leftover Unix socket from a daemon that died is
+    replaced; one that still answers, or anything at ``address`` that isn't
+    a socket, raises RuntimeError. So does a TCP address unless
+    ``allow_tcp`` -- any local user can connect to one."""
+    address = address or default_address()
+    if address is None:
+        raise RuntimeError(f"No default daemon address on this platform; pass a TCP address "
+                           f"(e.g. 127.0.0.1:{DEFAULT_TCP_PORT}) and allow it explicitly.")
+    target = parse_address(address)
+    if isinstance(target, tuple):
+        if not allow_tcp:
+            raise RuntimeError(f"Refusing to listen on TCP address {address} without an explicit "
+                               "opt-in: any local user could use it.")
+        return _TCPServer(target, _Handler)
+
+    if target == _user_socket_path():
+        _make_private_dir(os.path.dirname(target))
+    if os.path.lexists(target):
+        if not stat.S_ISSOCK(os.lstat(target).st_mode):
+            raise RuntimeError(f"{target} exists and is not a socket.")
+        if ping(target) is not None:
+            raise RuntimeError(f"A mermaidx daemon is already listening on {target}.")
+        os.unlink(target)
+    old_umask = os.umask(0o077)  # socket only usable by this user
+    try:
+        return _UnixServer(target, _Handler)
+    finally:
+        os.umask(old_umask)
+
+
+def _make_private_dir(path: str) -> None:
+    """Create ``path`` readable by this user only -- or check that it
+    already is, so nobody else can put a socket of theirs in it."""
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f"{path} must be a directory owned by this user and private to it (mode 0700).")
+
+
+def serve(address: Optional[str] = None, *, warm: tuple = ("quickjs",), v8_workers: Optional[int] = None,
+          allow_tcp: bool = False) -> None:
+    """Start the engines in ``warm``, then serve requests on ``address``
+    until a shutdown request (or Ctrl-C). ``allow_tcp`` as for
+    make_server()."""
+    from mermaidx.diagram import _get_engine_by_name, configure_engine
+
+    if v8_workers:
+        configure_engine("v8", workers=v8_workers)
+    server = make_server(address, allow_tcp=allow_tcp)
+    try:
+        for name in warm:
+            _get_engine_by_name(name)
+        print(f"mermaidx daemon listening on {_describe(server.server_address)}", file=sys.stderr)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def _describe(server_address) -> str:
+    if isinstance(server_address, tuple):
+        return f"{server_address[0]}:{server_address[1]}"
+    return str(server_address)
+
+
+# ── client ───────────────────────────────────────────────────────────────────
+
+def _connect(address: Optional[str]) -> Optional[socket.socket]:
+    """A connected socket, or None if nothing is listening (cheaply: for a
+    Unix socket, a missing file doesn't even get a connect() attempt). A
+    Unix socket this user doesn't own counts as nothing: sources are never
+    sent to a daemon someone else started."""
+    address = address or default_address()
+    if address is None:
+        return None
+    target = parse_address(address)
+    if isinstance(target, tuple):
+        family = socket.AF_INET
+    elif not _is_own_socket(target):
+        return None
+    else:
+        family = socket.AF_UNIX
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(_CONNECT_TIMEOUT_S)
+    try:
+        sock.connect(target)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)  # a render may legitimately take a while
+    return sock
+
+
+def _exchange(sock: socket.socket, requests: list) -> list:
+    payload = b"".join(json.dumps(r).encode("utf-8") + b"\n" for r in requests)
+    sock.sendall(payload)
+    with sock.makefile("rb") as replies:
+        responses = []
+        for _ in requests:
+            line = replies.readline()
+            if not line:
+                raise ConnectionError("mermaidx daemon closed the connection")
+            responses.append(json.loads(line))
+    return responses
+
+
+def ping(address: Optional[str] = None) -> Optional[dict]:
+    """The daemon's ``{"version", "pid"}`` answer, or None if none is running."""
+    sock = _connect(address)
+    if sock is None:
+        return None
+    try:
+        return _exchange(sock, [{"op": "ping"}])[0]
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def request(render_request: dict, address: Optional[str] = None) -> Optional[dict]:
+    """Send one protocol.py render request to the running daemon and return
+    its response -- or None if no daemon of this exact mermaidx version is
+    running (so the caller renders in-process instead)."""
+    from mermaidx import __version__
+
+    sock = _connect(address)
+    if sock is None:
+        return None
+    try:
+        # Pipelined: the version check costs no extra round trip.
+        pong, response = _exchange(sock, [{"op": "ping"}, {**render_request, "op": "render"}])
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+    if pong.get("version") != __version__:
+        return None
+    return response
+
+
+def stop(address: Optional[str] = None) -> bool:
+    """Ask the running daemon to shut down; False if none was running."""
+    sock = _connect(address)
+    if sock is None:
+        return False
+    try:
+        _exchange(sock, [{"op": "shutdown"}])
+    except (OSError, ValueError):
+        return False
+    finally:
+        sock.close()
+    return True
+
+
+# ── `mermaidx serve` ─────────────────────────────────────────────────────────
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="mermaidx serve",
+        description="Run a render daemon with warm engines; the mermaidx CLI uses it "
+                    "automatically while it's running.",
+    )
+    parser.add_argument("--address", default=None, metavar="PATH|HOST:PORT",
+                        help=f"Unix socket path or localhost TCP address (default: ${ENV_VAR}, "
+                             "else a per-user socket in $XDG_RUNTIME_DIR or the temp directory)")
+    parser.add_argument("--allow-tcp", action="store_true",
+                        help="Allow listening on a TCP --address. It has no authentication: "
+                             "any local user can render through it")
+    parser.add_argument("--warm", action="append", default=None, metavar="BACKEND",
+                        help="Engine to start before accepting requests; repeat for several "
+                             "(default: quickjs). Others start on first use.")
+    parser.add_argument("--v8-workers", type=int, default=None, metavar="N",
+                        help="Give the v8 backend a pool of N child processes")
+    parser.add_argument("--status", action="store_true", help="Report whether a daemon is running and exit")
+    parser.add_argument("--stop", action="store_true", help="Stop the running daemon and exit")
+    return parser
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    address = args.address or default_address()
+    if address is None:
+        print(f"error: no default daemon address on this platform; pass --address "
+              f"127.0.0.1:{DEFAULT_TCP_PORT} --allow-tcp (or set ${ENV_VAR})", file=sys.stderr)
+        return 1
+
+    if args.status:
+        pong = ping(address)
+        if pong is None:
+            print(f"no mermaidx daemon on {address}", file=sys.stderr)
+            return 1
+        print(f"mermaidx {pong['version']} daemon (pid {pong['pid']}) on {address}")
+        return 0
+    if args.stop:
+        if not stop(address):
+            print(f"no mermaidx daemon on {address}", file=sys.stderr)
+            return 1
+        return 0
+
+    try:
+        serve(address, warm=tuple(args.warm or ("quickjs",)), v8_workers=args.v8_workers,
+              allow_tcp=args.allow_tcp)
+    except RuntimeError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
@@ -27,28 +27,24 @@ and everything else for free.
 from __future__ import annotations
 
 import atexit
+import importlib.util
 import threading
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
-
-from mermaidx.ascii import render_ascii
-from mermaidx.engines.quickjs_engine import Engine as _QuickJSEngine
-from mermaidx.engines.quickjs_engine import MermaidRenderError as _QuickJSRenderError
-from mermaidx.font_embed import embed_dejavu_font
-from mermaidx.pdf_writer import png_to_pdf
-from mermaidx.png_decode import decode_png_rgba, decode_png
-from mermaidx.raster import render_png
-
-try:
-    from mermaidx.engines.v8_engine import Engine as _V8Engine
-    from mermaidx.engines.v8_engine import MermaidRenderError as _V8RenderError
-    _V8_AVAILABLE = True
-except ImportError:
-    _V8_AVAILABLE = False
+from typing import TYPE_CHECKING, Iterator, Optional, Union
+
+from mermaidx.protocol import EXTENSION_FORMATS
+from mermaidx.shared import SharedPayload
+from mermaidx.stats import RenderStats
+
+# Everything heavier -- the engines, resvg, termaid, the font embedder, the
+# PNG/PDF codecs -- is imported inside the method that needs it, so e.g. a
+# caller that only ever asks for SVGs never loads resvg.
 
 if TYPE_CHECKING:
     import numpy as np
 
+    from mermaidx.tiles import Tile
+
 # One persistent, lazily-started engine per *name* ("quickjs" / "v8"), shared
 # by every render() call in the process -- loading mermaid.js (~6MB of
 # source) is the expensive part, so each engine only pays that cost once,
@@ -58,30 +54,87 @@ if TYPE_CHECKING:
 # internally on their own dedicated worker thread, so no asyncio is needed
 # here at all.
 _engines: dict = {}
+_engine_options: dict = {}
 _engines_lock = threading.Lock()
 
 
-def _get_engine_by_name(name: str):
+def configure_engine(name: str, **options) -> None:
+    """
+    Set the constructor options for the shared engine called *name*
+    ("quickjs" or "v8"), replacing (and closing) it if it's already running
+    -- the next render that needs it starts a fresh one with *options*.
+
+    'v8' also accepts ``workers=N``: N > 1 uses an EnginePool of N child
+    processes instead of a single one, so N threads rendering at once get N
+    cores (see engines/v8_engine.py). Every other option is forwarded to the
+    engine class as-is, e.g. ``render_timeout_ms`` / ``warm_spare`` (v8) or
+    ``recycle`` (both -- see engines/recycle.py)::
+
+        mermaidx.configure_engine("v8", workers=4, render_timeout_ms=4000)
+        mermaidx.configure_engine("quickjs", recycle=mermaidx.RecyclePolicy(max_renders=10_000))
+    """
+    if name not in ("quickjs", "v8"):
+        raise ValueError(f"Unknown JS engine {name!r}; expected 'quickjs' or 'v8'.")
+    with _engines_lock:
+        _engine_options[name] = dict(options)
+        old = _engines.pop(name, None)
+    if old is not None:
+        old.close()
+
+
+def engine_heap_stats(name: str = "quickjs"):
+    """
+    heap_stats() of the shared engine called *name* -- the numbers a
+    RecyclePolicy is checked against (renders, age_s, heap_used_bytes, ...),
+    for tuning one. None if that engine hasn't been started yet. A
+    ``workers=N`` v8 pool returns one dict per child process.
+    """
+    engine = _engines.get(name)
+    if engine is None:
+        return None
+    return engine.heap_stats()
+
+
+def _new_engine(name: str):
+    options = dict(_engine_options.get(name, {}))
+    if name == "quickjs":
+        from mermaidx.engines.quickjs_engine import Engine
+
+        return Engine(**options)
+    if name == "v8":
+        # Only the engine's child process imports py_mini_racer; just check
+        # it's there, so a missing install fails here with a hint instead
+        # of as a child boot error.
+        if importlib.util.find_spec("py_mini_racer") is None:
+            raise ImportError(
+                "backend='v8' requires the optional 'mini-racer' package. "
+                "Install it with:\n    pip install mermaidx[v8]"
+            )
+        from mermaidx.engines.v8_engine import Engine, EnginePool
+
+        workers = options.pop("workers", None)
+        if workers is not None and workers > 1:
+            return EnginePool(workers, **options)
+        return Engine(**options)
+    raise ValueError(f"Unknown JS engine {name!r}; expected 'quickjs' or 'v8'.")
+
+
+def _get_engine_by_name(name: str, stats: Optional[RenderStats] = None):
     """
     Lazily creates and caches one engine instance per name ("quickjs" or
     "v8"), so both can coexist in the same process without one evicting
-    the other.
+    the other. If this call is the one that starts it, the boot time is
+    recorded as `stats`' "js_boot" phase.
     """
     if name not in _engines:
         with _engines_lock:
             if name not in _engines:  # re-check inside the lock
-                if name == "quickjs":
-                    e = _QuickJSEngine()
-                elif name == "v8":
-                    if not _V8_AVAILABLE:
-                        raise ImportError(
-                            "backend='v8' requires the optional 'mini-racer' package. "
-                            "Install it with:\n    pip install mermaidx[v8]"
-                        )
-                    e = _V8Engine()
+                e = _new_engine(name)
+                if stats is not None:
+                    with stats.timed("js_boot"):
+                        e.start()
                 else:
-                    raise ValueError(f"Unknown JS engine {name!r}; expected 'quickjs' or 'v8'.")
-                e.start()
+                    e.start()
                 # engines.v8_engine runs its V8 isolate in a child process
                 # (see that module's docstring for why) -- register a clean
                 # shutdown so it doesn't linger as an orphan if the process
@@ -108,6 +161,9 @@ class DiagramBase:
 
     Not instantiated directly -- use mermaidx.render(), which picks the right
     subclass for the requested backend.
+
+    `stats` (a mermaidx.stats.RenderStats) accumulates how long each step
+    of this diagram's pipeline took, plus cache hits/misses.
     """
 
     backend: str = "base"
@@ -116,6 +172,7 @@ class DiagramBase:
         self._source = source
         self._opts = opts
         self._cache: dict = {}
+        self.stats = RenderStats()
 
     # ------------------------------------------------------------------
     # memoization helper -- keyed by (method name, sorted kwargs)
@@ -125,10 +182,20 @@ class DiagramBase:
         key = (name, tuple(sorted(kwargs.items())))
         result = self._cache.get(key, _MISSING)
         if result is _MISSING:
+            self.stats.count("cache_misses")
             result = compute()
             self._cache[key] = result
+        else:
+            self.stats.count("cache_hits")
+            if type(result) is SharedPayload:  # from a pool worker, not read until now
+                result = self._cache[key] = result.load()
         return result
 
+    def _prime(self, name: str, kwargs: dict, value) -> None:
+        """Store an already-computed result, as if `name(**kwargs)` had
+        computed it -- for batch paths that produce many at once."""
+        self._cache[(name, tuple(sorted(kwargs.items())))] = value
+
     # ------------------------------------------------------------------
     # SVG
     # ------------------------------------------------------------------
@@ -137,23 +204,39 @@ class DiagramBase:
         """Uncached SVG computation. Subclasses must override this."""
         raise NotImplementedError
 
-    def svg(self, *, embed_font: bool = False) -> str:
+    def svg(self, *, embed_font: Union[bool, str] = False) -> str:
         """Return the diagram as an SVG string (computed once, then cached).
 
         Args:
-            embed_font: If True, inline the exact DejaVu Sans glyphs this
-                diagram uses as base64 @font-face rules, so opening the SVG
+            embed_font: If True, inline the DejaVu Sans glyphs this diagram
+                uses as base64 @font-face rules, so opening the SVG
                 directly in a browser paints text with the same metrics
                 used to lay it out (see mermaidx.font_embed). Off by
                 default: it needs fontTools (`pip install mermaidx[embed]`)
                 and makes the file bigger; mermaidx's own .png()/.pdf()
                 output is unaffected either way, since resvg is already
-                told to use this exact font regardless.
+                told to use this exact font regardless. True embeds a
+                shared, memoized Latin-1 subset when that covers the text;
+                "exact" embeds only the glyphs used (smaller, slower the
+                first time each character set is seen).
         """
-        base = self._cached("svg", {}, self._svg)
+        base = self._cached("svg", {}, self._timed_svg)
         if not embed_font:
             return base
-        return self._cached("svg_embed_font", {}, lambda: embed_dejavu_font(base))
+        from mermaidx.font_embed import embed_dejavu_font
+
+        subset = "latin-1" if embed_font is True else embed_font
+        return self._cached("svg_embed_font", {"subset": subset},
+                            lambda: self._timed("embed_font", embed_dejavu_font, base, subset=subset))
+
+    def _timed(self, phase: str, fn, *args, **kwargs):
+        with self.stats.timed(phase):
+            return fn(*args, **kwargs)
+
+    def _timed_svg(self) -> str:
+        svg = self._timed("svg", self._svg)
+        self.stats.count("svg_bytes", len(svg))
+        return svg
 
     # ------------------------------------------------------------------
     # PNG
@@ -171,7 +254,10 @@ class DiagramBase:
         kwargs = dict(background=background, width=width, height=height)
         if width is None and height is None and scale is not None:
             kwargs["scale"] = scale
-        return render_png(self.svg(), **kwargs)
+        from mermaidx.raster import render_png
+
+        svg = self.svg()
+        return self._timed("resvg", render_png, svg, **kwargs)
 
     def png(
         self,
@@ -208,8 +294,10 @@ class DiagramBase:
         scale: Optional[float] = None,
         background: Optional[str] = None,
     ) -> tuple[bytes, int, int]:
+        from mermaidx.png_decode import decode_png_rgba
+
         png_bytes = self.png(width=width, height=height, scale=scale, background=background)
-        return decode_png_rgba(png_bytes)
+        return self._timed("png_decode", decode_png_rgba, png_bytes)
 
     def raw(
         self,
@@ -231,8 +319,18 @@ class DiagramBase:
         background: Optional[str] = None,
     ) -> "np.ndarray":
         import numpy as np  # already validated present by numpy() below
-        raw, w, h = self.raw(width=width, height=height, scale=scale, background=background)
-        return np.frombuffer(raw, dtype=np.uint8).reshape(h, w, 4)
+
+        from mermaidx.png_decode import decode_png_into, png_dimensions
+
+        png_bytes = self.png(width=width, height=height, scale=scale, background=background)
+        w, h = png_dimensions(png_bytes)
+        # Decoded straight into the array's own buffer -- not via raw()'s
+        # bytes, which would be one more image-sized copy. Read-only once
+        # filled: numpy() caches it, so every caller gets this same array.
+        array = np.empty((h, w, 4), dtype=np.uint8)
+        self._timed("png_decode", decode_png_into, png_bytes, array)
+        array.flags.writeable = False
+        return array
 
     def numpy(
         self,
@@ -266,12 +364,17 @@ class DiagramBase:
         pdf_landscape: bool = False,
         pdf_margin: str = "0",
     ) -> bytes:
-        render_kwargs = dict(background=background, width=width, height=height)
-        if width is None and height is None:
-            render_kwargs["scale"] = scale
-        png_bytes = render_png(self.svg(), **render_kwargs)
-        decoded = decode_png(png_bytes)
-        return png_to_pdf(
+        from mermaidx.pdf_writer import png_to_pdf
+        from mermaidx.png_decode import decode_png
+
+        # Through png()'s cache: a png() and pdf() of the same size
+        # rasterize once. scale=1.0 is resvg's natural size, i.e. png()'s
+        # scale=None -- normalized so they share the cache entry.
+        png_bytes = self.png(width=width, height=height, scale=None if scale == 1.0 else scale,
+                             background=background)
+        decoded = self._timed("png_decode", decode_png, png_bytes)
+        return self._timed(
+            "pdf_build", png_to_pdf,
             decoded, pdf_format=pdf_format, landscape=pdf_landscape,
             margin=pdf_margin, scale=1.0, background_color=background,
         )
@@ -305,11 +408,77 @@ class DiagramBase:
                       pdf_format=pdf_format, pdf_landscape=pdf_landscape, pdf_margin=pdf_margin)
         return self._cached("pdf", kwargs, lambda: self._pdf(**kwargs))
 
+    def png_variants(
+        self,
+        scales: tuple = (1.0, 2.0),
+        *,
+        widths: tuple = (),
+        thumbnails: tuple = (),
+        background: Optional[str] = None,
+        raw: bool = False,
+    ) -> dict:
+        """Several sizes of the same diagram in one call, e.g. 1x/2x plus a
+        thumbnail for a gallery.
+
+        Args:
+            scales:     Size multipliers -> keys ``"1x"``, ``"2x"``, ``"0.5x"``, ...
+            widths:     Exact pixel widths -> keys ``"w800"``, ...
+            thumbnails: Bounding-box sizes in pixels -> keys ``"thumb128"``, ...;
+                        each is fitted (aspect ratio kept) inside an N x N box,
+                        using the largest raster's dimensions.
+            background: CSS color for every variant.
+            raw:        Return ``(bytes, width, height)`` RGBA8888 tuples
+                        (as .raw()) instead of PNG bytes.
+
+        Every variant goes through png()/raw()'s cache, so asking again for
+        any of them -- here or via png(scale=2) -- costs nothing. Thumbnails
+        are rendered by resvg at their final size rather than downsampled
+        from the largest raster: resvg only returns PNG bytes, and decoding
+        one with png_decode costs far more than a small render.
+        """
+        from mermaidx.png_decode import png_dimensions
+
+        specs = {f"{s:g}x": dict(scale=float(s)) for s in scales}
+        specs.update({f"w{w:g}": dict(width=float(w)) for w in widths})
+        out = {key: self.png(background=background, **spec) for key, spec in specs.items()}
+        if thumbnails:
+            sizes = [png_dimensions(png) for png in out.values()] or [png_dimensions(self.png(background=background))]
+            w, h = max(sizes, key=lambda size: size[0] * size[1])
+            for box in thumbnails:
+                fit = min(box / w, box / h)
+                key = f"thumb{box:g}"
+                # width (not scale) so the fit is exact to the pixel.
+                specs[key] = dict(width=float(max(1, round(w * fit))))
+                out[key] = self.png(background=background, **specs[key])
+        if raw:
+            return {key: self.raw(background=background, **spec) for key, spec in specs.items()}
+        return out
+
+    def tiles(
+        self,
+        tile_size: int = 512,
+        *,
+        scale: float = 1.0,
+        overlap: int = 0,
+        background: Optional[str] = None,
+    ) -> "Iterator[Tile]":
+        """Rasterize the diagram as a stream of ``tile_size`` PNG tiles
+        (mermaidx.tiles.Tile: position, size and PNG bytes), row-major --
+        for diagrams too big to rasterize in one piece. Peak memory is one
+        tile, not the whole canvas. Not cached: tiles are meant to be
+        consumed (written out, uploaded) as they come.
+        """
+        from mermaidx.tiles import iter_tiles
+
+        return iter_tiles(self.svg(), tile_size, scale=scale, overlap=overlap, background=background)
+
     # ------------------------------------------------------------------
     # ASCII
     # ------------------------------------------------------------------
 
     def _ascii(self, **opts) -> str:
+        from mermaidx.ascii import render_ascii
+
         return render_ascii(self._source, **opts)
 
     def ascii(self, **opts) -> str:
@@ -326,8 +495,7 @@ class DiagramBase:
     # Save
     # ------------------------------------------------------------------
 
-    _EXTENSION_FORMATS = {".svg": "svg", ".png": "png", ".pdf": "pdf",
-                          ".txt": "ascii", ".ascii": "ascii"}
+    _EXTENSION_FORMATS = {**EXTENSION_FORMATS, ".dzi": "dzi"}
 
     def save(
         self,
@@ -342,12 +510,16 @@ class DiagramBase:
         """Save the diagram to *output*.
 
         Args:
-            format: Force the output format ("svg", "png", "pdf", or "ascii")
-                    regardless of the file extension. If omitted (the
+            format: Force the output format ("svg", "png", "pdf", "ascii" or
+                    "dzi") regardless of the file extension. If omitted (the
                     default), the format is inferred from *output*'s
-                    extension: ``.svg``, ``.png``, ``.pdf``, or ``.txt``/``.ascii``.
+                    extension: ``.svg``, ``.png``, ``.pdf``, ``.txt``/``.ascii``,
+                    or ``.dzi`` (a Deep Zoom tile pyramid, see mermaidx.tiles).
             **format_opts: Forwarded to the matching method -- pdf_format/
-                    pdf_landscape/pdf_margin for "pdf", any termaid option for "ascii".
+                    pdf_landscape/pdf_margin for "pdf", any termaid option for "ascii",
+                    tile_size/overlap for "dzi". ``tile_size`` with "png" renders
+                    and writes the PNG a band of tiles at a time, for diagrams
+                    too large to rasterize in one piece (mermaidx.tiles.write_png).
 
         Raises:
             ValueError: if the format can't be determined, or is unrecognised.
@@ -357,13 +529,17 @@ class DiagramBase:
         if fmt is None:
             raise ValueError(
                 f"Cannot infer output format from {output!r}. "
-                "Pass format=\"svg\"/\"png\"/\"pdf\"/\"ascii\" explicitly, "
+                "Pass format=\"svg\"/\"png\"/\"pdf\"/\"ascii\"/\"dzi\" explicitly, "
                 "or use one of these extensions: "
                 f"{sorted(set(self._EXTENSION_FORMATS))}"
             )
 
         if fmt == "svg":
             path.write_text(self.svg(**format_opts), encoding="utf-8")
+        elif fmt == "png" and format_opts.get("tile_size"):
+            from mermaidx.tiles import write_png
+
+            write_png(self.svg(), path, scale=scale or 1.0, background=background, **format_opts)
         elif fmt == "png":
             path.write_bytes(self.png(width=width, height=height, scale=scale, background=background))
         elif fmt == "pdf":
@@ -373,9 +549,13 @@ class DiagramBase:
             ))
         elif fmt == "ascii":
             path.write_text(self.ascii(**format_opts), encoding="utf-8")
+        elif fmt == "dzi":
+            from mermaidx.tiles import write_deep_zoom
+
+            write_deep_zoom(self.svg(), path, scale=scale or 1.0, background=background, **format_opts)
         else:
             raise ValueError(
-                f"Unknown format {fmt!r}. Supported: svg, png, pdf, ascii"
+                f"Unknown format {fmt!r}. Supported: svg, png, pdf, ascii, dzi"
             )
 
     # ------------------------------------------------------------------
@@ -461,6 +641,7 @@ class Diagram(DiagramBase):
         theme: Optional[str] = None,
         config: Optional[dict] = None,
         css: Optional[str] = None,
+        profile: bool = False,
         **_ignored,
     ) -> None:
         if backend not in ("quickjs", "v8"):
@@ -470,14 +651,49 @@ class Diagram(DiagramBase):
         self._theme = theme
         self._config = config
         self._css = css
+        self._profile = profile
+
+    def _render_request(self) -> tuple:
+        """The ``(code, theme, config, css, profile)`` request the engine renders."""
+        return self._source, self._theme or "default", self._config, self._css, self._profile
 
     def _svg(self) -> str:
-        engine = _get_engine_by_name(self.backend)  # raises ImportError first if backend="v8" but unavailable
-        render_error = _QuickJSRenderError if self.backend == "quickjs" else _V8RenderError
+        # raises ImportError first if backend="v8" but unavailable
+        engine = _get_engine_by_name(self.backend, self.stats)
+        if self.backend == "quickjs":
+            from mermaidx.engines.quickjs_engine import MermaidRenderError as RenderError
+        else:
+            from mermaidx.engines.v8_engine import MermaidRenderError as RenderError
+        code, theme, config, css, profile = self._render_request()
+        engine_stats: dict = {}
         try:
-            return engine.render_svg(self._source, self._theme or "default", self._config, self._css)
-        except render_error as e:
+            return engine.render_svg(code, theme, config, css, stats=engine_stats, profile=profile)
+        except RenderError as e:
             raise RuntimeError(f"Mermaid rendering failed: {e}") from e
+        finally:
+            self.stats.merge(engine_stats)
+
+
+def _render_svgs(diagrams: list) -> None:
+    """
+    Compute the SVG of every Diagram in *diagrams* with one
+    render_svg_many() batch per engine, instead of one round trip each,
+    and prime each Diagram's cache with it. A diagram whose render failed
+    is left uncached, so its .svg() still raises exactly as it would have
+    without the batch.
+    """
+    by_backend: dict = {}
+    for d in diagrams:
+        by_backend.setdefault(d.backend, []).append(d)
+    for backend, group in by_backend.items():
+        engine = _get_engine_by_name(backend, group[0].stats)
+        engine_stats = [{} for _ in group]
+        results = engine.render_svg_many([d._render_request() for d in group], engine_stats)
+        for d, result, render_stats in zip(group, results, engine_stats):
+            d.stats.merge(render_stats)
+            if isinstance(result, str):
+                d.stats.count("svg_bytes", len(result))
+                d._prime("svg", {}, result)
 
 
 class DiagramRust(DiagramBase):
@@ -514,7 +730,9 @@ def render(source: str, backend: Optional[str] = None, **opts) -> "DiagramBase":
                  package is installed, also ``'merman'`` /
                  ``'mermaid-rs-renderer'``.
         **opts:  Forwarded to the chosen backend.
-                 'quickjs' / 'v8': theme, config, css
+                 'quickjs' / 'v8': theme, config, css, profile (per-call
+                 counts and timings of the DOM shim's hot spots in
+                 ``d.stats.profile`` -- see mermaidx.stats)
                  mmdr backends: theme, node_spacing, rank_spacing, aspect_ratio
 
     Returns:
@@ -3,8 +3,8 @@ mermaidx.engines.quickjs_engine — mermaid.js running inside QuickJS-ng.
 
 Same public shape as mermaidx.engines.v8_engine on purpose: class name
 `Engine`, exception `MermaidRenderError`, and the same
-start()/close()/started/render_svg() surface. Switching mermaidx.diagram
-between engines is a single import-line change:
+start()/close()/started/render_svg()/render_svg_many() surface.
+Switching mermaidx.diagram between engines is a single import-line change:
 
     from mermaidx.engines.quickjs_engine import Engine, MermaidRenderError
     # vs.
@@ -20,6 +20,8 @@ dependency, so they run entirely inside the JS engine -- no callback needed.
 
 A dedicated single-thread executor owns the QuickJS context, since QuickJS
 contexts are not thread-safe and must always be driven from one thread.
+When the Engine recycles its context (see recycle.py), the replacement
+gets its own new executor thread.
 """
 
 from __future__ import annotations
@@ -28,12 +30,15 @@ import json
 import re
 import sys
 import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 import quickjs
 
+from mermaidx.engines.recycle import RecyclePolicy
+from mermaidx.engines.render_glue import PROFILED_FUNCTIONS, RENDER_GLUE_JS, config_fingerprint, request_fields
 from mermaidx.font_metrics import get_font
 from mermaidx.path_bbox import PATH_BBOX_JS
 
@@ -51,7 +56,7 @@ class MermaidRenderError(RuntimeError):
 class _TextMeasurer:
     """Real font metrics via mermaidx.font_metrics (bundled DejaVu Sans) --
     the same font file resvg is told to use for final rendering, so layout
-    and paint always agree (see Engine._init_context / mermaidx.py)."""
+    and paint always agree (see _Context._init_context / mermaidx.py)."""
 
     def width(self, text, size, family, weight, style) -> float:
         return get_font(weight).measure(text or "", float(size or 16))["width"]
@@ -60,43 +65,53 @@ class _TextMeasurer:
         return get_font(weight).measure(text or "", float(size or 16))
 
 
-class Engine:
+class _Context:
     """
-    One Engine = one QuickJS context with mermaid.js loaded, pinned to one
-    dedicated worker thread. Reused across many renders (loading mermaid.js
-    itself, ~6MB of source, is the expensive part -- do it once).
+    One QuickJS context with mermaid.js loaded, pinned to its own dedicated
+    worker thread -- everything a render needs that must be replaced as a
+    unit when the Engine recycles (see Engine / recycle.py).
     """
 
-    def __init__(self) -> None:
-        self._executor: Optional[ThreadPoolExecutor] = None
-        self._ctx: Optional[quickjs.Context] = None
-        self._measurer: Optional[_TextMeasurer] = None
-        self._render_count = 0
-        self._lock = threading.Lock()
-
-    # -- lifecycle ------------------------------------------------------------
-
-    def start(self) -> None:
-        if self._executor is not None:
-            return
-        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mermaidx-engine")
-        self._executor.submit(self._init_context).result()
+    def __init__(self, measurer: _TextMeasurer, track_heap: bool = False) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mermaidx-engine")
+        self.measurer = measurer
+        self.track_heap = track_heap
+        self.ctx: Optional[quickjs.Context] = None
+        self.render_count = 0
+        # (config JSON, css) last passed to mermaid.initialize() -- a render
+        # with the same fingerprint skips re-initializing (see render_glue.py)
+        self.applied_fingerprint: Optional[tuple] = None
+        self.configure_fn = None
+        self.render_fn = None
+        self.heap_used: Optional[int] = None
+        self.serving_since = time.monotonic()
+        # per-render instrumentation (see mermaidx.stats), reset by each render
+        self.measure_calls = 0
+        self.measure_seconds = 0.0
+
+    def boot(self) -> None:
+        self.executor.submit(self._init_context).result()
+        self.serving_since = time.monotonic()
 
     def close(self) -> None:
-        if self._executor is not None:
-            self._executor.shutdown(wait=True)
-            self._executor = None
-            self._ctx = None
-            self._measurer = None
-
-    @property
-    def started(self) -> bool:
-        return self._executor is not None
+        self.executor.shutdown(wait=True)  # lets any render already queued on it finish
+        self.ctx = None
+        self.configure_fn = None
+        self.render_fn = None
 
     # -- worker-thread-only methods ---------------------------------------
 
+    def _measure(self, method, t, s, f, w, st):
+        start = time.perf_counter()
+        try:
+            return method(t, s, f, w, st)
+        finally:
+            self.measure_calls += 1
+            self.measure_seconds += time.perf_counter() - start
+
     def _init_context(self) -> None:
-        self._measurer = _TextMeasurer()
+        measurer = self.measurer
+        measure = self._measure
         ctx = quickjs.Context()
         ctx.set_memory_limit(512 * 1024 * 1024)
         # NOTE: no ctx.set_time_limit() -- quickjs forbids calling back into
@@ -106,11 +121,11 @@ class Engine:
         ctx.add_callable("__log_raw", lambda s: print(f"[mermaidx/js] {s}", file=sys.stderr))
         ctx.add_callable(
             "__measureText_raw",
-            lambda t, s, f, w, st: self._measurer.width(t, s, f, w, st),
+            lambda t, s, f, w, st: measure(measurer.width, t, s, f, w, st),
         )
         ctx.add_callable(
             "__measureTextFull_raw",
-            lambda t, s, f, w, st: json.dumps(self._measurer.full(t, s, f, w, st)),
+            lambda t, s, f, w, st: json.dumps(measure(measurer.full, t, s, f, w, st)),
         )
 
         ctx.eval(
@@ -127,61 +142,78 @@ class Engine:
             "globalThis.mermaid = (globalThis.__esbuild_esm_mermaid_nm.mermaid.default"
             " || globalThis.__esbuild_esm_mermaid_nm.mermaid);"
         )
-        self._ctx = ctx
-
-    def _pump_jobs(self, stop_when: Optional[str] = None) -> None:
+        ctx.eval(RENDER_GLUE_JS)
+        self.configure_fn = ctx.get("__mermaidxConfigure")
+        self.render_fn = ctx.get("__mermaidxRender")
+        self.profile_start_fn = ctx.get("__mermaidxProfileStart")
+        self.profile_stop_fn = ctx.get("__mermaidxProfileStop")
+        self.ctx = ctx
+
+    def memory(self) -> dict:
+        assert self.ctx is not None
+        return self.ctx.memory()
+
+    def _pump_jobs(self, stop_when: Optional[str] = None) -> int:
         """Drain the Promise/microtask queue. If `stop_when` is a JS boolean
         expression, stop as soon as it's true rather than draining the whole
         job queue. Some diagrams (mindmap, via cytoscape) keep an internal
         render loop scheduled indefinitely via requestAnimationFrame, built
         for a long-lived interactive page, that never naturally empties the
-        job queue on its own in a one-shot headless render."""
-        assert self._ctx is not None
-        for _ in range(_RENDER_TIMEOUT_JOBS):
-            if stop_when is not None and self._ctx.eval(stop_when):
-                return
+        job queue on its own in a one-shot headless render. Returns the
+        number of jobs run."""
+        assert self.ctx is not None
+        for n in range(_RENDER_TIMEOUT_JOBS):
+            if stop_when is not None and self.ctx.eval(stop_when):
+                return n
             try:
-                if not self._ctx.execute_pending_job():
-                    return
+                if not self.ctx.execute_pending_job():
+                    return n
             except StopIteration:
-                return
-
-    def _render_svg_sync(self, code: str, theme: str, config: Optional[dict], css: Optional[str]) -> str:
-        assert self._ctx is not None
-        ctx = self._ctx
-        self._render_count += 1
-        render_id = f"gd{self._render_count}"
-
-        base_config = {"startOnLoad": False, "theme": theme or "default",
-                        "flowchart": {"htmlLabels": False}, "htmlLabels": False}
-        if config:
-            base_config.update(config)
-
-        ctx.eval("__resetDocument();")
-        ctx.set("__config", json.dumps(base_config))
-        ctx.eval("mermaid.initialize(JSON.parse(__config));")
-
-        if css:
-            ctx.set("__css", css)
-            ctx.eval(
-                "(function(){"
-                "  var el = document.getElementById('mermaidx-css') || document.createElement('style');"
-                "  el.setAttribute('id', 'mermaidx-css');"
-                "  el.textContent = __css;"
-                "  document.head.appendChild(el);"
-                "})();"
+                return n
+        return _RENDER_TIMEOUT_JOBS
+
+    def render_svg_sync(
+        self, code: str, theme: str, config: Optional[dict], css: Optional[str], stats: Optional[dict] = None,
+        *, profile: bool = False,
+    ) -> str:
+        assert self.ctx is not None
+        ctx = self.ctx
+        self.render_count += 1
+        render_id = f"gd{self.render_count}"
+        self.measure_calls = 0
+        self.measure_seconds = 0.0
+        phases: dict = {}
+        counters: dict = {}
+
+        try:
+            fingerprint = config_fingerprint(theme, config, css)
+            if fingerprint != self.applied_fingerprint:
+                self.applied_fingerprint = None  # stays unset if initialize() throws
+                start = time.perf_counter()
+                self.configure_fn(*fingerprint)
+                phases["js_initialize"] = time.perf_counter() - start
+                self.applied_fingerprint = fingerprint
+            else:
+                counters["initialize_skipped"] = 1
+            if profile:
+                self.profile_start_fn(",".join(PROFILED_FUNCTIONS))
+            start = time.perf_counter()
+            self.render_fn(render_id, code)
+            counters["job_pump_iterations"] = self._pump_jobs(
+                stop_when="!!globalThis.__renderResult || !!globalThis.__renderError",
             )
-
-        ctx.set("__code", code)
-        ctx.set("__renderId", render_id)
-        ctx.eval(
-            "globalThis.__renderResult = null;\n"
-            "globalThis.__renderError = null;\n"
-            "mermaid.render(__renderId, __code)\n"
-            "  .then(r => { globalThis.__renderResult = r.svg; })\n"
-            "  .catch(e => { globalThis.__renderError = (e && e.name ? e.name+': '+e.message : String(e)); });\n"
-        )
-        self._pump_jobs(stop_when="!!globalThis.__renderResult || !!globalThis.__renderError")
+            phases["js_render"] = time.perf_counter() - start
+        finally:
+            report = json.loads(self.profile_stop_fn()) if profile else None
+            if self.track_heap:
+                self.heap_used = ctx.memory()["memory_used_size"]
+            if stats is not None:
+                phases["measure"] = self.measure_seconds
+                counters["measure_calls"] = self.measure_calls
+                stats["phases"] = phases
+                stats["counters"] = counters
+                if report is not None:
+                    stats["profile"] = report
 
         err = ctx.eval("globalThis.__renderError")
         if err:
@@ -207,9 +239,153 @@ class Engine:
             )
         return svg
 
+    def render_svg_many_sync(self, requests: list, stats: Optional[list] = None) -> list:
+        results = []
+        for i, request in enumerate(requests):
+            code, theme, config, css, profile = request_fields(request)
+            try:
+                results.append(self.render_svg_sync(
+                    code, theme, config, css, stats[i] if stats else None, profile=profile,
+                ))
+            except MermaidRenderError as exc:
+                results.append(exc)
+            except Exception as exc:  # one bad request mustn't lose the batch (as v8's child loop)
+                error = MermaidRenderError(f"{type(exc).__name__}: {exc}")
+                error.__cause__ = exc
+                results.append(error)
+        return results
+
+
+class Engine:
+    """
+    One Engine = one QuickJS context with mermaid.js loaded, pinned to one
+    dedicated worker thread. Reused across many renders (loading mermaid.js
+    itself, ~6MB of source, is the expensive part -- do it once).
+
+    With a `recycle` policy (see recycle.py), once the context reaches one
+    of its limits a fresh one is booted on its own new thread in the
+    background; renders keep going to the old context until the new one is
+    ready, then switch over, and the old one is closed once its last
+    queued render finishes.
+    """
+
+    def __init__(self, *, recycle: Optional[RecyclePolicy] = None) -> None:
+        self._context: Optional[_Context] = None
+        self._measurer = _TextMeasurer()
+        self._recycle = recycle
+        self._recycling = False
+        self._recycles = 0
+        self._lock = threading.Lock()
+
+    # -- lifecycle ------------------------------------------------------------
+
+    def _new_context(self) -> _Context:
+        context = _Context(self._measurer, track_heap=bool(self._recycle and self._recycle.needs_heap))
+        try:
+            context.boot()
+        except BaseException:
+            context.close()
+            raise
+        return context
+
+    def start(self) -> None:
+        if self._context is not None:
+            return
+        self._context = self._new_context()
+
+    def close(self) -> None:
+        with self._lock:
+            context, self._context = self._context, None
+        if context is not None:
+            context.close()
+
+    @property
+    def started(self) -> bool:
+        return self._context is not None
+
+    def _submit(self, fn_name: str, *args, **kwargs) -> tuple:
+        """``(context, future)``: ``context.<fn_name>(*args)`` queued on the
+        active context's thread. Chosen and queued under the lock, so a
+        recycle can't swap the context out and shut its executor down in
+        between -- anything queued before the swap still runs, since the
+        old context's close() waits for its queue to drain."""
+        with self._lock:
+            context = self._context
+            if context is None:
+                raise RuntimeError("Engine is not started.")
+            return context, context.executor.submit(getattr(context, fn_name), *args, **kwargs)
+
+    # -- recycling ------------------------------------------------------------
+
+    def _maybe_recycle(self, context: _Context) -> None:
+        policy = self._recycle
+        if policy is None or self._recycling:
+            return
+        age = time.monotonic() - context.serving_since
+        if not policy.due(context.render_count, context.heap_used, age):
+            return
+        with self._lock:
+            if self._recycling or self._context is not context:
+                return
+            self._recycling = True
+        threading.Thread(
+            target=self._replace_context, args=(context,), name="mermaidx-engine-recycle", daemon=True,
+        ).start()
+
+    def _replace_context(self, old: _Context) -> None:
+        try:
+            new = self._new_context()
+        except Exception:  # keep serving from the old context; retried after the next render
+            with self._lock:
+                self._recycling = False
+            return
+        with self._lock:
+            swapped = self._context is old  # not closed (or replaced) meanwhile
+            if swapped:
+                self._context = new
+                self._recycles += 1
+            self._recycling = False
+        (old if swapped else new).close()
+
+    def heap_stats(self) -> dict:
+        """The active context's numbers that a RecyclePolicy is checked
+        against, plus QuickJS's own memory report (``"engine"``)."""
+        context, future = self._submit("memory")
+        memory = future.result()
+        return {
+            "renders": context.render_count,
+            "age_s": time.monotonic() - context.serving_since,
+            "heap_used_bytes": memory["memory_used_size"],
+            "heap_total_bytes": memory["malloc_size"],
+            "recycles": self._recycles,
+            "engine": memory,
+        }
+
     # -- public, thread-safe entry point ---------------------------------------
 
-    def render_svg(self, code: str, theme: str, config: Optional[dict], css: Optional[str]) -> str:
-        if self._executor is None:
-            raise RuntimeError("Engine is not started.")
-        return self._executor.submit(self._render_svg_sync, code, theme, config, css).result()
+    def render_svg(
+        self, code: str, theme: str, config: Optional[dict], css: Optional[str], stats: Optional[dict] = None,
+        *, profile: bool = False,
+    ) -> str:
+        """Render one diagram. If `stats` is a dict, it's filled in with
+        this render's ``{"phases": ..., "counters": ...}`` (see mermaidx.stats),
+        plus -- with ``profile=True`` -- ``"profile"``: calls and inclusive
+        milliseconds per DOM-shim entry point (see render_glue.py)."""
+        context, future = self._submit("render_svg_sync", code, theme, config, css, stats, profile=profile)
+        try:
+            return future.result()
+        finally:
+            self._maybe_recycle(context)
+
+    def render_svg_many(self, requests, stats: Optional[list] = None) -> list:
+        """Render a batch of ``(code, theme, config, css[, profile])``
+        requests in one hop onto the worker thread. Returns one entry per request, in order:
+        the SVG string, or the MermaidRenderError it failed with (returned,
+        not raised -- same contract as v8_engine.Engine.render_svg_many()).
+        `stats`, if given, is a list of one dict per request, filled in as
+        for render_svg()."""
+        context, future = self._submit("render_svg_many_sync", list(requests), stats)
+        try:
+            return future.result()
+        finally:
+            self._maybe_recycle(context)
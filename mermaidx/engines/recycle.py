@@ -0,0 +1,46 @@
+"""
+mermaidx.engines.recycle -- when to replace a long-lived JS context.
+
+Both engines keep one mermaid.js context alive for the life of the process,
+since loading mermaid.js is the expensive part. In a long-running service
+that context slowly accumulates state no render ever releases (mermaid's
+internal caches, id counters, ...). A RecyclePolicy says when it's time to
+swap in a fresh one; each engine boots the replacement in the background
+and switches over only once it's ready, so recycling never blocks a render.
+Engine.heap_stats() reports the numbers the policy is checked against, to
+help pick the limits.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class RecyclePolicy:
+    """Replace a context once *any* of its limits is reached; a limit left
+    at None is never checked.
+
+    Attributes:
+        max_renders:    Renders served by this context.
+        max_heap_bytes: JS heap in use after a render (QuickJS: memory_used_size,
+                        V8: used_heap_size).
+        max_age_s:      Seconds since this context started serving renders.
+    """
+
+    max_renders: Optional[int] = None
+    max_heap_bytes: Optional[int] = None
+    max_age_s: Optional[float] = None
+
+    @property
+    def needs_heap(self) -> bool:
+        """Whether checking this policy needs the heap size after every render."""
+        return self.max_heap_bytes is not None
+
+    def due(self, renders: int, heap_bytes: Optional[int], age_s: float) -> bool:
+        if self.max_renders is not None and renders >= self.max_renders:
+            return True
+        if self.max_heap_bytes is not None and heap_bytes is not None and heap_bytes >= self.max_heap_bytes:
+            return True
+        return self.max_age_s is not None and age_s >= self.max_age_s
@@ -0,0 +1,118 @@
+"""
+mermaidx.engines.render_glue -- the small bit of JS both engines install
+once at boot to drive mermaid.js, so a render is two function calls with
+plain data arguments rather than freshly formatted JS source to compile.
+
+  - `__mermaidxConfigure(configJson, css)` -- reset the document, run
+    `mermaid.initialize()` and inject the custom CSS. Only needed when the
+    (theme, config, css) fingerprint differs from the previous render's;
+    see `config_fingerprint()`.
+  - `__mermaidxRender(renderId, code)` -- reset the document (keeping the
+    injected CSS) and start `mermaid.render()`, leaving the outcome in
+    `__renderResult` / `__renderError` once its Promise settles.
+  - `__mermaidxProfileStart(names)` / `__mermaidxProfileStop()` -- for a
+    ``profile=True`` render: temporarily wrap the named global shim
+    functions (PROFILED_FUNCTIONS) with a call counter and an inclusive
+    timer, then unwrap them and return the counts as JSON.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Optional
+
+# The DOM shim's hot entry points, plus the text/path measurement hooks
+# every engine installs. All are plain globals that the shim calls by
+# name, so replacing the global is enough to intercept every call.
+PROFILED_FUNCTIONS = (
+    "__computeBBox",
+    "__resolveCssProp",
+    "__querySelector",
+    "__querySelectorAll",
+    "__serialize",
+    "__measureText",
+    "__measureTextFull",
+    "__pathBBox",
+)
+
+RENDER_GLUE_JS = r"""
+globalThis.__mermaidxConfigure = function (configJson, css) {
+  __resetDocument();
+  mermaid.initialize(JSON.parse(configJson));
+  if (css) {
+    var el = document.createElement('style');
+    el.setAttribute('id', 'mermaidx-css');
+    el.textContent = css;
+    document.head.appendChild(el);
+  }
+};
+
+globalThis.__mermaidxRender = function (renderId, code) {
+  __resetDocument(true);
+  globalThis.__renderResult = null;
+  globalThis.__renderError = null;
+  mermaid.render(renderId, code)
+    .then(r => { globalThis.__renderResult = r.svg; })
+    .catch(e => { globalThis.__renderError = (e && e.name ? e.name + ": " + e.message : String(e)); });
+};
+
+// Recursive calls (__serialize, __querySelectorAll's walk) are counted
+// every time but only timed at the outermost level, so time isn't counted
+// twice. Times are inclusive: a __computeBBox's time includes the
+// __measureTextFull calls it makes.
+globalThis.__mermaidxProfileStart = function (names) {
+  const now = globalThis.__hrNow;
+  const stats = {}, originals = {};
+  for (const name of names.split(",")) {
+    const fn = globalThis[name];
+    if (typeof fn !== "function") continue;
+    const s = stats[name] = { calls: 0, ms: 0, depth: 0 };
+    originals[name] = fn;
+    globalThis[name] = function () {
+      s.calls++;
+      if (s.depth++) {
+        try { return fn.apply(this, arguments); } finally { s.depth--; }
+      }
+      const t0 = now();
+      try { return fn.apply(this, arguments); } finally { s.depth--; s.ms += now() - t0; }
+    };
+  }
+  globalThis.__mermaidxProfile = { stats, originals };
+};
+
+globalThis.__mermaidxProfileStop = function () {
+  const p = globalThis.__mermaidxProfile;
+  globalThis.__mermaidxProfile = null;
+  const out = {};
+  if (!p) return JSON.stringify(out);
+  for (const name in p.originals) globalThis[name] = p.originals[name];
+  for (const name in p.stats) out[name] = { calls: p.stats[name].calls, ms: p.stats[name].ms };
+  return JSON.stringify(out);
+};
+"""
+
+
+def request_fields(request: tuple) -> tuple:
+    """``(code, theme, config, css, profile)`` from a render_svg_many()
+    request -- ``(code, theme, config, css)``, optionally followed by a
+    ``profile`` flag."""
+    code, theme, config, css, *rest = request
+    return code, theme, config, css, bool(rest and rest[0])
+
+
+def mermaid_config(theme: str, config: Optional[dict]) -> dict:
+    """The full config handed to `mermaid.initialize()`: mermaidx's fixed
+    defaults (native SVG text labels -- resvg can't render foreignObject
+    HTML), the theme, then the caller's own overrides on top."""
+    base_config = {"startOnLoad": False, "theme": theme or "default",
+                   "flowchart": {"htmlLabels": False}, "htmlLabels": False}
+    if config:
+        base_config.update(config)
+    return base_config
+
+
+def config_fingerprint(theme: str, config: Optional[dict], css: Optional[str]) -> tuple:
+    """``(config_json, css)`` -- equal for two renders exactly when the
+    second can skip `__mermaidxConfigure()`. The JSON is also what gets
+    passed to it, so it's only ever computed once per render."""
+    return json.dumps(mermaid_config(theme, config), sort_keys=True), css or None
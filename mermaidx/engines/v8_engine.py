@@ -4,8 +4,8 @@ mermaidx.engines.v8_engine -- mermaid.js running inside real V8 (via the
 
 Same public shape as mermaidx.engines.quickjs_engine on purpose: class name
 `Engine`, exception `MermaidRenderError`, and the same
-start()/close()/started/render_svg() surface. Switching mermaidx.diagram
-between engines is a single import-line change:
+start()/close()/started/render_svg()/render_svg_many() surface.
+Switching mermaidx.diagram between engines is a single import-line change:
 
     from mermaidx.engines.quickjs_engine import Engine, MermaidRenderError
     # vs.
@@ -65,8 +65,9 @@ unconditionally (`SIGKILL`, which cannot be blocked or ignored) and is
 guaranteed to reclaim 100% of its memory immediately, no matter what state
 it was stuck in. So the V8 isolate lives in a child process instead of a
 thread; on timeout, that child is killed outright (not asked to stop) and
-a fresh one is spawned for the next render. A killed render still raises
-in the caller, exactly as before, but nothing is leaked afterward.
+a pre-booted standby child takes over for the next render (see Engine's
+"warm spare"). A killed render still raises in the caller, exactly as
+before, but nothing is leaked afterward.
 
 The child is started via the `spawn` method (a fresh interpreter), not
 `fork` -- V8 is documented as unsafe to fork after initialization, and
@@ -77,14 +78,21 @@ of that. `spawn` avoids both.
 
 from __future__ import annotations
 
+import itertools
 import json
 import multiprocessing as mp
+import os
+import queue
 import re
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
+from mermaidx.engines.recycle import RecyclePolicy
+from mermaidx.engines.render_glue import PROFILED_FUNCTIONS, RENDER_GLUE_JS, config_fingerprint, request_fields
 from mermaidx.font_metrics import get_font
 from mermaidx.path_bbox import PATH_BBOX_JS
 
@@ -142,7 +150,10 @@ def _measure_text_js() -> str:
     return FONTS.regular;
   }}
 
+  let calls = 0;
+
   function measureFull(text, size, family, weight, style) {{
+    calls++;
     const font = pickFont(weight);
     const s = text == null ? "" : String(text);
     let totalUnits = 0;
@@ -162,6 +173,8 @@ def _measure_text_js() -> str:
 
   globalThis.__measureTextFull = measureFull;
   globalThis.__measureText = (t, s, f, w, st) => measureFull(t, s, f, w, st).width;
+  // measure-call count since the last call (see mermaidx.stats)
+  globalThis.__takeMeasureCalls = () => {{ const n = calls; calls = 0; return n; }};
 }})();
 """
 
@@ -186,58 +199,82 @@ def _build_context():
         "globalThis.mermaid = (globalThis.__esbuild_esm_mermaid_nm.mermaid.default"
         " || globalThis.__esbuild_esm_mermaid_nm.mermaid);"
     )
+    ctx.eval(RENDER_GLUE_JS)
     return ctx
 
 
-def _render_svg_sync(ctx, render_count: int, code: str, theme: str,
-                      config: Optional[dict], css: Optional[str]) -> str:
-    render_id = f"gd{render_count}"
-
-    base_config = {"startOnLoad": False, "theme": theme or "default",
-                    "flowchart": {"htmlLabels": False}, "htmlLabels": False}
-    if config:
-        base_config.update(config)
-
-    ctx.eval('if (typeof __resetDocument === "function") { __resetDocument(); }')
-    ctx.eval(f"mermaid.initialize({json.dumps(base_config)});")
-
-    if css:
-        ctx.eval(f"globalThis.__css = {json.dumps(css)};")
-        ctx.eval(
-            "(function(){"
-            "  var el = document.getElementById('mermaidx-css') || document.createElement('style');"
-            "  el.setAttribute('id', 'mermaidx-css');"
-            "  el.textContent = __css;"
-            "  document.head.appendChild(el);"
-            "})();"
-        )
-
-    ctx.eval("globalThis.__renderResult = null; globalThis.__renderError = null;")
-    ctx.eval(
-        f"""
-mermaid.render({json.dumps(render_id)}, {json.dumps(code)})
-  .then(r => {{ globalThis.__renderResult = r.svg; }})
-  .catch(e => {{ globalThis.__renderError = (e && e.name ? e.name + ": " + e.message : String(e)); }});
-"""
-    )
-
-    err = ctx.eval("globalThis.__renderError")
-    if err:
-        raise MermaidRenderError(str(err))
-    svg = ctx.eval("globalThis.__renderResult")
-    if not svg:
-        raise MermaidRenderError("mermaid.render() produced no output (unknown error)")
-    svg = str(svg)
-    # Same mindmap centering patch as quickjs_engine.py -- see there for
-    # why this is needed (mermaid's own dead CSS rule for this class).
-    if "<style" in svg and "section-root" in svg:
-        svg = re.sub(
-            r"(<style[^>]*>)",
-            r"\1.section-root .label text{text-anchor:middle;}",
-            svg,
-            count=1,
-        )
-    return svg
+class _ChildRenderer:
+    """The child process's side of one V8 isolate: the context, handles to
+    the render glue functions (see render_glue.py -- called with plain data
+    arguments, not formatted into JS source), and the (theme, config, css)
+    fingerprint last applied via mermaid.initialize(), so a render with the
+    same one skips re-initializing."""
+
+    def __init__(self, ctx) -> None:
+        self.ctx = ctx
+        self.render_count = 0
+        self.applied_fingerprint: Optional[tuple] = None
+        self._configure = ctx.eval("__mermaidxConfigure")
+        self._render = ctx.eval("__mermaidxRender")
+        self._take_measure_calls = ctx.eval("__takeMeasureCalls")
+        self._profile_start = ctx.eval("__mermaidxProfileStart")
+        self._profile_stop = ctx.eval("__mermaidxProfileStop")
+        self.stats: dict = {}  # the last render's phases/counters (see mermaidx.stats)
+
+    def render_svg(
+        self, code: str, theme: str, config: Optional[dict], css: Optional[str], *, profile: bool = False,
+    ) -> str:
+        ctx = self.ctx
+        self.render_count += 1
+        render_id = f"gd{self.render_count}"
+        phases: dict = {}
+        counters: dict = {}
+        self.stats = {"phases": phases, "counters": counters}
+        self._take_measure_calls()
+
+        fingerprint = config_fingerprint(theme, config, css)
+        if fingerprint != self.applied_fingerprint:
+            self.applied_fingerprint = None  # stays unset if initialize() throws
+            start = time.perf_counter()
+            self._configure(*fingerprint)
+            phases["js_initialize"] = time.perf_counter() - start
+            self.applied_fingerprint = fingerprint
+        else:
+            counters["initialize_skipped"] = 1
+        if profile:
+            self._profile_start(",".join(PROFILED_FUNCTIONS))
+        start = time.perf_counter()
+        try:
+            self._render(render_id, code)
+            # The call can return while the render's Promise chain is still
+            # running; the next call into the isolate waits for it to drain,
+            # so it belongs inside the timed span.
+            counters["measure_calls"] = self._take_measure_calls()
+            phases["js_render"] = time.perf_counter() - start
+        finally:
+            if profile:
+                # V8 here has no sub-millisecond clock (see dom_shim.js'
+                # __hrNow): per-call times are 0 or 1ms, but their sums over
+                # many calls are still fair estimates.
+                self.stats["profile"] = json.loads(self._profile_stop())
+
+        err = ctx.eval("globalThis.__renderError")
+        if err:
+            raise MermaidRenderError(str(err))
+        svg = ctx.eval("globalThis.__renderResult")
+        if not svg:
+            raise MermaidRenderError("mermaid.render() produced no output (unknown error)")
+        svg = str(svg)
+        # Same mindmap centering patch as quickjs_engine.py -- see there for
+        # why this is needed (mermaid's own dead CSS rule for this class).
+        if "<style" in svg and "section-root" in svg:
+            svg = re.sub(
+                r"(<style[^>]*>)",
+                r"\1.section-root .label text{text-anchor:middle;}",
+                svg,
+                count=1,
+            )
+        return svg
 
 
 def _child_main(conn) -> None:
@@ -248,15 +285,23 @@ def _child_main(conn) -> None:
     normally except on shutdown -- if this hangs, the parent's only
     recourse is killing the process outright (see module docstring), which
     is exactly the point: nothing in here needs to handle that gracefully.
+
+    Protocol: each message from the parent is a *list* of
+    ``(request_id, code, theme, config, css[, profile])`` requests -- one message can
+    carry a whole batch -- and every request gets its own
+    ``(request_id, status, payload)`` reply as soon as it finishes, in
+    order, so the parent can match results to requests by id. Each reply
+    also carries the isolate's heap statistics right after that render, for
+    the parent's RecyclePolicy and Engine.heap_stats(), and that render's
+    phase timings/counters (see mermaidx.stats).
     """
     try:
-        ctx = _build_context()
+        renderer = _ChildRenderer(_build_context())
         conn.send(("ready", None))
-    except Exception as exc:  # noqa: BLE001 -- report *any* boot failure to the parent
+    except Exception as exc:  # report *any* boot failure to the parent
         conn.send(("boot_error", f"{type(exc).__name__}: {exc}"))
         return
 
-    render_count = 0
     while True:
         try:
             msg = conn.recv()
@@ -265,15 +310,55 @@ def _child_main(conn) -> None:
         if msg is None:  # shutdown sentinel
             return
 
-        render_count += 1
-        code, theme, config, css = msg
-        try:
-            svg = _render_svg_sync(ctx, render_count, code, theme, config, css)
-            conn.send(("ok", svg))
-        except MermaidRenderError as exc:
-            conn.send(("render_error", str(exc)))
-        except Exception as exc:  # noqa: BLE001 -- report *any* other failure to the parent
-            conn.send(("render_error", f"{type(exc).__name__}: {exc}"))
+        for request_id, *request in msg:
+            code, theme, config, css, profile = request_fields(request)
+            try:
+                reply = ("ok", renderer.render_svg(code, theme, config, css, profile=profile))
+            except MermaidRenderError as exc:
+                reply = ("render_error", str(exc))
+            except Exception as exc:  # report *any* other failure to the parent
+                reply = ("render_error", f"{type(exc).__name__}: {exc}")
+            conn.send((request_id, *reply, renderer.ctx.heap_stats(), renderer.stats))
+
+
+def _boot_child(timeout_ms: int):
+    """Spawns one child process and waits for it to finish loading
+    mermaid.js. Returns its ``(process, parent_conn)`` pair, or raises
+    MermaidRenderError (after killing it) if it doesn't come up in time."""
+    parent_conn, child_conn = _MP_CONTEXT.Pipe()
+    process = _MP_CONTEXT.Process(target=_child_main, args=(child_conn,), daemon=True)
+    process.start()
+    child_conn.close()  # only the child needs its end
+
+    # Booting -- loading mermaid.js -- can itself take a moment; give it
+    # the same generous timeout as a render, rather than a separate one.
+    if not parent_conn.poll(timeout=timeout_ms / 1000):
+        process.kill()
+        process.join(timeout=2)
+        parent_conn.close()
+        raise MermaidRenderError(f"V8 engine failed to boot within {timeout_ms}ms.")
+    status, payload = parent_conn.recv()
+    if status != "ready":
+        process.kill()
+        process.join(timeout=2)
+        parent_conn.close()
+        raise MermaidRenderError(f"V8 engine failed to boot: {payload}")
+    return process, parent_conn
+
+
+def _stop_child(process, conn) -> None:
+    """Asks a child to exit, then SIGKILLs it if it doesn't within 2s."""
+    try:
+        if conn is not None:
+            conn.send(None)  # ask nicely first
+        process.join(timeout=2)
+    except Exception:  # best-effort; kill below covers any failure
+        pass
+    if process.is_alive():
+        process.kill()  # SIGKILL -- guaranteed, immediate, no leak
+        process.join(timeout=2)
+    if conn is not None:
+        conn.close()
 
 
 class Engine:
@@ -283,115 +368,427 @@ class Engine:
     start()/close()/started/render_svg() surface as
     quickjs_engine.Engine -- diagram.py doesn't need to know which one it
     has.
+
+    Warm spare: killing a stuck child is instant, but booting its
+    replacement (loading ~6MB of mermaid.js into a fresh isolate) is not.
+    So by default the Engine also keeps a second, idle child booted in the
+    background. When the active child is killed (timeout) or dies on its
+    own, the spare is promoted in its place immediately and a new spare is
+    booted on a background thread -- neither the failed render nor the
+    next one waits for a mermaid.js load. Pass ``warm_spare=False`` to
+    trade that latency back for the spare's memory (one more idle isolate):
+    a killed child's replacement then starts booting right after the kill,
+    and the next render waits for whatever is left of that boot.
+
+    Recycling: with a `recycle` policy (see recycle.py), once the active
+    child reaches one of its limits the next render is served by a fresh
+    child instead -- the warm spare if there is one, otherwise a
+    replacement booted in the background while the old child keeps
+    serving -- and the old child is shut down off the render path.
     """
 
-    def __init__(self, render_timeout_ms: int = _DEFAULT_RENDER_TIMEOUT_MS) -> None:
+    def __init__(
+        self,
+        render_timeout_ms: int = _DEFAULT_RENDER_TIMEOUT_MS,
+        *,
+        warm_spare: bool = True,
+        recycle: Optional[RecyclePolicy] = None,
+    ) -> None:
         self._process: Optional[mp.process.BaseProcess] = None
         self._parent_conn = None
         self._render_timeout_ms = render_timeout_ms
+        self._warm_spare = warm_spare
+        self._recycle = recycle
+        self._recycle_pending = False
+        self._recycles = 0
+        # the active child's numbers, for the recycle policy / heap_stats()
+        self._serving_since = time.monotonic()
+        self._served = 0
+        self._heap: Optional[dict] = None
+        self._spare: Optional[tuple] = None  # (process, conn), booted and idle
+        self._spare_thread: Optional[threading.Thread] = None
+        self._started = False
+        self._request_ids = itertools.count(1)
+        self._request_lock = threading.Lock()
         self._lock = threading.Lock()
 
     # -- lifecycle ------------------------------------------------------------
 
     def start(self) -> None:
-        if self._process is not None:
+        if self._started:
             return
-        self._spawn()
-
-    def _spawn(self) -> None:
-        parent_conn, child_conn = _MP_CONTEXT.Pipe()
-        process = _MP_CONTEXT.Process(target=_child_main, args=(child_conn,), daemon=True)
-        process.start()
-        child_conn.close()  # only the child needs its end
-
-        # Booting -- loading mermaid.js -- can itself take a moment; give it
-        # the same generous timeout as a render, rather than a separate one.
-        if not parent_conn.poll(timeout=self._render_timeout_ms / 1000):
-            process.kill()
-            raise MermaidRenderError(
-                f"V8 engine failed to boot within {self._render_timeout_ms}ms."
+        self._activate(_boot_child(self._render_timeout_ms))
+        self._started = True
+        self._start_spare()
+
+    def _activate(self, child: tuple) -> None:
+        """Make `child` the active (process, conn). Caller holds _lock (or
+        is start(), before any render can run)."""
+        self._process, self._parent_conn = child
+        self._serving_since = time.monotonic()
+        self._served = 0
+        self._heap = None
+
+    def _start_spare(self, *, force: bool = False) -> None:
+        """Boot a standby child on a background thread, unless one is
+        already booted or booting (or spares are disabled and this isn't
+        a `force`d boot for a recycle)."""
+        if not (self._warm_spare or force):
+            return
+        with self._lock:
+            if not self._started or self._spare is not None:
+                return
+            if self._spare_thread is not None and self._spare_thread.is_alive():
+                return
+            self._spare_thread = threading.Thread(
+                target=self._boot_spare, name="mermaidx-v8-spare", daemon=True,
             )
-        status, payload = parent_conn.recv()
-        if status != "ready":
-            process.kill()
-            raise MermaidRenderError(f"V8 engine failed to boot: {payload}")
+            self._spare_thread.start()
 
-        self._process = process
-        self._parent_conn = parent_conn
+    def _boot_spare(self) -> None:
+        try:
+            child = _boot_child(self._render_timeout_ms)
+        except MermaidRenderError:
+            return  # the next promotion falls back to a synchronous boot
+        with self._lock:
+            if self._started and self._spare is None:
+                self._spare, child = child, None
+        if child is not None:  # engine was closed while this one booted
+            _stop_child(*child)
+
+    def _promote(self, dead_process) -> None:
+        """Replace `dead_process` (already killed/exited) as the active
+        child: with the warm spare if one is ready, otherwise leave the slot
+        empty for _ensure_child() to fill. Either way, start booting the
+        next child in the background -- even without warm spares, as the
+        replacement for a dead one (``_promote(None)`` from _ensure_child()
+        has no dead child to replace)."""
+        with self._lock:
+            if self._process is dead_process:  # don't clobber a respawn done by another thread
+                self._process = None
+                self._parent_conn = None
+                if self._spare is not None:
+                    self._activate(self._spare)
+                    self._spare = None
+        self._start_spare(force=self._recycle_pending or dead_process is not None)
+
+    def _ensure_child(self) -> tuple:
+        """The active (process, conn) -- if the last one was killed before a
+        spare was ready, wait for the spare that's booting (or boot one here
+        if spares are disabled). Also where a pending recycle happens, once
+        its replacement is ready."""
+        retired = None
+        with self._lock:
+            if self._recycle_pending and self._spare is not None and self._process is not None:
+                retired = (self._process, self._parent_conn)
+                self._activate(self._spare)
+                self._spare = None
+                self._recycle_pending = False
+                self._recycles += 1
+            process, conn = self._process, self._parent_conn
+            spare_thread = self._spare_thread
+        if retired is not None:
+            # shut the old child down off the render path
+            threading.Thread(target=_stop_child, args=retired, name="mermaidx-v8-retire", daemon=True).start()
+            self._start_spare()
+        if process is not None or not self._started:
+            return process, conn
+        if spare_thread is not None:
+            spare_thread.join()
+            self._promote(None)
+            with self._lock:
+                process, conn = self._process, self._parent_conn
+            if process is not None:
+                return process, conn
+        child = _boot_child(self._render_timeout_ms)
+        with self._lock:
+            if self._process is None:
+                self._activate(child)
+                child = None
+            process, conn = self._process, self._parent_conn
+        if child is not None:
+            _stop_child(*child)
+        return process, conn
 
     def close(self) -> None:
         with self._lock:
+            self._started = False
             process, self._process = self._process, None
             conn, self._parent_conn = self._parent_conn, None
-        if process is None:
-            return
-        try:
-            if conn is not None:
-                conn.send(None)  # ask nicely first
-            process.join(timeout=2)
-        except Exception:  # noqa: BLE001 -- best-effort; kill below covers any failure
-            pass
-        if process.is_alive():
-            process.kill()  # SIGKILL -- guaranteed, immediate, no leak
-            process.join(timeout=2)
-        if conn is not None:
-            conn.close()
+            spare, self._spare = self._spare, None
+            spare_thread = self._spare_thread
+        if spare_thread is not None:
+            # a spare still booting kills itself once it sees _started is False
+            spare_thread.join(timeout=self._render_timeout_ms / 1000)
+        if spare is not None:
+            _stop_child(*spare)
+        if process is not None:
+            _stop_child(process, conn)
 
     @property
     def started(self) -> bool:
-        return self._process is not None
+        return self._started
 
     # -- public, thread-safe entry point ---------------------------------------
 
-    def render_svg(self, code: str, theme: str, config: Optional[dict], css: Optional[str]) -> str:
+    def render_svg(
+        self, code: str, theme: str, config: Optional[dict], css: Optional[str], stats: Optional[dict] = None,
+        *, profile: bool = False,
+    ) -> str:
         """
         Sends the render to the child process and waits for a reply, with
         a timeout. A diagram whose JS never stops scheduling work (e.g.
         mindmap -- see module docstring) means no reply ever comes; when
         that happens, the child is killed outright (SIGKILL -- the OS
-        reclaims all of its memory immediately, unconditionally) and a
-        fresh one is spawned for the next call. The current call still
-        raises, but nothing is left behind afterward -- unlike the
+        reclaims all of its memory immediately, unconditionally) and the
+        warm spare takes its place for the next call. The current call
+        still raises, but nothing is left behind afterward -- unlike the
         thread-based approach this replaced, which had to choose between
         hanging forever or leaking the isolate permanently.
+
+        If `stats` is a dict, it's filled in with this render's
+        ``{"phases": ..., "counters": ...}`` as measured inside the child
+        (see mermaidx.stats), plus ``"profile"`` with ``profile=True`` (see
+        quickjs_engine.Engine.render_svg()).
         """
-        with self._lock:
-            process, conn = self._process, self._parent_conn
+        (result,) = self.render_svg_many([(code, theme, config, css, profile)], None if stats is None else [stats])
+        if isinstance(result, MermaidRenderError):
+            raise result
+        return result
+
+    def render_svg_many(self, requests, stats: Optional[list] = None) -> list:
+        """
+        Render a batch of ``(code, theme, config, css[, profile])`` requests, shipped
+        to the child in a single message instead of one round trip each --
+        for small diagrams the pickling and pipe syscalls dominate, so
+        this is where a batch wins.
+
+        Returns one entry per request, in order: the SVG string, or the
+        MermaidRenderError that request failed with (returned, not raised,
+        so one bad diagram doesn't cost the rest of the batch). Timeouts
+        are per request, exactly as in render_svg(): a stuck request kills
+        the child, and the requests queued behind it are re-sent to its
+        replacement. `stats`, if given, is a list of one dict per request,
+        filled in as for render_svg().
+        """
+        requests = list(requests)
+        if not self._started:
+            raise RuntimeError("Engine is not started.")
+        results: list = [None] * len(requests)
+        pending = list(range(len(requests)))
+        with self._request_lock:  # one batch in flight per child at a time
+            while pending:
+                pending = self._send_batch(requests, pending, results, stats)
+        self._maybe_recycle()
+        return results
+
+    def _maybe_recycle(self) -> None:
+        policy = self._recycle
+        if policy is None or self._recycle_pending:
+            return
+        heap = self._heap or {}
+        age = time.monotonic() - self._serving_since
+        if policy.due(self._served, heap.get("used_heap_size"), age):
+            self._recycle_pending = True
+            self._start_spare(force=True)
+
+    def heap_stats(self) -> dict:
+        """The active child's numbers that a RecyclePolicy is checked
+        against, plus V8's own heap statistics (``"engine"``) as of its
+        last reply -- heap values are None before its first render."""
+        if not self._started:
+            raise RuntimeError("Engine is not started.")
+        heap = self._heap
+        return {
+            "renders": self._served,
+            "age_s": time.monotonic() - self._serving_since,
+            "heap_used_bytes": heap["used_heap_size"] if heap else None,
+            "heap_total_bytes": heap["total_heap_size"] if heap else None,
+            "recycles": self._recycles,
+            "engine": heap,
+        }
+
+    def _send_batch(self, requests: list, pending: list, results: list, stats: Optional[list]) -> list:
+        """Sends requests[i] for every i in `pending` to the active child
+        and fills `results` from its replies, matched by request id.
+        Returns the indices still unanswered if the child had to be killed
+        (or died) part-way through -- the caller re-sends those."""
+        process, conn = self._ensure_child()
         if process is None or conn is None:
             raise RuntimeError("Engine is not started.")
 
-        conn.send((code, theme, config, css))
-        if not conn.poll(timeout=self._render_timeout_ms / 1000):
-            with self._lock:
-                if self._process is process:  # don't clobber a respawn done by another thread
-                    self._process = None
-                    self._parent_conn = None
-            process.kill()  # SIGKILL: guaranteed to free 100% of this process's memory
-            process.join(timeout=2)
-            conn.close()
-            self.start()  # fresh child for subsequent calls
-            raise MermaidRenderError(
-                f"Render exceeded {self._render_timeout_ms}ms and was killed "
-                "(this diagram's JS never stopped scheduling work -- see "
-                "engines/v8_engine.py's module docstring for why). A fresh V8 "
-                "engine has been started for subsequent renders; no memory was "
-                "leaked by this one. Use backend=\"quickjs\" for this diagram."
-            )
+        outstanding = {}
+        batch = []
+        for i in pending:
+            request_id = next(self._request_ids)
+            outstanding[request_id] = i
+            batch.append((request_id, *requests[i]))
+        conn.send(batch)
+
+        while outstanding:
+            # the child answers in order, so the oldest outstanding request
+            # is the one it's working on right now
+            current = min(outstanding)
+            if not conn.poll(timeout=self._render_timeout_ms / 1000):
+                process.kill()  # SIGKILL: guaranteed to free 100% of this process's memory
+                process.join(timeout=2)
+                conn.close()
+                self._promote(process)  # warm spare in, fresh spare booting in the background
+                results[outstanding.pop(current)] = MermaidRenderError(
+                    f"Render exceeded {self._render_timeout_ms}ms and was killed "
+                    "(this diagram's JS never stopped scheduling work -- see "
+                    "engines/v8_engine.py's module docstring for why). A fresh V8 "
+                    "engine has been started for subsequent renders; no memory was "
+                    "leaked by this one. Use backend=\"quickjs\" for this diagram."
+                )
+                return sorted(outstanding.values())
+
+            try:
+                request_id, status, payload, heap, render_stats = conn.recv()
+            except (EOFError, OSError) as exc:
+                # The child died on its own (e.g. crashed) rather than just
+                # hanging -- same recovery as the timeout case above.
+                process.join(timeout=2)
+                conn.close()
+                self._promote(process)
+                err = MermaidRenderError("The V8 engine process died unexpectedly.")
+                err.__cause__ = exc
+                results[outstanding.pop(current)] = err
+                return sorted(outstanding.values())
+
+            i = outstanding.pop(request_id, None)
+            if i is None:
+                continue  # not one of ours -- ignore
+            self._served += 1
+            self._heap = heap
+            if stats is not None:
+                stats[i].update(render_stats)
+            results[i] = payload if status == "ok" else MermaidRenderError(payload)
+        return []
+
+
+_CLOSED = object()  # EnginePool's queue marker for "closed"
+
+
+class EnginePool:
+    """
+    N independent Engines -- N child processes, each with its own V8
+    isolate and its own pipe -- behind the same start()/close()/started/
+    render_svg() surface as a single Engine.
+
+    One Engine serves one render at a time, so a multithreaded caller
+    sharing it gets single-core throughput. The pool hands each render_svg()
+    call to whichever child is idle (blocking only if all N are busy), so N
+    threads can keep N cores busy. Because V8 already lives out of process,
+    this needs no worker processes of our own -- unlike mermaidx.pool's
+    render_many(), it works for any caller, not just a batch known up front.
+
+    Timeouts, kills and crash recovery are per child and unchanged: a stuck
+    render kills only its own child, while the rest of the pool keeps
+    serving. Members don't keep a warm spare each by default
+    (``warm_spare=False``) -- that would double the pool's memory. Instead
+    a killed child's replacement starts booting in the background right
+    after the kill. The member goes back into the idle queue meanwhile, so
+    the render that next gets it waits for the rest of that boot; pass
+    ``warm_spare=True`` to hide the respawn completely.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        render_timeout_ms: int = _DEFAULT_RENDER_TIMEOUT_MS,
+        *,
+        warm_spare: bool = False,
+        recycle: Optional[RecyclePolicy] = None,
+    ) -> None:
+        self._size = max(1, size or os.cpu_count() or 1)
+        self._engines = [
+            Engine(render_timeout_ms, warm_spare=warm_spare, recycle=recycle) for _ in range(self._size)
+        ]
+        self._idle: queue.Queue = queue.Queue()
+        self._started = False
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    # -- lifecycle ------------------------------------------------------------
 
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            # boot every child concurrently -- each one mostly waits on its
+            # own process loading mermaid.js
+            with ThreadPoolExecutor(max_workers=self._size) as boot:
+                list(boot.map(lambda e: e.start(), self._engines))
+            # Drop the last close()'s sentinel and any engine handed back since.
+            while not self._idle.empty():
+                self._idle.get_nowait()
+            for e in self._engines:
+                self._idle.put(e)
+            self._started = True
+
+    def close(self) -> None:
+        with self._lock:
+            self._started = False
+            for e in self._engines:
+                e.close()
+            self._idle.put(_CLOSED)  # wakes a blocked _acquire(), which passes it on
+
+    def _acquire(self) -> "Engine":
+        """An idle child, blocking while all are busy. Raises once the pool
+        is closed -- also in threads already waiting when it was."""
+        if not self._started:
+            raise RuntimeError("Engine is not started.")
+        engine = self._idle.get()
+        if engine is _CLOSED or not self._started:
+            self._idle.put(engine)
+            raise RuntimeError("Engine is not started.")
+        return engine
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def heap_stats(self) -> list:
+        """Engine.heap_stats() for every child in the pool."""
+        return [e.heap_stats() for e in self._engines]
+
+    # -- public, thread-safe entry point ---------------------------------------
+
+    def render_svg(
+        self, code: str, theme: str, config: Optional[dict], css: Optional[str], stats: Optional[dict] = None,
+        *, profile: bool = False,
+    ) -> str:
+        engine = self._acquire()
         try:
-            status, payload = conn.recv()
-        except (EOFError, OSError) as exc:
-            # The child died on its own (e.g. crashed) rather than just
-            # hanging -- same recovery as the timeout case above.
-            with self._lock:
-                if self._process is process:
-                    self._process = None
-                    self._parent_conn = None
-            process.join(timeout=2)
-            conn.close()
-            self.start()
-            raise MermaidRenderError("The V8 engine process died unexpectedly.") from exc
-
-        if status == "ok":
-            return payload
-        raise MermaidRenderError(payload)
+            return engine.render_svg(code, theme, config, css, stats, profile=profile)
+        finally:
+            self._idle.put(engine)
+
+    def render_svg_many(self, requests, stats: Optional[list] = None) -> list:
+        """Like Engine.render_svg_many(), but the batch is split into one
+        contiguous chunk per child and the chunks run concurrently."""
+        requests = list(requests)
+        if not self._started:
+            raise RuntimeError("Engine is not started.")
+        if not requests:
+            return []
+        n = min(self._size, len(requests))
+        step = -(-len(requests) // n)  # ceil division
+        chunks = [
+            (requests[k:k + step], None if stats is None else stats[k:k + step])
+            for k in range(0, len(requests), step)
+        ]
+
+        def run(chunk: tuple) -> list:
+            engine = self._acquire()
+            try:
+                return engine.render_svg_many(*chunk)
+            finally:
+                self._idle.put(engine)
+
+        with ThreadPoolExecutor(max_workers=len(chunks)) as ex:
+            return [r for chunk_results in ex.map(run, chunks) for r in chunk_results]
@@ -21,15 +21,36 @@ registering it as a base64 @font-face under the *same* family name(s) the
 diagram's own CSS already requests. Browsers prefer a matching @font-face
 over any system substitution, so this doesn't require touching mermaid's
 CSS at all -- it just wins the lookup mermaid already asks for.
+
+Subsetting is the expensive part (a few hundred ms per font with
+fontTools), and a docs site embedding fonts in every SVG asks for the same
+few character sets over and over. So:
+
+  - the font files are read once per process, and every subset is
+    memoized (LRU) by (weight, character set);
+  - by default (``subset="latin-1"``) a diagram whose text is all Latin-1
+    -- nearly every one -- gets one shared subset of the whole Latin-1
+    range per weight, made once per process, instead of a subset of its
+    own. Bigger (~45 KB of base64 vs ~9 KB for a typical label set) but
+    then free; ``subset="exact"`` embeds only the glyphs used.
+
+A batch of SVGs served together (a docs site, ``embed_font="external"`` in
+batch.convert() / markdown.render_markdown()) shouldn't carry N copies of
+the same font at all: write_font_files() writes one subset per weight --
+of the union of every diagram's characters -- as a WOFF2/WOFF file, and
+link_dejavu_font() adds @font-face rules that point at it by URL.
 """
 
 from __future__ import annotations
 
 import base64
+import functools
+import html
 import io
 import re
-import xml.etree.ElementTree as ET
+import urllib.parse
 from pathlib import Path
+from typing import Iterable, Optional
 
 _ASSETS_FONTS = Path(__file__).parent / "assets" / "fonts"
 
@@ -37,58 +58,74 @@ _FONT_FILES = {"regular": "DejaVuSans.ttf", "bold": "DejaVuSans-Bold.ttf"}
 _CSS_WEIGHT = {"regular": "normal", "bold": "bold"}
 
 _SVG_OPEN_TAG = re.compile(r"<svg\b[^>]*>")
-_FONT_FAMILY_DECL = re.compile(r"font-family\s*:\s*([^;}\"']+|\"[^\"]*\"|'[^']*')")
-_BOLD_WEIGHT = re.compile(r"font-weight\s*:\s*(bold|bolder|[6-9]\d\d)\b", re.IGNORECASE)
+_FONT_DECLARATION = re.compile(
+    r"font-(?:family\s*:\s*(?P<family>(?:&#?\w+;|&|[^;}<>\"'&])+|\"[^\"]*\"|'[^']*')"
+    r"|weight\s*:\s*(?P<bold>(?i:bold|bolder)|[6-9]\d\d)\b)"
+)
+_TEXT_RUN = re.compile(r">([^<]+)|<!\[CDATA\[(.*?)\]\]>", re.DOTALL)
 _GENERIC_FAMILIES = {"serif", "sans-serif", "monospace", "cursive", "fantasy", "system-ui"}
 
+SUBSETS = ("latin-1", "exact")
 
-def _unescape_xml_entities(s: str) -> str:
-    """mermaid.js writes font-family names as literal &quot;-escaped text
-    even inside <style> (which is PCDATA, not an attribute value -- an XML
-    parser resolves this to a plain '"' either way, but our own regexes
-    below run on the raw source string, so they need the same unescaping
-    an XML parser would do first)."""
-    return (
-        s.replace("&quot;", '"').replace("&apos;", "'")
-        .replace("&lt;", "<").replace("&gt;", ">").replace("&amp;", "&")
-    )
+# Every printable Latin-1 character: ASCII plus U+00A0-U+00FF.
+_LATIN_1 = frozenset(map(chr, range(0x20, 0x7F))) | frozenset(map(chr, range(0xA0, 0x100)))
+
+
+def _scan(svg: str, subset: Optional[str] = "exact") -> tuple:
+    """
+    ``(characters, weights, families)`` of *svg*:
 
+    characters -- every character of its text content (text nodes,
+        tspans, titles, the <style> block's own CSS, ...). A superset is
+        harmless (a few extra glyphs cost nothing); a subset would silently
+        drop glyphs, so this doesn't try to be clever about which elements
+        count.
+    weights -- which of the two bundled weights are referenced: the same
+        rule font_metrics.get_font() uses for measurement, font-weight
+        >= 600 or the literal 'bold'/'bolder'.
+    families -- the first (non-generic) name in every ``font-family:``
+        CSS declaration, i.e. the exact name the browser will look up.
+        Registering @font-face under these names (rather than e.g. always
+        'DejaVu Sans') is what lets the embedded font win the lookup
+        without touching mermaid's own CSS.
 
-def _used_characters(svg: str) -> set:
-    """Every character appearing anywhere in the SVG's text content (text
-    nodes, tspans, titles, ...). A superset is harmless (a handful of extra
-    glyphs from e.g. the <style> block's own text costs nothing); a subset
-    would silently drop glyphs, so this doesn't try to be clever about
-    which elements count."""
-    root = ET.fromstring(svg)
-    return {ch for text in root.itertext() if text for ch in text}
-
-
-def _font_weights_used(svg: str) -> set:
-    """Which of the two bundled weights are actually referenced -- the same
-    rule font_metrics.get_font() uses for measurement: font-weight >= 600,
-    or the literal 'bold'/'bolder'."""
-    weights = {"regular"}
-    if _BOLD_WEIGHT.search(_unescape_xml_entities(svg)):
-        weights.add("bold")
-    return weights
-
-
-def _font_families_used(svg: str) -> set:
-    """The first (non-generic) family name in every `font-family:` CSS
-    declaration in the SVG -- i.e. the exact name the browser will actually
-    look up. Registering @font-face under these names (rather than e.g.
-    always 'DejaVu Sans') is what lets the embedded font win the lookup
-    without needing to touch mermaid's own CSS."""
-    names = set()
-    for m in _FONT_FAMILY_DECL.finditer(_unescape_xml_entities(svg)):
-        first = m.group(1).split(",")[0].strip().strip("'\"")
+    No XML parse and no unescaped copy of the document: two regexes walk
+    the raw string, and only the matches -- text runs, font declarations
+    -- are unescaped (mermaid.js writes the family names &quot;-escaped,
+    even inside <style>). With ``subset="latin-1"``, an ASCII document
+    without character references can't have anything but ASCII text, so
+    the Latin-1 subset covers it whatever that text is: characters is
+    then all of Latin-1, and the text isn't collected at all. With
+    ``subset=None`` it never is (characters is empty).
+    """
+    weights, families = {"regular"}, set()
+    for match in _FONT_DECLARATION.finditer(svg):
+        family = match.group("family")
+        if family is None:
+            weights.add("bold")
+            continue
+        first = html.unescape(family).split(",")[0].strip().strip("'\"")
         if first and first.lower() not in _GENERIC_FAMILIES:
-            names.add(first)
-    return names
+            families.add(first)
+
+    if subset is None:
+        characters = set()
+    elif subset == "latin-1" and svg.isascii() and "&#" not in svg:
+        characters = set(_LATIN_1) if _TEXT_RUN.search(svg) else set()
+    else:
+        characters = set()
+        for text, cdata in _TEXT_RUN.findall(svg):
+            characters.update(html.unescape(text) if text else cdata)
+    return characters, weights, families
 
 
-def _subset_font_base64(weight: str, characters: set) -> str:
+@functools.lru_cache(maxsize=None)
+def _font_data(weight: str) -> bytes:
+    return (_ASSETS_FONTS / _FONT_FILES[weight]).read_bytes()
+
+
+@functools.lru_cache(maxsize=64)
+def _subset_font(weight: str, characters: frozenset, flavor: Optional[str] = None) -> bytes:
     import logging
 
     from fontTools import subset
@@ -96,7 +133,9 @@ def _subset_font_base64(weight: str, characters: set) -> str:
 
     logging.getLogger("fontTools").setLevel(logging.ERROR)
 
-    font = TTFont(str(_ASSETS_FONTS / _FONT_FILES[weight]))
+    # Parsing is lazy and cheap (<1 ms); it's a fresh TTFont each time
+    # because subsetting rewrites the font in place.
+    font = TTFont(io.BytesIO(_font_data(weight)), recalcTimestamp=False)
     options = subset.Options()
     options.notdef_outline = True
     options.recalc_bounds = True
@@ -105,44 +144,138 @@ def _subset_font_base64(weight: str, characters: set) -> str:
     subsetter = subset.Subsetter(options=options)
     subsetter.populate(text="".join(sorted(characters)))
     subsetter.subset(font)
+    font.flavor = flavor
     buf = io.BytesIO()
     font.save(buf)
-    return base64.b64encode(buf.getvalue()).decode("ascii")
+    return buf.getvalue()
 
 
-def embed_dejavu_font(svg: str) -> str:
-    """Return *svg* with inline @font-face rules for exactly the DejaVu
-    Sans glyphs it uses, registered under whatever family name(s) the
-    diagram's own CSS requests -- so the same font used to lay the diagram
-    out also paints it in a browser, not just in mermaidx's own PNG/PDF
-    output. Requires fontTools; install with `pip install mermaidx[embed]`.
-    """
+def _subset_font_base64(weight: str, characters: frozenset) -> str:
+    return base64.b64encode(_subset_font(weight, characters)).decode("ascii")
+
+
+def _subset_characters(characters: set, subset: str) -> frozenset:
+    """The characters to subset to: all of Latin-1 if that covers
+    ``characters`` (and ``subset`` allows it), else exactly them."""
+    if subset == "latin-1" and all(ord(ch) < 0x100 for ch in characters):
+        return _LATIN_1
+    return frozenset(characters)
+
+
+def _check_subset(subset: str) -> None:
+    if subset not in SUBSETS:
+        raise ValueError(f"Unknown subset {subset!r}; expected one of {', '.join(SUBSETS)} "
+                         "(\"external\" is only for batches, see link_dejavu_font()).")
     try:
-        from fontTools import subset  # noqa: F401
+        import fontTools.subset  # noqa: F401
     except ImportError as exc:
         raise ImportError(
             "embed_font=True requires fontTools. Install it with:\n"
             "    pip install mermaidx[embed]"
         ) from exc
 
-    characters = _used_characters(svg)
-    families = _font_families_used(svg)
-    if not characters or not families:
+
+def _add_font_faces(svg: str, weights: set, families: set, src) -> str:
+    """*svg* with one @font-face per weight and family (as _scan() found
+    them), ``src(weight)`` giving each rule's ``src:`` value."""
+    if not families:
+        return svg
+    match = _SVG_OPEN_TAG.search(svg)
+    if not match:
         return svg
 
     rules = []
-    for weight in sorted(_font_weights_used(svg)):
-        b64 = _subset_font_base64(weight, characters)
-        src = f"src:url(data:font/ttf;base64,{b64}) format('truetype');"
+    for weight in sorted(weights):
+        source = src(weight)
         for family in sorted(families):
             escaped = family.replace("\\", "\\\\").replace('"', '\\"')
             rules.append(
                 f'@font-face{{font-family:"{escaped}";'
-                f"font-weight:{_CSS_WEIGHT[weight]};{src}}}"
+                f"font-weight:{_CSS_WEIGHT[weight]};src:{source};}}"
             )
     style_block = "<style>" + "".join(rules) + "</style>"
+    return svg[: match.end()] + style_block + svg[match.end():]
 
-    match = _SVG_OPEN_TAG.search(svg)
-    if not match:
+
+def embed_dejavu_font(svg: str, *, subset: str = "latin-1") -> str:
+    """Return *svg* with inline @font-face rules for the DejaVu Sans
+    glyphs it uses, registered under whatever family name(s) the
+    diagram's own CSS requests -- so the same font used to lay the diagram
+    out also paints it in a browser, not just in mermaidx's own PNG/PDF
+    output. Requires fontTools; install with `pip install mermaidx[embed]`.
+
+    ``subset``: "latin-1" (default) embeds the whole Latin-1 range when
+    that covers the diagram's text -- one subset per process, shared by
+    every such diagram -- and exactly the glyphs used otherwise; "exact"
+    always embeds exactly the glyphs used (smallest output).
+    """
+    _check_subset(subset)
+    characters, weights, families = _scan(svg, subset)
+    if not characters:
         return svg
-    return svg[: match.end()] + style_block + svg[match.end():]
+    characters = _subset_characters(characters, subset)
+    return _add_font_faces(
+        svg, weights, families,
+        lambda weight: f"url(data:font/ttf;base64,{_subset_font_base64(weight, characters)}) format('truetype')",
+    )
+
+
+# ── one shared font file for many SVGs (embed_font="external") ───────────────
+
+@functools.lru_cache(maxsize=None)
+def _flavor() -> str:
+    """WOFF2 if fontTools can write it (it needs brotli), else WOFF --
+    zlib-compressed, and read by every browser that reads WOFF2."""
+    import importlib.util
+
+    return "woff2" if importlib.util.find_spec("brotli") is not None else "woff"
+
+
+def font_file_name(weight: str) -> str:
+    """The file write_font_files() writes ``weight`` ("regular" or
+    "bold") to, e.g. ``DejaVuSans.woff2``."""
+    return f"{Path(_FONT_FILES[weight]).stem}.{_flavor()}"
+
+
+def link_dejavu_font(svg: str, prefix: str = "") -> str:
+    """Like embed_dejavu_font(), but the @font-face rules point at the
+    font files write_font_files() writes -- ``url(<prefix><file name>)``,
+    ``prefix`` being their directory relative to wherever the SVG is
+    viewed from, e.g. ``"../fonts/"`` -- instead of inlining a copy. A
+    set of SVGs then shares one font download. No fontTools needed here.
+
+    Browsers don't fetch anything for an SVG shown as an ``<img>`` -- this
+    works for SVG inlined into a page, opened directly, or in an
+    ``<object>``.
+    """
+    url = urllib.parse.quote(prefix)
+    _, weights, families = _scan(svg, None)
+    return _add_font_faces(svg, weights, families,
+                           lambda weight: f'url("{url}{font_file_name(weight)}") format("{_flavor()}")')
+
+
+def write_font_files(svgs: Iterable[str], directory, *, subset: str = "latin-1") -> list:
+    """
+    Write the font files link_dejavu_font() points at into ``directory``:
+    one per weight any of ``svgs`` uses, each subset to the union of all
+    their characters (the whole Latin-1 range when that covers it, as
+    embed_dejavu_font()'s ``subset`` says). Returns the paths written.
+    Requires fontTools.
+    """
+    _check_subset(subset)
+    characters, weights = set(), set()
+    for svg in svgs:
+        svg_characters, svg_weights, _ = _scan(svg, subset)
+        characters |= svg_characters
+        weights |= svg_weights
+    if not characters:
+        return []
+    characters = _subset_characters(characters, subset)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for weight in sorted(weights):
+        path = directory / font_file_name(weight)
+        path.write_bytes(_subset_font(weight, characters, _flavor()))
+        paths.append(path)
+    return paths
@@ -0,0 +1,327 @@
+"""
+mermaidx.markdown — render every ```mermaid fence in a Markdown tree (``mermaidx md``).
+
+    >>> mermaidx.render_markdown(["docs/"], "build/docs")        # images in build/docs/diagrams/
+    >>> mermaidx.render_markdown(["README.md"], in_place=True, inline=True)
+
+Scans the documents for mermaid code fences (``` or ~~~, any length, as
+CommonMark reads them -- a mermaid fence quoted inside a longer fence is
+left alone), deduplicates them across the whole tree by content hash,
+renders each distinct diagram once, in parallel (pool.render_many(), PNGs
+rasterized in the workers too), and rewrites every document with each
+fence replaced by either an image link
+(to ``<image_dir>/<hash>.svg|png``, shared by every page that uses that
+diagram) or the SVG inline. Images are named by content hash, so one that
+already exists is up to date and isn't rendered again. A fence that fails
+to render is left as it was and reported.
+
+``embed_font`` embeds the font in each SVG, as Diagram.svg() does -- or,
+with ``"external"``, writes it once to ``<image_dir>`` as one shared file
+per weight (subset to every diagram's characters) that each inline SVG
+links to by URL, so a page with twenty diagrams downloads the font once.
+That needs ``inline=True``: an SVG linked as an image is shown as an
+``<img>``, which never loads the font file.
+
+Documents are written to ``out_dir``, mirroring their layout below the
+inputs' common directory, or over themselves with ``in_place=True``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Union
+
+IMAGE_FORMATS = ("svg", "png")
+
+_FENCE_OPEN = re.compile(r"^( {0,3})(`{3,}|~{3,})(.*)$")
+
+
+@dataclass
+class Fence:
+    """One mermaid fence: ``document[start:end]`` is the whole fence,
+    opening and closing lines included."""
+
+    start: int
+    end: int
+    source: str
+
+
+@dataclass
+class MarkdownReport:
+    """What render_markdown() did. ``rendered`` counts the distinct diagrams
+    rendered by this run (not the up-to-date or failed ones); ``errors`` has
+    one ``(document, line, error)`` per fence left unrendered because its
+    diagram failed."""
+
+    documents: list = field(default_factory=list)
+    fences: int = 0
+    diagrams: int = 0
+    rendered: int = 0
+    errors: list = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def find_fences(text: str) -> list:
+    """Every mermaid fence in ``text``, in order."""
+    fences, pos, lines = [], 0, text.splitlines(keepends=True)
+    i = 0
+    while i < len(lines):
+        line_start = pos
+        match = _FENCE_OPEN.match(lines[i].rstrip("\r\n"))
+        pos += len(lines[i])
+        i += 1
+        if not match:
+            continue
+        indent, marker, info = len(match.group(1)), match.group(2), match.group(3).strip()
+        if marker[0] == "`" and "`" in info:
+            continue  # not a fence (CommonMark: no backticks in a backtick fence's info string)
+        close = re.compile(rf"^ {{0,3}}{re.escape(marker[0])}{{{len(marker)},}}[ \t]*$")
+        body = []
+        while i < len(lines) and not close.match(lines[i].rstrip("\r\n")):
+            body.append(lines[i])
+            pos += len(lines[i])
+            i += 1
+        if i < len(lines):  # the closing line; an unclosed fence runs to the end
+            pos += len(lines[i])
+            i += 1
+        if info.split(maxsplit=1)[:1] == ["mermaid"]:
+            source = "".join(_dedent(line, indent) for line in body)
+            fences.append(Fence(line_start, pos, source))
+    return fences
+
+
+def _dedent(line: str, indent: int) -> str:
+    stripped = line.lstrip(" ")
+    return line[min(indent, len(line) - len(stripped)):]
+
+
+def _scope_ids(svg: str, digest: str) -> str:
+    """Rename the SVG's root id (``gd<N>``, counted per engine -- so two
+    workers hand out the same ones) to one derived from its content, so
+    inline SVGs on one page can't restyle or re-marker each other."""
+    match = re.match(r'\s*<svg[^>]*?\sid="([^"]+)"', svg)
+    if not match:
+        return svg
+    # Also the prefix of every marker/node/edge id derived from it (gd1_...,
+    # gd1-...) -- but only where it is an id or a reference to one, never
+    # in label text or other attribute values.
+    return re.sub(r'(id="|#)' + re.escape(match.group(1)) + r"(?![^\W_])", rf"\g<1>mermaid-{digest}", svg)
+
+
+def collect_documents(inputs: list) -> list:
+    """The Markdown files named by ``inputs``: files as-is, directories
+    searched recursively for ``*.md``, globs expanded."""
+    from mermaidx.batch import expand_inputs
+
+    documents = []
+    for path in expand_inputs(inputs):
+        found = sorted(path.rglob("*.md")) if path.is_dir() else [path]
+        documents.extend(d for d in found if d not in documents)
+    return documents
+
+
+def _digest(source: str, options: dict) -> str:
+    blob = json.dumps({"source": source.strip(), "options": options}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def render_markdown(
+    inputs: list,
+    out_dir=None,
+    *,
+    in_place: bool = False,
+    inline: bool = False,
+    format: str = "svg",
+    image_dir: str = "diagrams",
+    workers: Optional[int] = None,
+    root=None,
+    embed_font: Union[bool, str] = False,
+    **opts,
+) -> MarkdownReport:
+    """
+    Render the mermaid fences of every Markdown document in ``inputs``
+    (files, directories, globs) and write the rewritten documents.
+
+    Args:
+        inputs:    Paths, directories (searched for ``*.md``) or globs.
+        out_dir:   Where the rewritten documents go, mirroring their layout
+                   below the inputs' common directory.
+        in_place:  Overwrite the documents themselves instead (out_dir must
+                   then be None).
+        inline:    Replace fences with the SVG itself rather than an image link.
+        format:    Image format for links, "svg" or "png" (inline is always SVG).
+        image_dir: Directory for the images, relative to out_dir (or to the
+                   common directory when in_place).
+        workers:   Worker processes for render_many() (default: one per CPU,
+                   at most one per distinct diagram; 1 renders in this
+                   process, on its warm engine).
+        root:      Directory the output layout mirrors (default: the
+                   inputs' common directory).
+        embed_font: SVG only: True, "latin-1" or "exact" embed the font
+                   in every SVG, as Diagram.svg(embed_font=...);
+                   "external" links every SVG to one shared font file in
+                   the image directory instead (see font_embed) -- inline
+                   only, as an ``<img>`` never loads it.
+        **opts:    Forwarded to render_many() / Diagram(): backend, theme,
+                   config, css.
+
+    Returns:
+        A MarkdownReport.
+    """
+    from mermaidx.pool import render_many
+
+    if (out_dir is None) == (not in_place):
+        raise ValueError("Pass either out_dir or in_place=True.")
+    if format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image format {format!r}; expected one of {', '.join(IMAGE_FORMATS)}.")
+    fmt = "svg" if inline else format
+    if fmt != "svg":
+        embed_font = False
+    external = embed_font == "external"
+    if external and not inline:
+        raise ValueError("embed_font='external' needs inline=True: an SVG linked as an image never loads "
+                         "the shared font file. Use embed_font='latin-1' for image links.")
+    if embed_font:
+        from mermaidx.font_embed import _check_subset, link_dejavu_font, write_font_files
+
+        _check_subset("latin-1" if embed_font is True or external else embed_font)
+
+    start = time.perf_counter()
+    documents = collect_documents(inputs)
+    report = MarkdownReport(documents=documents)
+    if not documents:
+        return report
+    if root is None:
+        root = os.path.commonpath([str(d.resolve().parent) for d in documents])
+    root = Path(root).resolve()
+    out_root = root if in_place else Path(out_dir)
+    images = out_root / image_dir
+
+    # The images' names cover how the font is embedded, without changing the default ones.
+    key_opts = {**opts, "embed_font": embed_font} if embed_font else opts
+    texts = {d: d.read_text(encoding="utf-8") for d in documents}
+    fences = {d: find_fences(texts[d]) for d in documents}
+    unique: dict = {}  # digest -> source, first occurrence first
+    for found in fences.values():
+        for fence in found:
+            unique.setdefault(_digest(fence.source, key_opts), fence.source)
+    report.fences = sum(map(len, fences.values()))
+    report.diagrams = len(unique)
+
+    outputs: dict = {}  # digest -> image path, or SVG text when inline
+    failures: dict = {}  # digest -> error
+    if not inline:
+        for digest in list(unique):
+            path = images / f"{digest}.{format}"
+            if path.exists():
+                outputs[digest] = path
+                del unique[digest]
+    if unique:
+        # Rendered *and* rasterized in the workers; only the outputs come back.
+        formats = {fmt: {"embed_font": embed_font} if embed_font and not external else {}}
+        results = render_many(list(unique.values()), workers=workers, formats=formats, **opts)
+        for digest, result in zip(unique, results):
+            if isinstance(result, Exception):
+                failures[digest] = str(result) or type(result).__name__
+            elif inline:
+                outputs[digest] = _scope_ids(result["svg"], digest)
+            else:
+                path = images / f"{digest}.{format}"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                if fmt == "svg":
+                    path.write_text(result["svg"], encoding="utf-8")
+                else:
+                    path.write_bytes(result[fmt])
+                outputs[digest] = path
+        report.rendered = len(unique) - len(failures)
+    if external and outputs:
+        write_font_files(outputs.values(), images)
+
+    for document in documents:
+        target = document if in_place else out_root / document.resolve().relative_to(root)
+        text, pieces, last = texts[document], [], 0
+        for fence in fences[document]:
+            digest = _digest(fence.source, key_opts)
+            if digest in failures:
+                report.errors.append((document, text.count("\n", 0, fence.start) + 1, failures[digest]))
+                continue
+            output = outputs[digest]
+            pieces.append(text[last:fence.start])
+            if inline:
+                if external:  # the font's URL is relative to the page the SVG is inlined into
+                    prefix = Path(os.path.relpath(images.resolve(), target.resolve().parent)).as_posix()
+                    output = link_dejavu_font(output, "" if prefix == "." else prefix + "/")
+                pieces.append(output.strip() + "\n")
+            else:
+                link = os.path.relpath(output.resolve(), target.resolve().parent)
+                pieces.append(f"![mermaid diagram]({Path(link).as_posix()})\n")
+            last = fence.end
+        pieces.append(text[last:])
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text("".join(pieces), encoding="utf-8")
+
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+# ── `mermaidx md` ────────────────────────────────────────────────────────────
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="mermaidx md",
+        description="Render the ```mermaid fences of Markdown documents, each distinct diagram once, "
+                    "and rewrite the documents with image links or inline SVG.",
+    )
+    parser.add_argument("paths", nargs="+", metavar="PATH",
+                        help="Markdown files, directories (searched for *.md) or globs")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("-o", "--out-dir", metavar="DIR", help="Write the rewritten documents here")
+    target.add_argument("--in-place", action="store_true", help="Overwrite the documents themselves")
+    parser.add_argument("--inline", action="store_true", help="Inline the SVG instead of linking an image")
+    parser.add_argument("--format", choices=IMAGE_FORMATS, default="svg", help="Image format (default: svg)")
+    parser.add_argument("--image-dir", default="diagrams", metavar="DIR",
+                        help="Image directory, relative to --out-dir (default: diagrams)")
+    parser.add_argument("--embed-font", nargs="?", const=True, default=False, metavar="MODE",
+                        choices=["latin-1", "exact", "external"],
+                        help="SVG only: embed the font in every SVG (MODE latin-1 or exact, as for "
+                             "`mermaidx --embed-font`), or write it once to the image directory and "
+                             "link it from every SVG (external, with --inline only). Requires fontTools.")
+    parser.add_argument("-j", "--jobs", type=int, default=None, metavar="N",
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument("--backend", default=None, metavar="NAME", help="Rendering backend (default: quickjs)")
+    parser.add_argument("-t", "--theme", choices=["default", "forest", "dark", "neutral"], default="default",
+                        help="Mermaid theme (default: default)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only report errors")
+    return parser
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    opts = {"theme": args.theme}
+    if args.backend:
+        opts["backend"] = args.backend
+
+    try:
+        report = render_markdown(args.paths, args.out_dir, in_place=args.in_place, inline=args.inline,
+                                 format=args.format, image_dir=args.image_dir, workers=args.jobs,
+                                 embed_font=args.embed_font, **opts)
+    except ValueError as exc:  # an option combination render_markdown() refuses
+        parser.error(str(exc))
+    if not report.documents:
+        parser.error(f"no Markdown documents found in {' '.join(args.paths)}")
+    for document, line, error in report.errors:
+        print(f"  FAILED    {document}:{line}: {error}", file=sys.stderr)
+    if not args.quiet:
+        print(f"{len(report.documents)} documents, {report.fences} fences, {report.diagrams} distinct "
+              f"diagrams ({report.rendered} rendered), {len(report.errors)} failed in {report.seconds:.2f}s",
+              file=sys.stderr)
+    return 1 if report.errors else 0
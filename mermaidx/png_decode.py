@@ -18,6 +18,7 @@ from __future__ import annotations
 import struct
 import zlib
 from dataclasses import dataclass
+from typing import Iterator, Optional
 
 
 @dataclass
@@ -39,7 +40,15 @@ def _paeth(a: int, b: int, c: int) -> int:
     return c
 
 
-def decode_png(data: bytes) -> DecodedPNG:
+def png_dimensions(data: bytes) -> tuple[int, int]:
+    """``(width, height)`` from the IHDR chunk alone -- no decompression."""
+    if data[:8] != b"\x89PNG\r\n\x1a\n" or data[12:16] != b"IHDR":
+        raise ValueError("Not a PNG file")
+    return struct.unpack_from(">II", data, 16)
+
+
+def _read(data: bytes) -> tuple[bytes, int, int, int]:
+    """Header and decompressed image data: ``(raw, width, height, channels)``."""
     if data[:8] != b"\x89PNG\r\n\x1a\n":
         raise ValueError("Not a PNG file")
 
@@ -68,14 +77,15 @@ def decode_png(data: bytes) -> DecodedPNG:
             "(only 8-bit RGB/RGBA, as produced by resvg, is supported)"
         )
 
-    channels = 3 if color_type == 2 else 4
-    raw = zlib.decompress(bytes(idat))
+    return zlib.decompress(idat), width, height, 3 if color_type == 2 else 4
 
+
+def _rows(raw: bytes, width: int, height: int, channels: int) -> Iterator[bytearray]:
+    """Each row of samples, unfiltered, top to bottom."""
     stride = width * channels
-    out = bytearray(stride * height)
     prev_row = bytearray(stride)
     src_pos = 0
-    for y in range(height):
+    for _ in range(height):
         filter_type = raw[src_pos]
         src_pos += 1
         row = bytearray(raw[src_pos:src_pos + stride])
@@ -102,32 +112,65 @@ def decode_png(data: bytes) -> DecodedPNG:
         else:
             raise ValueError(f"Unsupported PNG filter type: {filter_type}")
 
-        out[y * stride:(y + 1) * stride] = row
+        yield row
         prev_row = row
 
+
+def _unfilter(data: bytes) -> tuple[bytearray, int, int, int]:
+    """The interleaved samples of a PNG: ``(pixels, width, height, channels)``."""
+    raw, width, height, channels = _read(data)
+    stride = width * channels
+    out = bytearray(stride * height)
+    for y, row in enumerate(_rows(raw, width, height, channels)):
+        out[y * stride:(y + 1) * stride] = row
+    return out, width, height, channels
+
+
+def _rgb_to_rgba(rgb: bytes, pixels: int) -> bytearray:
+    rgba = bytearray(b"\xff" * (pixels * 4))
+    for c in range(3):  # extended slices: per channel, in C, not per pixel
+        rgba[c::4] = rgb[c::3]
+    return rgba
+
+
+def decode_png(data: bytes) -> DecodedPNG:
+    out, width, height, channels = _unfilter(data)
     if channels == 3:
         return DecodedPNG(width, height, False, bytes(out), b"")
 
     rgb = bytearray(width * height * 3)
-    alpha = bytearray(width * height)
-    for p in range(width * height):
-        rgb[p * 3:p * 3 + 3] = out[p * 4:p * 4 + 3]
-        alpha[p] = out[p * 4 + 3]
-    return DecodedPNG(width, height, True, bytes(rgb), bytes(alpha))
+    for c in range(3):
+        rgb[c::3] = out[c::4]
+    return DecodedPNG(width, height, True, bytes(rgb), bytes(out[3::4]))
+
+
+def decode_png_into(data: bytes, out, offset: int = 0, row_stride: Optional[int] = None) -> tuple[int, int]:
+    """
+    Decode ``data`` as RGBA8888 straight into ``out`` -- any writable
+    buffer: a bytearray, an mmap, a numpy array's memory -- row ``y``
+    starting at ``offset + y * row_stride`` (default: rows packed, i.e.
+    ``width * 4``). Returns ``(width, height)``. No intermediate
+    image-sized object is created, so e.g. a batch can be decoded into
+    slots of one preallocated array.
+    """
+    raw, width, height, channels = _read(data)
+    row_bytes = width * 4
+    row_stride = row_bytes if row_stride is None else row_stride
+    # Released on the way out, even on error: an mmap can't close while viewed.
+    with memoryview(out) as view, view.cast("B") as flat:
+        if row_stride < row_bytes or offset < 0 or offset + (height - 1) * row_stride + row_bytes > len(flat):
+            raise ValueError(f"A {width}x{height} image doesn't fit in the buffer at offset {offset}")
+        for y, row in enumerate(_rows(raw, width, height, channels)):
+            start = offset + y * row_stride
+            flat[start:start + row_bytes] = row if channels == 4 else _rgb_to_rgba(row, width)
+    return width, height
 
 
 def decode_png_rgba(data: bytes) -> tuple[bytes, int, int]:
     """Like decode_png(), but returns interleaved RGBA8888 bytes directly —
     convenient for APIs that want a single (bytes, width, height) tuple
     (e.g. Diagram.raw() / .numpy())."""
-    d = decode_png(data)
-    rgba = bytearray(d.width * d.height * 4)
-    if d.has_alpha:
-        for p in range(d.width * d.height):
-            rgba[p * 4:p * 4 + 3] = d.rgb[p * 3:p * 3 + 3]
-            rgba[p * 4 + 3] = d.alpha[p]
-    else:
-        for p in range(d.width * d.height):
-            rgba[p * 4:p * 4 + 3] = d.rgb[p * 3:p * 3 + 3]
-            rgba[p * 4 + 3] = 255
-    return bytes(rgba), d.width, d.height
+    out, width, height, channels = _unfilter(data)
+    if channels == 4:
+        return bytes(out), width, height  # already RGBA: no split and re-interleave
+    return bytes(_rgb_to_rgba(out, width * height)), width, height
@@ -0,0 +1,131 @@
+"""
+mermaidx.png_encode — write a PNG incrementally, row by row, using only the
+standard library (`zlib`, `struct`): the other half of mermaidx.png_decode.
+
+resvg hands back a finished PNG for a whole canvas; for images too big to
+hold at once (see mermaidx.tiles) the pixels arrive a band at a time, and
+this streams them straight into IDAT chunks on a file handle. Only one
+band of raw rows plus the compressor's window is ever in memory, however
+tall the image.
+
+Writes 8-bit RGBA (color type 6) or RGB (color type 2), non-interlaced.
+Every row uses filter type 0 (None): the adaptive filters resvg's encoder
+picks compress better, but choosing and applying them per byte in pure
+Python would cost far more than the extra bytes do.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from io import BytesIO
+from typing import BinaryIO, Sequence
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(body, zlib.crc32(kind)))
+
+
+class PNGWriter:
+    """
+    Streams a ``width`` x ``height`` PNG to ``file`` (any binary file
+    object). Feed it every row, top to bottom, via write_rows() (raw
+    interleaved bytes) or write_tiles() (a band of tiles side by side),
+    then close() -- or use it as a context manager.
+
+    IDAT chunks are emitted whenever ``chunk_size`` compressed bytes have
+    accumulated.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        width: int,
+        height: int,
+        *,
+        alpha: bool = True,
+        level: int = 6,
+        chunk_size: int = 1 << 16,
+    ) -> None:
+        if width < 1 or height < 1:
+            raise ValueError(f"Invalid PNG size {width}x{height}")
+        self.file = file
+        self.width = width
+        self.height = height
+        self.channels = 4 if alpha else 3
+        self.stride = width * self.channels
+        self.rows = 0  # rows written so far
+        self._chunk_size = chunk_size
+        self._compressor = zlib.compressobj(level)
+        self._pending = bytearray()
+        self._closed = False
+        file.write(PNG_SIGNATURE)
+        file.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6 if alpha else 2, 0, 0, 0)))
+
+    def write_rows(self, data: bytes) -> None:
+        """Append one or more whole rows of raw RGBA (or RGB) bytes."""
+        stride = self.stride
+        if len(data) % stride:
+            raise ValueError(f"Row data must be a multiple of {stride} bytes, got {len(data)}")
+        count = len(data) // stride
+        if self.rows + count > self.height:
+            raise ValueError(f"Too many rows: the image is {self.height} rows tall")
+        view = memoryview(data)
+        raw = bytearray()
+        for y in range(count):
+            raw += b"\x00"  # filter type: None
+            raw += view[y * stride:(y + 1) * stride]
+        self.rows += count
+        self._pending += self._compressor.compress(raw)
+        self._flush()
+
+    def write_tiles(self, tiles: Sequence[tuple]) -> None:
+        """Append a band of tiles, left to right: ``(bytes, width, height)``
+        tuples (as png_decode.decode_png_rgba() returns), all the same
+        height, their widths adding up to the image's."""
+        heights = {h for _, _, h in tiles}
+        if len(heights) != 1:
+            raise ValueError(f"Tiles in a band must share one height, got {sorted(heights)}")
+        if sum(w for _, w, _ in tiles) != self.width:
+            raise ValueError(f"Tile widths must add up to {self.width}")
+        (height,) = heights
+        channels = self.channels
+        band = bytearray()
+        for y in range(height):
+            for data, w, _ in tiles:
+                band += memoryview(data)[y * w * channels:(y + 1) * w * channels]
+        self.write_rows(band)
+
+    def _flush(self, final: bool = False) -> None:
+        size = self._chunk_size
+        while len(self._pending) >= size or (final and self._pending):
+            self.file.write(_chunk(b"IDAT", bytes(self._pending[:size])))
+            del self._pending[:size]
+
+    def close(self) -> None:
+        """Finish the image. Raises ValueError if rows are missing."""
+        if self._closed:
+            return
+        if self.rows != self.height:
+            raise ValueError(f"Only {self.rows} of {self.height} rows were written")
+        self._closed = True
+        self._pending += self._compressor.flush()
+        self._flush(final=True)
+        self.file.write(_chunk(b"IEND", b""))
+
+    def __enter__(self) -> "PNGWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+
+def encode_png(data: bytes, width: int, height: int, *, alpha: bool = True, level: int = 6) -> bytes:
+    """Raw RGBA8888 (or RGB888) pixels -> PNG bytes, in one call."""
+    out = BytesIO()
+    with PNGWriter(out, width, height, alpha=alpha, level=level) as writer:
+        writer.write_rows(data)
+    return out.getvalue()
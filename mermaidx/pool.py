@@ -10,16 +10,42 @@ one CPU core is more than one process.
 
 render_many() does exactly that: a process pool where each worker starts
 its own persistent Engine once (loading mermaid.js is the expensive part)
-and reuses it for every diagram routed to that worker.
+and reuses it for every diagram routed to that worker. Each worker gets one
+contiguous chunk of the sources and renders it as a single engine batch
+(Engine.render_svg_many), so the returned Diagrams already carry their SVG.
+
+Rasterizing is just as CPU-bound, and resvg_py holds the GIL for the whole
+call -- a thread pool wouldn't overlap it either. So ``formats=`` has the
+workers produce the final PNG/PDF/... bytes too, and only those come back
+(no Diagram round trip, no serial .png() loop in the parent);
+rasterize_many() does the same for SVGs you already have.
+
+Large results (SVGs, PNGs, PDFs over shared.THRESHOLD) don't come back
+through the pool's pipe: workers write them to a shared-memory segment
+and send a handle (see mermaidx.shared), which the parent reads on first
+use -- a Diagram's cached SVG when svg() is first called, an output when
+its key is first looked up.
+
+render_array() is the dataset-building variant: every diagram is
+letterboxed to one size and decoded by its worker straight into its slot
+of a shared (N, H, W, 4) array -- a file in /dev/shm (RAM) where there is
+one, mapped by the parent as a numpy.memmap -- so no image ever crosses the
+pipe or exists as a Python bytes object.
 """
 
 from __future__ import annotations
 
+import mmap
 import multiprocessing as mp
 import os
-from typing import Optional
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Optional, Union
 
-from .diagram import Diagram
+from . import shared
+from .diagram import Diagram, DiagramBase, _render_svgs
+
+if TYPE_CHECKING:
+    import numpy as np
 
 # 'spawn' avoids inheriting any native (QuickJS/resvg) state across fork();
 # each worker starts completely fresh. Costs a bit more per-worker startup
@@ -27,15 +53,157 @@ from .diagram import Diagram
 _CTX = mp.get_context("spawn")
 
 
-def _render_one(args: tuple) -> Diagram:
-    source, opts = args
-    return Diagram(source, **opts)
+OUTPUT_FORMATS = ("svg", "png", "pdf", "raw", "ascii", "png_variants")
+
+
+class _StaticSvg(DiagramBase):
+    """An SVG that didn't come from a render, so it gets DiagramBase's
+    png/pdf/raw pipeline as-is (rasterize_many)."""
+
+    backend = "svg"
+
+    def _svg(self) -> str:
+        return self._source
+
+
+def _normalize_formats(formats) -> Optional[dict]:
+    """``("png", "pdf")`` or ``{"png": {"scale": 2}, ...}`` -> {format: kwargs}."""
+    if formats is None:
+        return None
+    if isinstance(formats, str):
+        formats = (formats,)
+    formats = dict(formats) if isinstance(formats, dict) else {f: {} for f in formats}
+    unknown = set(formats) - set(OUTPUT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown output format(s) {sorted(unknown)}; expected any of {', '.join(OUTPUT_FORMATS)}.")
+    return formats
+
+
+class Outputs(Mapping):
+    """render_many(formats=...)'s ``{format: output}`` for one diagram,
+    from a worker process: outputs still in shared memory are read the
+    first time they're looked up (and kept)."""
+
+    def __init__(self, outputs: dict) -> None:
+        self._outputs = outputs
+
+    def __getitem__(self, fmt: str):
+        value = self._outputs[fmt]
+        if shared.contains_payload(value):
+            value = self._outputs[fmt] = shared.load(value)
+        return value
+
+    def __iter__(self):
+        return iter(self._outputs)
+
+    def __len__(self) -> int:
+        return len(self._outputs)
+
+    def __repr__(self) -> str:
+        return f"Outputs({list(self._outputs)})"
+
+
+def _outputs(d: DiagramBase, formats: dict):
+    """``{format: output}`` for one diagram -- or the exception it raised,
+    so one bad diagram doesn't take its whole chunk down with it."""
+    try:
+        return {fmt: getattr(d, fmt)(**kwargs) for fmt, kwargs in formats.items()}
+    except Exception as exc:  # handed back in its place
+        return exc
+
+
+def _render_chunk(args: tuple) -> list:
+    """Worker entry point: render a contiguous chunk of sources as one
+    engine batch (see diagram._render_svgs), SVGs already cached on the
+    returned Diagrams -- or, given formats, just those outputs."""
+    sources, spill_results, opts, *rest = args
+    formats = rest[0] if rest else None
+    diagrams = [Diagram(s, **opts) for s in sources]
+    _render_svgs(diagrams)
+    results = diagrams if formats is None else [_outputs(d, formats) for d in diagrams]
+    if not spill_results:
+        return results
+    spill = shared.Spill()
+    try:
+        if formats is None:
+            for d in diagrams:
+                d._cache = {key: spill.share(value) if isinstance(value, (str, bytes)) else value
+                            for key, value in d._cache.items()}
+            return diagrams
+        return [spill.share(r) for r in results]
+    finally:
+        spill.close()
+
+
+def _rasterize_chunk(args: tuple) -> list:
+    """Worker entry point for rasterize_many()."""
+    svgs, spill_results, fmt, kwargs = args
+    results = [getattr(_StaticSvg(svg), fmt)(**kwargs) for svg in svgs]
+    if not spill_results:
+        return results
+    spill = shared.Spill()
+    try:
+        return [spill.share(r) for r in results]
+    finally:
+        spill.close()
+
+
+def _render_into_chunk(args: tuple) -> list:
+    """Worker entry point for render_array(): render a chunk of ``(index,
+    source)`` pairs, rasterize each letterboxed to the slot size and decode
+    it straight into slot ``index`` of the shared file. Only failures come
+    back, as ``(index, message)``."""
+    from mermaidx.png_decode import decode_png_into, png_dimensions
+    from mermaidx.raster import render_png
+    from mermaidx.tiles import letterbox
+
+    items, _, opts, path, width, height, background = args
+    diagrams = [Diagram(source, **opts) for _, source in items]
+    _render_svgs(diagrams)
+    failures = []
+    slot = width * height * 4
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as shared:
+        for (index, _), d in zip(items, diagrams):
+            try:
+                png = render_png(letterbox(d.svg(), width, height), background=background)
+                # Anything but exactly the slot size would spill into the
+                # next slot (or shear): fail this one instead.
+                w, h = png_dimensions(png)
+                if (w, h) != (width, height):
+                    raise ValueError(f"rendered {w}x{h}, not the {width}x{height} slot")
+                decode_png_into(png, shared, index * slot, width * 4)
+            except Exception as exc:  # reported by index
+                failures.append((index, str(exc) or type(exc).__name__))
+    return failures
+
+
+def _map_chunks(worker, items: list, extra: tuple, workers: Optional[int]) -> list:
+    """``worker((chunk, spill, *extra))`` over ``items`` split into one
+    contiguous chunk per process (in this process if that's just one),
+    flattened back in order. ``spill`` is True only for chunks sent to the
+    pool, whose results are worth moving to shared memory (see shared.py)
+    -- in this process there's no pipe to spare, and nobody to unpickle
+    the handles and so take ownership of the segment."""
+    if not items:
+        return []
+    if workers is None:
+        workers = min(len(items), os.cpu_count() or 1)
+    workers = max(1, workers)
+
+    if workers == 1:
+        return worker((items, False, *extra))
+
+    step = -(-len(items) // workers)  # ceil division: one chunk per worker
+    chunks = [(items[k:k + step], True, *extra) for k in range(0, len(items), step)]
+    with _CTX.Pool(workers) as pool:
+        return [item for chunk in pool.map(worker, chunks) for item in chunk]
 
 
 def render_many(
     sources: list,
     *,
     workers: Optional[int] = None,
+    formats: Union[None, str, tuple, list, dict] = None,
     **opts,
 ) -> list:
     """
@@ -44,26 +212,121 @@ def render_many(
     Args:
         sources: List of Mermaid source strings.
         workers: Number of worker processes (default: min(len(sources), cpu_count())).
+        formats: Produce these outputs in the workers and return only them:
+                 format names (any of OUTPUT_FORMATS), or a dict of format
+                 name -> keyword arguments for that method, e.g.
+                 ``{"png": {"scale": 2}, "pdf": {"pdf_format": "A4"}}``.
         **opts:  Options forwarded to Diagram() for every source (theme, config, css).
 
     Returns:
-        A list of Diagram objects, one per source, in the same order.
+        A list of Diagram objects, one per source, in the same order. With
+        ``formats``, a ``{format: output}`` mapping per source instead (a
+        dict, or an Outputs if some outputs are still in shared memory) --
+        or the exception that diagram raised, in its place.
 
     Example::
 
         diagrams = mermaidx.render_many([src1, src2, src3], theme="dark")
         for d, name in zip(diagrams, ["a.svg", "b.svg", "c.svg"]):
             d.save(name)
+
+        thumbs = mermaidx.render_many(sources, formats={"png": {"width": 256}})
+        thumbs[0]["png"]  # bytes, rasterized in a worker
     """
-    if not sources:
-        return []
+    formats = _normalize_formats(formats)
+    extra = (opts,) if formats is None else (opts, formats)
+    results = _map_chunks(_render_chunk, sources, extra, workers)
+    if formats is None:
+        return results  # cached SVGs in shared memory are read by svg()
+    return [Outputs(r) if isinstance(r, dict) and shared.contains_payload(r) else r for r in results]
 
-    if workers is None:
-        workers = min(len(sources), os.cpu_count() or 1)
-    workers = max(1, workers)
 
-    if workers == 1:
-        return [Diagram(s, **opts) for s in sources]
+def rasterize_many(
+    svgs: list,
+    format: str = "png",
+    *,
+    workers: Optional[int] = None,
+    **kwargs,
+) -> list:
+    """
+    Convert many SVG strings (from mermaidx or anywhere else) in parallel
+    on a process pool, returning only the results.
 
-    with _CTX.Pool(workers) as pool:
-        return pool.map(_render_one, [(s, opts) for s in sources])
+    Args:
+        svgs:    List of SVG strings.
+        format:  "png" (bytes), "pdf" (bytes) or "raw" ((bytes, w, h) RGBA8888).
+        workers: Number of worker processes (default: min(len(svgs), cpu_count())).
+        **kwargs: Forwarded to Diagram.png() / .pdf() / .raw() for every SVG
+                 (width, height, scale, background, pdf_format, ...).
+
+    Returns:
+        One result per SVG, in the same order. A failure raises (resvg's
+        ValueError for an unparsable SVG).
+    """
+    if format not in ("png", "pdf", "raw"):
+        raise ValueError(f"Unknown raster format {format!r}; expected 'png', 'pdf' or 'raw'.")
+    return [shared.load(r) for r in _map_chunks(_rasterize_chunk, svgs, (format, kwargs), workers)]
+
+
+def render_array(
+    sources: list,
+    width: int = 256,
+    height: int = 256,
+    *,
+    workers: Optional[int] = None,
+    background: Optional[str] = None,
+    on_error: str = "raise",
+    **opts,
+) -> "np.ndarray":
+    """
+    Render many diagrams into one ``(N, height, width, 4)`` uint8 RGBA
+    array, e.g. for an ML dataset. Requires ``numpy``.
+
+    Each diagram is scaled to fit ``width`` x ``height`` (aspect ratio
+    kept) and centered; the padding is transparent, or ``background``.
+    Workers decode their images directly into the shared array, so
+    nothing image-sized is pickled or copied on the way.
+
+    Args:
+        sources:    List of Mermaid source strings.
+        width, height: Size of every image, in pixels.
+        workers:    Number of worker processes (default: min(len(sources), cpu_count())).
+        background: CSS color, e.g. ``"#ffffff"``, for each whole image.
+        on_error:   "raise" (a ValueError naming the failed diagrams, after
+                    all the others are rendered) or "blank" (leave their
+                    slots all zero).
+        **opts:     Options forwarded to Diagram() for every source.
+
+    Returns:
+        A numpy.memmap (an ndarray) over shared memory -- freed when the
+        last reference to it goes, like any array.
+    """
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise ImportError(
+            "numpy is required for render_array(). Install it with:\n"
+            "    pip install numpy"
+        ) from exc
+    if on_error not in ("raise", "blank"):
+        raise ValueError(f"on_error must be 'raise' or 'blank', got {on_error!r}.")
+    if width < 1 or height < 1:
+        raise ValueError(f"Invalid image size {width}x{height}")
+
+    shape = (len(sources), height, width, 4)
+    if not sources:
+        return np.zeros(shape, dtype=np.uint8)
+    path = shared.new_file(len(sources) * height * width * 4)
+    try:
+        failures = _map_chunks(_render_into_chunk, list(enumerate(sources)),
+                               (opts, path, width, height, background), workers)
+        array = np.memmap(path, dtype=np.uint8, mode="r+", shape=shape)
+    finally:
+        try:
+            os.unlink(path)  # the mapping outlives the name (POSIX)
+        except OSError:
+            pass  # Windows: still mapped; the temp dir reclaims it
+    if failures and on_error == "raise":
+        details = "; ".join(f"#{index}: {message}" for index, message in sorted(failures))
+        raise ValueError(f"{len(failures)} of {len(sources)} diagrams failed: {details}")
+    return array
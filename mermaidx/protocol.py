@@ -0,0 +1,159 @@
+"""
+mermaidx.protocol — one render as a JSON-able request/response pair.
+
+Shared by everything that renders on someone else's behalf (the
+``mermaidx serve`` daemon, see daemon.py; ``mermaidx --jsonl``, see
+serve_jsonl() below), so they all accept exactly the same options the CLI
+does. A request is a flat dict:
+
+    source          Mermaid source text (required)
+    format          "svg" (default), "png", "pdf" or "ascii"
+    backend         as for mermaidx.render() (default: quickjs)
+    theme, config, css
+                    render options, as for mermaidx.render()
+    width, height, scale, background
+                    PNG/PDF size and background, as for Diagram.png()/.pdf()
+    pdf_format, pdf_landscape, pdf_margin
+                    PDF only, as for Diagram.pdf()
+    embed_font      SVG only, as for Diagram.svg()
+    output          optional file path: write the output there instead of
+                    returning it in ``data`` (``--jsonl`` only; the daemon
+                    refuses it)
+    id              anything JSON-able; echoed back untouched
+
+and its response:
+
+    id              the request's, if it had one
+    ok              True, or False with ``error`` set instead of ``data``
+    format          the format rendered
+    data            the output: text for svg/ascii, base64 for png/pdf
+    encoding        "utf-8" or "base64" -- how ``data`` is encoded
+    path, bytes     instead of data/encoding, when the request had ``output``
+    timings         the diagram's RenderStats phases (seconds), see stats.py
+    error           what went wrong, when not ok
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from pathlib import Path
+from typing import IO
+
+FORMATS = ("svg", "png", "pdf", "ascii")
+# Output file extension -> format, for everyone who picks the format from a
+# path (the CLI, batch.py, DiagramBase.save()).
+EXTENSION_FORMATS = {".svg": "svg", ".png": "png", ".pdf": "pdf", ".txt": "ascii", ".ascii": "ascii"}
+
+_RENDER_KEYS = ("theme", "config", "css")
+_RASTER_KEYS = ("width", "height", "scale", "background")
+_PDF_KEYS = ("pdf_format", "pdf_landscape", "pdf_margin")
+
+
+def handle(request: dict) -> dict:
+    """Render one request in this process and return its response. Never
+    raises for a bad request or a failed render -- that's an ``ok: False``
+    response."""
+    response = {"id": request["id"]} if "id" in request else {}
+    try:
+        fmt, output, stats = _render(request)
+    except Exception as exc:  # any failure is reported to the requester
+        response.update(ok=False, error=str(exc) or type(exc).__name__)
+        return response
+
+    if request.get("output"):
+        path = Path(request["output"])
+        try:
+            if isinstance(output, bytes):
+                path.write_bytes(output)
+            else:
+                path.write_text(output, encoding="utf-8")
+        except OSError as exc:
+            response.update(ok=False, error=str(exc))
+            return response
+        response.update(ok=True, format=fmt, path=str(path), bytes=path.stat().st_size)
+    elif isinstance(output, bytes):
+        response.update(ok=True, format=fmt, data=base64.b64encode(output).decode("ascii"), encoding="base64")
+    else:
+        response.update(ok=True, format=fmt, data=output, encoding="utf-8")
+    response["timings"] = dict(stats.phases)
+    return response
+
+
+def _render(request: dict) -> tuple:
+    from mermaidx.diagram import render
+
+    if not isinstance(request.get("source"), str):
+        raise ValueError("request needs a 'source' string")
+    fmt = request.get("format") or "svg"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+
+    render_opts = {k: request[k] for k in _RENDER_KEYS if request.get(k) is not None}
+    d = render(request["source"], backend=request.get("backend"), **render_opts)
+    raster = {k: request[k] for k in _RASTER_KEYS if request.get(k) is not None}
+
+    if fmt == "svg":
+        output = d.svg(embed_font=request.get("embed_font") or False)
+    elif fmt == "png":
+        output = d.png(**raster)
+    elif fmt == "pdf":
+        output = d.pdf(**raster, **{k: request[k] for k in _PDF_KEYS if request.get(k) is not None})
+    else:
+        output = d.ascii()
+    return fmt, output, d.stats
+
+
+def decode(response: dict):
+    """The output carried by an ``ok`` response -- bytes for png/pdf, str
+    for svg/ascii. Raises RuntimeError with the response's error otherwise."""
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error") or "render failed")
+    if response.get("encoding") == "base64":
+        return base64.b64decode(response["data"])
+    return response["data"]
+
+
+def handle_line(line: str) -> dict:
+    """handle() for one line of JSON -- an unparsable one is an ``ok:
+    False`` response too."""
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("expected a JSON object")
+    except ValueError as exc:
+        return {"ok": False, "error": f"invalid request: {exc}"}
+    return handle(request)
+
+
+def serve_jsonl(requests: IO[str], responses: IO[str], *, jobs: int = 1) -> int:
+    """
+    Answer one JSON request per line of ``requests`` with one JSON response
+    per line on ``responses``, each written (and flushed) as soon as it's
+    done, until ``requests`` ends. Blank lines are skipped. Returns the
+    number of failed requests.
+
+    ``jobs`` > 1 renders on that many worker processes, so responses can
+    come back out of order -- give requests an ``id`` to match them up.
+    With 1, everything renders in this process on one warm engine, in order.
+    """
+    lines = (line for line in requests if line.strip())
+    failed = 0
+    if jobs <= 1:
+        results = map(handle_line, lines)
+        pool = None
+    else:
+        import multiprocessing as mp
+
+        # 'spawn', as in pool.py: workers start without inherited native state.
+        pool = mp.get_context("spawn").Pool(jobs)
+        results = pool.imap_unordered(handle_line, lines)
+    try:
+        for response in results:
+            failed += not response["ok"]
+            responses.write(json.dumps(response) + "\n")
+            responses.flush()
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return failed
@@ -0,0 +1,155 @@
+"""
+mermaidx.shared — hand large results from pool workers to the parent
+through shared memory instead of the pool's pipe.
+
+A result sent back by multiprocessing is pickled in the worker, copied
+through the pipe, and unpickled in the parent -- a 5 MB PNG is copied
+several times over, and the parent pays for every output whether it ever
+reads it or not. Here a worker appends each payload over ``THRESHOLD``
+bytes to one segment file per chunk -- in /dev/shm, i.e. RAM, where there
+is one -- and pickles only a SharedPayload handle (path, offset, length).
+The parent reads a payload when it's first used and drops the segment file
+once nothing refers to it any more. Only that parent owns the file: pickling
+a payload again (a Diagram sent on to another process, say) pickles its
+data, not another handle.
+
+Small payloads stay inline: for them the pipe is cheaper than a file.
+"""
+
+from __future__ import annotations
+
+import os
+import weakref
+from typing import Optional
+
+THRESHOLD = 64 * 1024
+
+_SHM_DIR = "/dev/shm"
+
+
+def new_file(size: int = 0) -> str:
+    """Path of a new file of ``size`` zero bytes, RAM-backed (/dev/shm)
+    if possible. The caller unlinks it."""
+    import tempfile
+
+    directory = _SHM_DIR if os.path.isdir(_SHM_DIR) and os.access(_SHM_DIR, os.W_OK) else None
+    fd, path = tempfile.mkstemp(prefix="mermaidx-", dir=directory)
+    with os.fdopen(fd, "r+b") as f:
+        f.truncate(size)
+    return path
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class Segment:
+    """One worker chunk's payload file. Unpickling it (in the parent)
+    takes ownership: the file is removed once the Segment -- and so every
+    SharedPayload in it -- is gone. An owned Segment is never pickled
+    again, so the file has exactly one owner."""
+
+    __slots__ = ("path", "owned", "__weakref__")
+
+    def __init__(self, path: str, owned: bool = False) -> None:
+        self.path = path
+        self.owned = owned
+
+    def __reduce__(self):
+        if self.owned:
+            raise TypeError("An attached Segment can't be pickled; its payloads can.")
+        return _attach, (self.path,)
+
+
+def _attach(path: str) -> Segment:
+    segment = Segment(path, owned=True)
+    weakref.finalize(segment, _unlink, path)
+    return segment
+
+
+class SharedPayload:
+    """A ``bytes`` or ``str`` result that's still in its segment file;
+    load() reads it."""
+
+    __slots__ = ("segment", "offset", "length", "text")
+
+    def __init__(self, segment: Segment, offset: int, length: int, text: bool) -> None:
+        self.segment = segment
+        self.offset = offset
+        self.length = length
+        self.text = text
+
+    def __reduce__(self):
+        if self.segment.owned:  # pickled again: the copy gets the data itself
+            data = self.load()
+            return type(data), (data,)
+        return SharedPayload, (self.segment, self.offset, self.length, self.text)
+
+    def load(self):
+        with open(self.segment.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(self.length)
+        return data.decode("utf-8") if self.text else data
+
+
+class Spill:
+    """Worker side: moves payloads into this chunk's segment file."""
+
+    def __init__(self, threshold: int = THRESHOLD) -> None:
+        self.threshold = threshold
+        self._segment: Optional[Segment] = None
+        self._file = None
+
+    def share(self, value):
+        """``value`` with every large bytes/str in it (also inside tuples,
+        lists and dicts) replaced by a SharedPayload."""
+        if isinstance(value, (bytes, str)):
+            if len(value) < self.threshold:
+                return value
+            return self._write(value.encode("utf-8") if isinstance(value, str) else value, isinstance(value, str))
+        if isinstance(value, tuple):
+            return tuple(self.share(v) for v in value)
+        if isinstance(value, list):
+            return [self.share(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self.share(v) for k, v in value.items()}
+        return value
+
+    def _write(self, data: bytes, text: bool) -> SharedPayload:
+        if self._file is None:
+            self._segment = Segment(new_file())
+            self._file = open(self._segment.path, "r+b")
+        offset = self._file.tell()
+        self._file.write(data)
+        return SharedPayload(self._segment, offset, len(data), text)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def load(value):
+    """``value`` with every SharedPayload in it read back (the inverse of
+    Spill.share())."""
+    if isinstance(value, SharedPayload):
+        return value.load()
+    if isinstance(value, tuple):
+        return tuple(load(v) for v in value)
+    if isinstance(value, list):
+        return [load(v) for v in value]
+    if isinstance(value, dict):
+        return {k: load(v) for k, v in value.items()}
+    return value
+
+
+def contains_payload(value) -> bool:
+    if isinstance(value, SharedPayload):
+        return True
+    if isinstance(value, (tuple, list)):
+        return any(contains_payload(v) for v in value)
+    if isinstance(value, dict):
+        return any(contains_payload(v) for v in value.values())
+    return False
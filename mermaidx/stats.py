@@ -0,0 +1,138 @@
+"""
+mermaidx.stats -- where a render's time goes.
+
+Every Diagram carries a RenderStats (``d.stats``) that its own pipeline
+fills in as it runs: one accumulated duration per *phase* and a handful of
+*counters*. Recording is a couple of perf_counter() calls per phase, so
+it's always on; what's opt-in is exporting it -- register a hook with
+add_hook() and it's called for every phase/counter as it's recorded, e.g.
+to feed a metrics system::
+
+    def export(stats, name, value):
+        metrics.observe(f"mermaidx.{name}", value)
+
+    mermaidx.stats.add_hook(export)
+
+Phases (seconds):
+    js_boot         starting the shared engine (only on the render that started it)
+    svg             the whole SVG step, as seen from Python (includes everything js_*)
+    js_initialize   mermaid.initialize() + CSS injection (absent when skipped, see
+                    engines/render_glue.py)
+    js_render       mermaid.render(): parse, layout, measure callbacks, serialization
+    measure         time inside Python text-measurement callbacks (QuickJS only --
+                    V8 measures in JS, see engines/v8_engine.py)
+    resvg           SVG -> PNG rasterization
+    png_decode      PNG -> raw pixels
+    pdf_build       raw pixels -> PDF
+    embed_font      font subsetting for svg(embed_font=True)
+
+Counters:
+    measure_calls, job_pump_iterations (QuickJS only), initialize_skipped,
+    svg_bytes, cache_hits, cache_misses
+
+Hooks run in the process that recorded the value -- for render_many(),
+that's the worker processes, not the caller.
+
+A Diagram created with ``profile=True`` also looks *inside* js_render:
+``d.stats.profile`` is a list of rows, slowest first, one per DOM-shim
+entry point it called (see engines/render_glue.py's PROFILED_FUNCTIONS)::
+
+    d = mermaidx.render(source, profile=True)
+    d.svg()
+    print(mermaidx.stats.format_profile(d.stats.profile))
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+
+_hooks: list = []
+_hooks_lock = threading.Lock()
+
+
+def add_hook(hook) -> None:
+    """Call ``hook(stats, name, value)`` for every phase duration (seconds)
+    and counter increment recorded from now on, in any Diagram."""
+    with _hooks_lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook) -> None:
+    """Unregister a hook added with add_hook(). No-op if it isn't registered."""
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+@dataclass
+class RenderStats:
+    """Accumulated per-phase durations (seconds) and counters for one
+    Diagram -- see the module docstring for what each name means."""
+
+    phases: dict = field(default_factory=dict)
+    counters: dict = field(default_factory=dict)
+    profile: Optional[list] = None
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        _emit(self, phase, seconds)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+        _emit(self, name, n)
+
+    @contextmanager
+    def timed(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start)
+
+    def merge(self, engine_stats: dict) -> None:
+        """Fold in the ``{"phases": ..., "counters": ...}`` dict an engine
+        fills in for one render (see the engines' render_svg(stats=...))."""
+        for phase, seconds in engine_stats.get("phases", {}).items():
+            self.record(phase, seconds)
+        for name, n in engine_stats.get("counters", {}).items():
+            self.count(name, n)
+        if "profile" in engine_stats:
+            self.profile = profile_report(engine_stats["profile"])
+
+    def as_dict(self) -> dict:
+        result = {"phases": dict(self.phases), "counters": dict(self.counters)}
+        if self.profile is not None:
+            result["profile"] = list(self.profile)
+        return result
+
+
+def profile_report(raw: dict) -> list:
+    """An engine's raw ``{function: {"calls": n, "ms": t}}`` profile as
+    rows ``{"function", "calls", "total_ms", "mean_us"}``, slowest total
+    first; functions that were never called are left out."""
+    rows = [
+        {"function": name, "calls": entry["calls"], "total_ms": entry["ms"],
+         "mean_us": entry["ms"] * 1000 / entry["calls"]}
+        for name, entry in raw.items() if entry["calls"]
+    ]
+    rows.sort(key=lambda row: (-row["total_ms"], -row["calls"]))
+    return rows
+
+
+def format_profile(rows: list) -> str:
+    """profile_report() rows as a plain-text table."""
+    lines = [f"{'function':<20} {'calls':>8} {'total ms':>10} {'mean us':>9}"]
+    lines.extend(
+        f"{row['function']:<20} {row['calls']:>8} {row['total_ms']:>10.2f} {row['mean_us']:>9.1f}"
+        for row in rows
+    )
+    return "\n".join(lines)
+
+
+def _emit(stats: RenderStats, name: str, value) -> None:
+    for hook in list(_hooks):
+        hook(stats, name, value)
@@ -0,0 +1,231 @@
+"""
+mermaidx.synthetic — parameterized, arbitrarily large Mermaid sources.
+
+Everything in tests/samples is small; real-world diagrams aren't (3,000-node
+flowcharts, 500-participant sequence diagrams). These generators produce
+diagrams of a given size and shape so scaling problems -- anything
+quadratic in the shim or the Python layer -- show up in `mermaidx bench`
+(see bench.py, ``--kinds``) instead of in production::
+
+    >>> from mermaidx import synthetic
+    >>> src = synthetic.generate("flowchart", 3000, edge_density=1.5, depth=2)
+
+Every generator takes the same knobs; each kind interprets them in its own
+terms:
+
+    nodes          flowchart nodes, sequence participants, states, classes,
+                   ER entities, mindmap nodes
+    edge_density   edges (messages, transitions, relations) per node; ignored
+                   by mindmap, which is always a tree
+    label_length   characters per label (0 = bare ids)
+    depth          nesting: subgraphs (flowchart), loop blocks (sequence),
+                   composite states (state), namespaces (class -- mermaid's
+                   don't nest, so `depth` of them side by side), tree depth
+                   (mindmap, 0 = pick one); ignored by ER
+
+Output is deterministic for a given ``seed``.
+"""
+
+from __future__ import annotations
+
+import random
+
+KINDS = ("flowchart", "sequence", "state", "class", "er", "mindmap")
+
+# Lowercase filler words for labels -- nothing that's a keyword in any
+# diagram grammar (no 'end', 'graph', 'loop', 'note', 'class', ...).
+_WORDS = (
+    "alpha", "bravo", "cedar", "delta", "ember", "fjord", "gamma", "harbor", "iris", "juniper",
+    "kappa", "lumen", "maple", "nimbus", "onyx", "prism", "quartz", "river", "sigma", "tundra",
+)
+
+_CLASS_RELATIONS = ("<|--", "*--", "o--", "-->", "..>", "..|>")
+_ER_CARDINALITIES = ("||--o{", "||--|{", "}o--o{", "|o--||", "||--||")
+
+
+def _label(rng: random.Random, length: int) -> str:
+    words = []
+    while sum(len(w) + 1 for w in words) < length:
+        words.append(rng.choice(_WORDS))
+    return " ".join(words)[:length].strip()
+
+
+def _edges(rng: random.Random, n: int, density: float) -> list:
+    """Connected, mostly layered edge list over 0..n-1: every node k > 0
+    hangs off one of the few nodes just before it, then extra forward
+    edges are added until there are ~``density * (n - 1)`` in total."""
+    edges = [(rng.randrange(max(0, k - 4), k), k) for k in range(1, n)]
+    seen = set(edges)
+    target = max(len(edges), round(density * (n - 1)))
+    attempts = 0
+    while len(edges) < target and attempts < target * 10:
+        attempts += 1
+        i, j = sorted(rng.sample(range(n), 2))
+        if (i, j) not in seen:
+            seen.add((i, j))
+            edges.append((i, j))
+    return edges
+
+
+def _bands(n: int, depth: int) -> list:
+    """Split 0..n-1 into ``depth + 1`` contiguous bands; band i ends up
+    nested i levels deep."""
+    size = -(-n // (depth + 1))
+    return [range(k, min(k + size, n)) for k in range(0, n, size)]
+
+
+def flowchart(nodes: int, *, edge_density: float = 1.5, label_length: int = 12, depth: int = 0,
+              seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = ["flowchart TD"]
+
+    def node(k):
+        text = _label(rng, label_length)
+        return f"n{k}[{text}]" if text else f"n{k}"
+
+    bands = _bands(nodes, depth)
+    for level, band in enumerate(bands):
+        indent = "    " * (level + 1)
+        if level:
+            lines.append(f"{'    ' * level}subgraph sg{level}[{_label(rng, label_length) or f'sg{level}'}]")
+        lines.extend(indent + node(k) for k in band)
+    lines.extend(f"{'    ' * level}end" for level in range(len(bands) - 1, 0, -1))
+    lines.extend(f"    n{i} --> n{j}" for i, j in _edges(rng, nodes, edge_density))
+    return "\n".join(lines)
+
+
+def sequence(nodes: int, *, edge_density: float = 1.5, label_length: int = 12, depth: int = 0,
+             seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = ["sequenceDiagram"]
+    lines.extend(f"    participant p{k} as {_label(rng, label_length) or f'p{k}'}" for k in range(nodes))
+    messages = max(1, round(edge_density * nodes))
+    # `depth` nested loop blocks around the middle third of the messages.
+    opened, closed = messages // 3, messages - messages // 3
+    for m in range(messages):
+        if m == opened:
+            lines.extend(f"    {'    ' * d}loop {_label(rng, label_length) or f'l{d}'}" for d in range(depth))
+        if m == closed:
+            lines.extend(f"    {'    ' * d}end" for d in range(depth - 1, -1, -1))
+        i, j = rng.sample(range(nodes), 2) if nodes > 1 else (0, 0)
+        arrow = "->>" if m % 2 == 0 else "-->>"
+        indent = "    " * (1 + (depth if opened <= m < closed else 0))
+        lines.append(f"{indent}p{i}{arrow}p{j}: {_label(rng, label_length) or f'm{m}'}")
+    if closed == messages:  # too few messages to close the loops between two of them
+        lines.extend(f"    {'    ' * d}end" for d in range(depth - 1, -1, -1))
+    return "\n".join(lines)
+
+
+def state(nodes: int, *, edge_density: float = 1.5, label_length: int = 12, depth: int = 0,
+          seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = ["stateDiagram-v2"]
+    bands = _bands(nodes, depth)
+    # Transitions stay inside their own band (mermaid's layout doesn't cope
+    # well with edges crossing composite-state borders); each band's last
+    # state enters the next, nested, composite state.
+    for level, band in enumerate(bands):
+        indent = "    " * (level + 1)
+        if level:
+            lines.append(f"{'    ' * level}state c{level} {{")
+        lines.append(f"{indent}[*] --> s{band[0]}")
+        for k in band:
+            text = _label(rng, label_length)
+            if text:
+                lines.append(f"{indent}s{k} : {text}")
+        for i, j in _edges(rng, len(band), edge_density):
+            lines.append(f"{indent}s{band[i]} --> s{band[j]}")
+        if level + 1 < len(bands):
+            lines.append(f"{indent}s{band[-1]} --> c{level + 1}")
+    lines.extend(f"{'    ' * level}}}" for level in range(len(bands) - 1, 0, -1))
+    return "\n".join(lines)
+
+
+def class_(nodes: int, *, edge_density: float = 1.5, label_length: int = 12, depth: int = 0,
+           seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = ["classDiagram"]
+    groups = _bands(nodes, depth - 1) if depth > 0 else [range(nodes)]
+    for g, group in enumerate(groups):
+        indent = "        " if depth > 0 else "    "
+        if depth > 0:
+            lines.append(f"    namespace ns{g} {{")
+        for k in group:
+            member = _label(rng, label_length).replace(" ", "_") or f"field{k}"
+            lines.append(f"{indent}class C{k} {{")
+            lines.append(f"{indent}    +String {member}")
+            lines.append(f"{indent}    +run() bool")
+            lines.append(f"{indent}}}")
+        if depth > 0:
+            lines.append("    }")
+    for i, j in _edges(rng, nodes, edge_density):
+        text = _label(rng, label_length)
+        lines.append(f"    C{i} {rng.choice(_CLASS_RELATIONS)} C{j}" + (f" : {text}" if text else ""))
+    return "\n".join(lines)
+
+
+def er(nodes: int, *, edge_density: float = 1.5, label_length: int = 12, depth: int = 0,
+       seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = ["erDiagram"]
+    for k in range(nodes):
+        column = _label(rng, label_length).replace(" ", "_") or "name"
+        lines.append(f"    E{k} {{")
+        lines.append("        int id PK")
+        lines.append(f"        string {column}")
+        lines.append("    }")
+    for i, j in _edges(rng, nodes, edge_density):
+        text = _label(rng, label_length) or "has"
+        lines.append(f'    E{i} {rng.choice(_ER_CARDINALITIES)} E{j} : "{text}"')
+    return "\n".join(lines)
+
+
+def mindmap(nodes: int, *, edge_density: float = 1.5, label_length: int = 12, depth: int = 0,
+            seed: int = 0) -> str:
+    rng = random.Random(seed)
+    depth = depth or max(2, min(6, nodes.bit_length() // 2))
+    children: dict = {0: []}
+    level = {0: 0}
+    open_parents = [0]  # nodes above the bottom level, i.e. that can take children
+    # Grow a single spine first so the requested depth is always reached,
+    # then attach the rest to recent open nodes (keeps fan-out bounded).
+    for k in range(1, nodes):
+        parent = k - 1 if k <= depth else rng.choice(open_parents[-50:])
+        children[parent].append(k)
+        children[k] = []
+        level[k] = level[parent] + 1
+        if level[k] < depth:
+            open_parents.append(k)
+
+    lines = ["mindmap"]
+    stack = [0]
+    while stack:
+        k = stack.pop()
+        indent = "  " * (level[k] + 1)
+        text = _label(rng, label_length) or f"m{k}"
+        lines.append(f"{indent}root(({text}))" if k == 0 else f"{indent}m{k}({text})")
+        stack.extend(reversed(children[k]))
+    return "\n".join(lines)
+
+
+_GENERATORS = {
+    "flowchart": flowchart,
+    "sequence": sequence,
+    "state": state,
+    "class": class_,
+    "er": er,
+    "mindmap": mindmap,
+}
+
+
+def generate(kind: str, nodes: int, **params) -> str:
+    """Mermaid source for a ``kind`` diagram (one of KINDS) with ``nodes``
+    nodes; ``params`` are edge_density / label_length / depth / seed (see
+    the module docstring)."""
+    try:
+        generator = _GENERATORS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown diagram kind {kind!r}; expected one of {', '.join(KINDS)}.") from None
+    if nodes < 1:
+        raise ValueError(f"nodes must be >= 1, got {nodes}")
+    return generator(nodes, **params)
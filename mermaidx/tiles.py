@@ -0,0 +1,259 @@
+"""
+mermaidx.tiles — rasterize a (very) large SVG as a stream of fixed-size tiles.
+
+    for tile in mermaidx.render(big_source).tiles(512, scale=2.0):
+        tile.png                     # one 512x512 (or smaller, at the edges) PNG
+    d.save("map.dzi")                # Deep Zoom pyramid: map.dzi + map_files/<level>/<col>_<row>.png
+    d.save("map.png", scale=2.0, tile_size=1024)   # one PNG, assembled band by band
+
+png() hands resvg the whole canvas: a 20k-pixel-wide diagram at 2x is a
+multi-gigabyte RGBA buffer inside resvg before a single PNG byte comes
+back. Here each tile is its own resvg render of the same SVG with the
+root viewBox cropped to that tile's region (and width/height set to the
+tile's pixels), so resvg never allocates more than one tile's canvas.
+Peak memory is the SVG plus one tile; the price is that every tile parses
+the SVG again, which for big diagrams is a real fraction of a render --
+use the largest tile size memory allows.
+
+Tiles are positioned at the same scale png(scale=...) uses and the grid
+covers exactly png()'s canvas, so stitched tiles line up with each other
+to the pixel. resvg applies a zoom slightly differently from a viewBox,
+so anti-aliased edges can differ from png()'s by a shade.
+
+write_png() stitches the tiles back into a single PNG without ever holding
+it: each row of tiles is decoded (png_decode) and streamed into a
+png_encode.PNGWriter, so memory is one band -- image width x tile_size --
+and the file can be larger than RAM. Decoding is pure Python, though, so
+this is by far the slowest way to get a PNG; it's for when png() can't
+fit at all.
+
+Deep Zoom (the .dzi format OpenSeadragon & co. read) needs every level of
+the pyramid; each level is rendered from the vector source at its own
+scale rather than downsampled from the level above -- sharper, and it
+never needs the pixels of a full level in memory either.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+_ROOT_TAG = re.compile(r"<svg\b[^>]*>")
+_SIZE_ATTRS = re.compile(r'\s(?:width|height|viewBox|preserveAspectRatio)\s*=\s*("[^"]*"|\'[^\']*\')')
+
+DZI_NAMESPACE = "http://schemas.microsoft.com/deepzoom/2008"
+
+
+@dataclass
+class Tile:
+    """One tile: ``png`` covers pixels ``[x, x + width) x [y, y + height)``
+    of the full image; ``column``/``row`` are its position in the grid."""
+
+    column: int
+    row: int
+    x: int
+    y: int
+    width: int
+    height: int
+    png: bytes
+
+
+def _attr(tag: str, name: str) -> Optional[str]:
+    match = re.search(rf'\s{name}\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', tag)
+    return None if match is None else (match.group(1) if match.group(1) is not None else match.group(2))
+
+
+def _length(value: Optional[str]) -> Optional[float]:
+    """An absolute width/height (unitless or px), or None for percentages
+    and anything else resvg would take from the viewBox instead."""
+    match = re.fullmatch(r"\s*([0-9.]+(?:[eE][-+]?\d+)?)\s*(?:px)?\s*", value or "")
+    return float(match.group(1)) if match else None
+
+
+def _geometry(svg: str) -> tuple:
+    """``(root tag, viewBox (x, y, w, h), natural size (w, h))`` -- the
+    natural size being what resvg renders at scale 1."""
+    match = _ROOT_TAG.search(svg)
+    if match is None:
+        raise ValueError("Not an SVG document: no <svg> element")
+    tag = match.group(0)
+    width, height = _length(_attr(tag, "width")), _length(_attr(tag, "height"))
+    view_box = _attr(tag, "viewBox")
+    if view_box is not None:
+        box = tuple(float(v) for v in view_box.replace(",", " ").split())
+    elif width is not None and height is not None:
+        box = (0.0, 0.0, width, height)
+    else:
+        raise ValueError("Cannot tile an SVG with neither a viewBox nor an absolute width and height")
+    if len(box) != 4 or box[2] <= 0 or box[3] <= 0:
+        raise ValueError(f"Invalid viewBox: {view_box!r}")
+    return tag, box, (width or box[2], height or box[3])
+
+
+def _round(value: float) -> int:
+    return int(math.floor(value + 0.5))  # Rust's f32::round: halves away from zero
+
+
+def image_size(svg: str, scale: float = 1.0) -> tuple[int, int]:
+    """Pixel size of ``svg`` rendered at ``scale`` -- the same as
+    png(scale=...)'s, without rendering anything."""
+    _, _, (width, height) = _geometry(svg)
+    # resvg rounds the document size to whole pixels before zooming it --
+    # the canvas only: the drawing keeps the exact size and is clipped to it.
+    return max(1, _round(_round(width) * scale)), max(1, _round(_round(height) * scale))
+
+
+def _with_root(svg: str, tag: str, width: int, height: int, view_box: tuple, align: str) -> str:
+    """``svg`` with its root element resized to ``width`` x ``height``
+    pixels showing ``view_box``."""
+    root = _SIZE_ATTRS.sub("", tag)
+    root = (f'{root[:-1].rstrip("/").rstrip()} width="{width}" height="{height}" '
+            f'viewBox="{" ".join(repr(v) for v in view_box)}" '
+            f'preserveAspectRatio="{align}"{"/>" if root.endswith("/>") else ">"}')
+    return svg.replace(tag, root, 1)
+
+
+def _crop(svg: str, tag: str, box: tuple, natural: tuple, scale: float, x: int, y: int, w: int, h: int) -> str:
+    """``svg`` with its root element cropped to pixels [x, x+w) x [y, y+h)
+    of the ``scale`` rendering, sized w x h pixels."""
+    # user units per pixel, per axis: viewBox -> natural size -> scale. The
+    # exact natural size, not image_size()'s rounded one: that's the size
+    # resvg draws at, so a tile's pixels are the same ones png() has there.
+    ux, uy = box[2] / (natural[0] * scale), box[3] / (natural[1] * scale)
+    return _with_root(svg, tag, w, h, (box[0] + x * ux, box[1] + y * uy, w * ux, h * uy), "none")
+
+
+def letterbox(svg: str, width: int, height: int) -> str:
+    """``svg`` resized to exactly ``width`` x ``height`` pixels, the
+    drawing scaled to fit and centered (aspect ratio kept) -- resvg then
+    renders the padding too, in the background color if one is given."""
+    tag, box, _ = _geometry(svg)
+    return _with_root(svg, tag, width, height, box, "xMidYMid meet")
+
+
+def _spans(length: int, tile_size: int, overlap: int) -> list:
+    """``(start, size)`` of each tile along one axis; neighbours share
+    ``overlap`` pixels on each side (Deep Zoom's convention)."""
+    spans = []
+    for index in range(max(1, math.ceil(length / tile_size))):
+        start = max(0, index * tile_size - overlap)
+        end = min(length, (index + 1) * tile_size + overlap)
+        spans.append((start, end - start))
+    return spans
+
+
+def _iter_tiles(svg: str, size: tuple, scale: float, tile_size: int, overlap: int,
+                background: Optional[str]) -> Iterator[Tile]:
+    from mermaidx.raster import render_png
+
+    tag, box, natural = _geometry(svg)
+    for row, (y, h) in enumerate(_spans(size[1], tile_size, overlap)):
+        for column, (x, w) in enumerate(_spans(size[0], tile_size, overlap)):
+            png = render_png(_crop(svg, tag, box, natural, scale, x, y, w, h), background=background)
+            yield Tile(column, row, x, y, w, h, png)
+
+
+def iter_tiles(
+    svg: str,
+    tile_size: int = 512,
+    *,
+    scale: float = 1.0,
+    overlap: int = 0,
+    background: Optional[str] = None,
+) -> Iterator[Tile]:
+    """
+    Rasterize ``svg`` tile by tile, row-major, yielding each as a Tile
+    with its PNG bytes. The grid covers png(scale=scale)'s canvas; edge
+    tiles are smaller.
+
+    Args:
+        svg:        Any SVG with a viewBox (every mermaid diagram has one)
+                    or an absolute width and height.
+        tile_size:  Tile edge in pixels.
+        scale:      Size multiplier, as png(scale=...).
+        overlap:    Extra pixels each tile shares with its neighbours.
+        background: CSS color, e.g. ``"#ffffff"``. Transparent by default.
+    """
+    if tile_size < 1 or overlap < 0:
+        raise ValueError(f"Need tile_size >= 1 and overlap >= 0, got {tile_size} and {overlap}.")
+    return _iter_tiles(svg, image_size(svg, scale), scale, tile_size, overlap, background)
+
+
+def write_png(
+    svg: str,
+    file,
+    *,
+    scale: float = 1.0,
+    tile_size: int = 1024,
+    background: Optional[str] = None,
+) -> tuple[int, int]:
+    """
+    Rasterize ``svg`` tile by tile into one PNG written to ``file`` (a
+    path or a binary file object), a band of ``tile_size`` rows at a time.
+    Same pixels as iter_tiles(), same size as png(scale=scale); returns
+    that ``(width, height)``.
+    """
+    from mermaidx.png_decode import decode_png_rgba
+    from mermaidx.png_encode import PNGWriter
+
+    if tile_size < 1:
+        raise ValueError(f"Need tile_size >= 1, got {tile_size}.")
+    size = image_size(svg, scale)
+    handle = open(file, "wb") if isinstance(file, (str, Path)) else file
+    try:
+        writer = PNGWriter(handle, *size)
+        band: list = []
+        for tile in _iter_tiles(svg, size, scale, tile_size, 0, background):
+            band.append(decode_png_rgba(tile.png))
+            if tile.x + tile.width == size[0]:  # last tile of its row
+                writer.write_tiles(band)
+                band = []
+        writer.close()
+    finally:
+        if handle is not file:
+            handle.close()
+    return size
+
+
+def write_deep_zoom(
+    svg: str,
+    path,
+    *,
+    scale: float = 1.0,
+    tile_size: int = 254,
+    overlap: int = 1,
+    background: Optional[str] = None,
+) -> int:
+    """
+    Write ``svg`` as a Deep Zoom image: ``path`` (``.dzi``, the XML
+    descriptor) plus ``<stem>_files/<level>/<column>_<row>.png``, level
+    ``N`` being full size (png(scale=scale)'s) and each one below half
+    the one above, down to 1x1. ``tile_size``/``overlap`` default to the
+    format's usual 254/1. Returns the number of tiles written.
+    """
+    if tile_size < 1 or overlap < 0:
+        raise ValueError(f"Need tile_size >= 1 and overlap >= 0, got {tile_size} and {overlap}.")
+    path = Path(path)
+    width, height = image_size(svg, scale)
+    levels = math.ceil(math.log2(max(width, height))) + 1
+    tiles_dir = path.with_name(f"{path.stem}_files")
+    count = 0
+    for level in range(levels):
+        factor = 2 ** (levels - 1 - level)
+        size = (math.ceil(width / factor), math.ceil(height / factor))
+        level_dir = tiles_dir / str(level)
+        level_dir.mkdir(parents=True, exist_ok=True)
+        for tile in _iter_tiles(svg, size, scale / factor, tile_size, overlap, background):
+            (level_dir / f"{tile.column}_{tile.row}.png").write_bytes(tile.png)
+            count += 1
+    path.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<Image xmlns="{DZI_NAMESPACE}" Format="png" Overlap="{overlap}" TileSize="{tile_size}">\n'
+        f'  <Size Width="{width}" Height="{height}"/>\n'
+        "</Image>\n",
+        encoding="utf-8",
+    )
+    return count
@@ -0,0 +1,215 @@
+"""
+mermaidx.watch — re-render diagrams as they're edited (``mermaidx watch``).
+
+    mermaidx watch diagrams/                           # diagrams/**.mmd -> <same dir>/<stem>.svg
+    mermaidx watch diagrams/ -o 'build/{stem}.png'
+    mermaidx watch docs/ --md-out build/docs           # Markdown too, see markdown.py
+
+Renders in this process, so the engine is started once and every edit
+after that costs one warm render. Watched paths are polled (stdlib
+``os.stat`` -- no inotify/watchdog dependency, and a few hundred stat()
+calls per poll are far cheaper than any render); a burst of saves is
+debounced into one pass once the files have been quiet for ``debounce``
+seconds.
+
+Only what actually changed is re-rendered, by content hash:
+
+    - a ``.mmd`` file goes through batch.convert(), whose manifest skips
+      it if its content (and the options) are what was last rendered --
+      saving without changes, or touching it, renders nothing;
+    - a ``.md`` document (watched only with ``md_out``) goes through
+      markdown.render_markdown(), whose content-addressed images mean only
+      the fences that changed are rendered; the document is rewritten.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+WATCHED_SUFFIXES = (".mmd", ".mermaid", ".md")
+
+DEFAULT_OUTPUT = "{dir}/{stem}.svg"
+
+
+class Watcher:
+    """
+    Polls ``paths`` (files, directories -- searched recursively -- or
+    globs) and re-renders what changed. ``run()`` loops forever;
+    ``step()`` is one poll, for driving it yourself.
+
+    ``output`` is the batch.py template for ``.mmd`` files, ``md_out`` /
+    ``image_dir`` / ``format`` go to render_markdown() for ``.md`` ones,
+    and ``options`` are the render options both take (backend, theme, ...).
+    ``on_event(kind, payload)`` is called with ``("file", FileResult)``
+    per diagram file and ``("markdown", (document, MarkdownReport))`` per
+    document.
+    """
+
+    def __init__(
+        self,
+        paths: list,
+        output: str = DEFAULT_OUTPUT,
+        *,
+        md_out=None,
+        image_dir: str = "diagrams",
+        format: str = "svg",
+        interval: float = 0.3,
+        debounce: float = 0.2,
+        on_event: Optional[Callable[[str, object], None]] = None,
+        **options,
+    ) -> None:
+        self.paths = [os.fspath(p) for p in paths]
+        self.output = output
+        self.md_out = Path(md_out).resolve() if md_out is not None else None
+        self.image_dir = image_dir
+        self.format = format
+        self.interval = interval
+        self.debounce = debounce
+        self.on_event = on_event or (lambda kind, payload: None)
+        self.options = options
+        self._snapshot: dict = {}
+
+        from mermaidx.batch import _output_format, output_path
+
+        _output_format(output_path(output, Path("x.mmd")))  # a bad template fails now, not on the first edit
+
+    def _files(self) -> list:
+        from mermaidx.batch import expand_inputs
+
+        suffixes = WATCHED_SUFFIXES if self.md_out is not None else WATCHED_SUFFIXES[:-1]
+        files = []
+        for path in expand_inputs(self.paths):
+            found = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+            for f in found:
+                # Never our own rewritten documents, or we'd chase our tail.
+                if f.suffix.lower() in suffixes and not (self.md_out and self.md_out in f.resolve().parents):
+                    files.append(f)
+        return files
+
+    def scan(self) -> list:
+        """Files added or modified since the last scan (all of them on the
+        first); deleted ones are just forgotten."""
+        snapshot = {}
+        for f in self._files():
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            snapshot[f] = (st.st_mtime_ns, st.st_size)
+        changed = [f for f, sig in snapshot.items() if self._snapshot.get(f) != sig]
+        self._snapshot = snapshot
+        return changed
+
+    def step(self) -> list:
+        """Poll once; if anything changed, wait for the edits to settle,
+        then render. Returns the files that were processed."""
+        changed = self.scan()
+        if not changed:
+            return []
+        pending = set(changed)
+        while True:  # debounce: keep collecting until a quiet period
+            time.sleep(self.debounce)
+            more = self.scan()
+            if not more:
+                break
+            pending.update(more)
+        self.render(sorted(pending))
+        return sorted(pending)
+
+    def render(self, files: list) -> None:
+        from mermaidx.batch import convert
+        from mermaidx.markdown import render_markdown
+
+        files = [f for f in files if f.exists()]  # saved, then deleted/renamed within the debounce
+        diagrams = [f for f in files if f.suffix.lower() != ".md"]
+        documents = [f for f in files if f.suffix.lower() == ".md"]
+        if diagrams:
+            convert(diagrams, self.output, jobs=1, on_result=lambda r: self.on_event("file", r), **self.options)
+        if documents:
+            root = os.path.commonpath([str(Path(p).resolve()) for p in self._roots()])
+            opts = {k: v for k, v in self.options.items() if k in ("backend", "theme", "config", "css")}
+            for document in documents:
+                report = render_markdown([document], self.md_out, format=self.format, image_dir=self.image_dir,
+                                         workers=1, root=root, **opts)
+                self.on_event("markdown", (document, report))
+
+    def _roots(self) -> list:
+        from mermaidx.batch import expand_inputs
+
+        return [p if p.is_dir() else p.parent for p in expand_inputs(self.paths)]
+
+    def run(self) -> None:
+        """Render everything out of date, then keep watching until Ctrl-C."""
+        from mermaidx.diagram import _get_engine_by_name
+
+        _get_engine_by_name(self.options.get("backend") or "quickjs")  # warm before the first edit
+        try:
+            while True:
+                if not self.step():
+                    time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def watch(paths: list, output: str = DEFAULT_OUTPUT, **kwargs) -> None:
+    """Watch ``paths`` and re-render on every change, until Ctrl-C. See
+    Watcher for the arguments."""
+    Watcher(paths, output, **kwargs).run()
+
+
+# ── `mermaidx watch` ─────────────────────────────────────────────────────────
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="mermaidx watch",
+        description="Re-render .mmd files (and, with --md-out, the mermaid fences of .md documents) "
+                    "whenever they change, on one warm engine.",
+    )
+    parser.add_argument("paths", nargs="+", metavar="PATH", help="Files, directories or globs to watch")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, metavar="TEMPLATE",
+                        help=f"Output for .mmd files: a directory or a {{stem}}/{{name}}/{{dir}} template "
+                             f"(default: {DEFAULT_OUTPUT})")
+    parser.add_argument("--md-out", default=None, metavar="DIR",
+                        help="Also watch .md documents and write them, rewritten, here (see `mermaidx md`)")
+    parser.add_argument("--format", choices=("svg", "png"), default="svg",
+                        help="Image format for Markdown diagrams (default: svg)")
+    parser.add_argument("--backend", default=None, metavar="NAME", help="Rendering backend (default: quickjs)")
+    parser.add_argument("-t", "--theme", choices=["default", "forest", "dark", "neutral"], default="default",
+                        help="Mermaid theme (default: default)")
+    parser.add_argument("--interval", type=float, default=0.3, metavar="S", help="Poll interval (default: 0.3)")
+    parser.add_argument("--debounce", type=float, default=0.2, metavar="S",
+                        help="Quiet time after a change before rendering (default: 0.2)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only report errors")
+    return parser
+
+
+def main(argv: Optional[list] = None) -> int:
+    args = _build_parser().parse_args(argv)
+
+    def report(kind: str, payload) -> None:
+        stamp = time.strftime("%H:%M:%S")
+        if kind == "file":
+            if payload.status == "failed":
+                print(f"{stamp}  FAILED    {payload.input}: {payload.error}", file=sys.stderr)
+            elif payload.status == "rendered" and not args.quiet:
+                print(f"{stamp}  rendered  {payload.input} -> {payload.output}  ({payload.seconds:.2f}s)",
+                      file=sys.stderr)
+        else:
+            document, md = payload
+            for _, line, error in md.errors:
+                print(f"{stamp}  FAILED    {document}:{line}: {error}", file=sys.stderr)
+            if not args.quiet:
+                print(f"{stamp}  rewrote   {document}  ({md.rendered} of {md.diagrams} diagrams rendered, "
+                      f"{md.seconds:.2f}s)", file=sys.stderr)
+
+    watcher = Watcher(args.paths, args.output, md_out=args.md_out, format=args.format, interval=args.interval,
+                      debounce=args.debounce, on_event=report, backend=args.backend, theme=args.theme)
+    if not args.quiet:
+        print(f"watching {' '.join(args.paths)} (Ctrl-C to stop)", file=sys.stderr)
+    watcher.run()
+    return 0
@@ -0,0 +1,101 @@
+"""Tests for mermaidx.bench (the `mermaidx bench` harness)."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+
+from mermaidx import bench
+
+
+def _report(**metrics):
+    return {"backends": {"quickjs": metrics}}
+
+
+def test_percentile_interpolates():
+    assert bench._percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert bench._percentile([1.0, 2.0], 50) == 1.5
+    assert bench._percentile([5.0], 99) == 5.0
+    assert bench._percentile([1.0, 2.0, 3.0, 4.0, 5.0], 100) == 5.0
+
+
+def test_collect_sources(tmp_path):
+    (tmp_path / "a.mmd").write_text("graph LR\n    A --> B", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+    sources = bench.collect_sources(tmp_path, sizes=(4, 8), kinds=("flowchart", "er"))
+    assert list(sources) == ["a", "synthetic_flowchart_4", "synthetic_flowchart_8", "synthetic_er_4", "synthetic_er_8"]
+    assert sources["synthetic_er_8"].startswith("erDiagram")
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = _report(latency_s={"p50": 0.10, "p99": 0.20}, throughput_per_s=10.0, peak_rss_bytes=100)
+    faster = _report(latency_s={"p50": 0.05, "p99": 0.22}, throughput_per_s=20.0, peak_rss_bytes=100)
+    assert bench.compare(faster, baseline, tolerance=0.25) == []
+
+    slower = _report(latency_s={"p50": 0.20, "p99": 0.20}, throughput_per_s=5.0, peak_rss_bytes=100)
+    regressions = bench.compare(slower, baseline, tolerance=0.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("quickjs: latency_s.p50")
+    assert regressions[1].startswith("quickjs: throughput_per_s")
+
+
+def test_compare_flags_new_failures():
+    assert bench.compare(_report(failures=1), _report(failures=0)) == ["quickjs: failures 0 -> 1"]
+    assert bench.compare(_report(failures=0), _report(failures=1)) == []
+
+
+def test_compare_skips_missing_backends_and_metrics():
+    baseline = {"backends": {"v8": {"cold_start_s": 1.0}}}
+    assert bench.compare(_report(cold_start_s=9.0), baseline) == []
+    assert bench.compare(_report(peak_rss_bytes=None), _report(peak_rss_bytes=100)) == []
+
+
+def test_run_benchmark_in_process(tmp_path):
+    (tmp_path / "tiny.mmd").write_text("graph LR\n    A --> B", encoding="utf-8")
+    (tmp_path / "broken.mmd").write_text("graph LR\n    A -->", encoding="utf-8")
+    report = bench.run_benchmark(["quickjs"], samples_dir=tmp_path, sizes=(3,), repeat=2, isolate=False)
+
+    result = report["backends"]["quickjs"]
+    assert set(result["latency_s"]) == {"p50", "p95", "p99"}
+    assert result["cold_start_s"] > 0
+    assert result["throughput_per_s"] > 0
+    assert "js_render" in result["phases_s"]
+    assert result["samples"]["tiny"]["svg_bytes"] > 0
+    assert result["samples"]["tiny"]["png_bytes"] > 0
+    assert "error" in result["samples"]["broken"]
+    assert result["failures"] == 1 and "cold_start_error" not in result
+    assert result["samples"]["tiny"]["heap_used_bytes"] > 0
+    assert [p["nodes"] for p in result["scaling"]["flowchart"]] == [3]
+    json.dumps(report)  # must be JSON-able as-is
+    assert bench.compare(report, report) == []
+
+
+def test_scaling_chart():
+    report = {"backends": {
+        "quickjs": {"scaling": {"er": [{"nodes": 5, "p50_s": 0.5}, {"nodes": 10, "error": "boom"}]}},
+        "v8": {"scaling": {"er": [{"nodes": 5, "p50_s": 0.25}, {"nodes": 10, "p50_s": 1.0}]}},
+    }}
+    chart = bench.scaling_chart(report, "er")
+    assert "xychart-beta" in chart
+    assert "quickjs blue, v8 orange" in chart
+    assert 'x-axis "nodes" [5, 10]' in chart
+    assert "line [0.5, 0]" in chart
+    assert "line [0.25, 1]" in chart
+    assert bench.scaling_chart(report, "er", "heap") is None
+    assert bench.scaling_chart(report, "mindmap") is None
+
+
+def test_plot_writes_svgs(tmp_path):
+    report = {"backends": {"quickjs": {"scaling": {"flowchart": [
+        {"nodes": 5, "p50_s": 0.1, "heap_used_bytes": 2**20}, {"nodes": 10, "p50_s": 0.3, "heap_used_bytes": 2**21},
+    ]}}}}
+    paths = bench.plot(report, tmp_path / "charts")
+    assert [p.name for p in paths] == ["flowchart_time.svg", "flowchart_heap.svg"]
+    assert all(p.read_text(encoding="utf-8").startswith("<svg") for p in paths)
+
+
+def test_cli_bench_help():
+    r = subprocess.run([sys.executable, "-m", "mermaidx", "bench", "--help"], capture_output=True, text=True)
+    assert r.returncode == 0
+    assert "--baseline" in r.stdout
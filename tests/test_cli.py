@@ -10,6 +10,7 @@ enough; no shared "session" object needs to be kept alive across tests.
 
 from __future__ import annotations
 
+import io
 import json
 import re
 import struct
@@ -20,7 +21,7 @@ from pathlib import Path
 
 import pytest
 
-from mermaidx import render
+from mermaidx import protocol, render
 
 BASIC_MERMAID = Path(__file__).parent / "basic.mermaid"
 SIMPLE = "graph LR\n    A --> B"
@@ -102,6 +103,13 @@ def test_missing_output_writes_svg_to_stdout():
     assert r.stdout.lstrip().startswith("<svg")
 
 
+def test_profile_prints_table_to_stderr():
+    r = run("-i", str(BASIC_MERMAID), "--profile")
+    assert r.returncode == 0
+    assert r.stdout.lstrip().startswith("<svg")
+    assert "__computeBBox" in r.stderr
+
+
 def test_invalid_mermaid_exits_nonzero():
     r = run("-i", "-", input="this is not valid mermaid {{{")
     assert r.returncode != 0
@@ -328,4 +336,90 @@ def test_backend_quickjs_explicit(tmp_path):
     r = run("-i", str(BASIC_MERMAID), "-o", str(out), "--backend", "quickjs")
     assert r.returncode == 0
     assert out.read_bytes().lstrip().startswith(b"<svg")
-    
\ No newline at end of file
+    
+
+# ── batch (many inputs) ──────────────────────────────────────────────────────
+
+def test_batch_glob_template_and_skip_unchanged(tmp_path):
+    (tmp_path / "src" / "sub").mkdir(parents=True)
+    (tmp_path / "src" / "a.mmd").write_text(SIMPLE)
+    (tmp_path / "src" / "sub" / "b.mmd").write_text(FLOWCHART)
+    template = str(tmp_path / "out" / "{stem}.png")
+
+    r = run("-i", str(tmp_path / "src" / "**" / "*.mmd"), "-o", template, "-j", "2")
+    assert r.returncode == 0, r.stderr
+    assert "2 rendered, 0 skipped, 0 failed" in r.stderr
+    assert _png_dims((tmp_path / "out" / "a.png").read_bytes())[0] > 0
+    assert _png_dims((tmp_path / "out" / "b.png").read_bytes())[0] > 0
+
+    # Unchanged inputs are skipped; an edited one is re-rendered.
+    (tmp_path / "src" / "a.mmd").write_text(FLOWCHART)
+    r = run("-i", str(tmp_path / "src" / "**" / "*.mmd"), "-o", template)
+    assert "1 rendered, 1 skipped, 0 failed" in r.stderr
+    assert re.search(r"rendered\s+\S*a\.mmd -> \S*a\.png  \(\d+\.\d\ds\)", r.stderr)
+
+    r = run("-i", str(tmp_path / "src" / "**" / "*.mmd"), "-o", template, "--force", "-q")
+    assert r.stderr.strip() == f"2 files: 2 rendered, 0 skipped, 0 failed in {r.stderr.split()[-1]}"
+
+
+def test_batch_output_directory_and_failures(tmp_path):
+    good, bad = tmp_path / "good.mmd", tmp_path / "bad.mmd"
+    good.write_text(SIMPLE)
+    bad.write_text("graph LR\n    A -->")
+    r = run("-i", str(good), "-i", str(bad), "-o", str(tmp_path / "out") + "/")
+    assert r.returncode == 1
+    assert "FAILED" in r.stderr and "bad.mmd" in r.stderr
+    assert (tmp_path / "out" / "good.svg").read_bytes().lstrip().startswith(b"<svg")
+    assert not (tmp_path / "out" / "bad.svg").exists()
+
+
+def test_batch_embed_font_external_links_one_shared_file(tmp_path):
+    pytest.importorskip("fontTools")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.mmd").write_text(SIMPLE)
+    (tmp_path / "src" / "b.mmd").write_text(FLOWCHART)
+    r = run("-i", str(tmp_path / "src" / "*.mmd"), "-o", str(tmp_path / "out" / "{stem}.svg"),
+            "--embed-font", "external")
+    assert r.returncode == 0, r.stderr
+    fonts = sorted(p.name for p in (tmp_path / "out").iterdir() if p.suffix in (".woff", ".woff2"))
+    assert fonts and fonts[0].startswith("DejaVuSans.")
+    for name in ("a.svg", "b.svg"):
+        svg = (tmp_path / "out" / name).read_text()
+        assert f'url("{fonts[0]}")' in svg and "base64" not in svg
+    assert run("-i", str(tmp_path / "src" / "a.mmd"), "--embed-font", "external").returncode != 0
+
+
+def test_batch_usage_errors(tmp_path):
+    (tmp_path / "a.mmd").write_text(SIMPLE)
+    (tmp_path / "b.mmd").write_text(SIMPLE)
+    assert run("-i", str(tmp_path / "a.mmd"), "-i", str(tmp_path / "b.mmd")).returncode != 0
+    assert run("-i", str(tmp_path / "nothing-*.mmd"), "-o", str(tmp_path)).returncode != 0
+    assert run("-i", str(tmp_path / "*.mmd"), "-o", str(tmp_path / "out.svg")).returncode != 0
+    r = run("-i", str(tmp_path / "*.mmd"), "-o", str(tmp_path / "out" / "{dir}.svg"))  # both write one file
+    assert r.returncode != 0 and "{name}" in r.stderr
+
+
+# ── --jsonl (requests on stdin) ──────────────────────────────────────────────
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_serve_jsonl(jobs):
+    lines = [json.dumps({"id": 1, "source": FLOWCHART}), "", "not json",
+             json.dumps({"id": 2, "source": FLOWCHART, "format": "png"})]
+    out = io.StringIO()
+    assert protocol.serve_jsonl(io.StringIO("\n".join(lines) + "\n"), out, jobs=jobs) == 1
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(responses) == 3
+    by_id = {r.get("id"): r for r in responses}
+    assert by_id[1]["ok"] and by_id[2]["encoding"] == "base64"
+    assert by_id[None]["error"].startswith("invalid request")
+    if jobs == 1:
+        assert [r.get("id") for r in responses] == [1, None, 2]
+
+
+def test_cli_jsonl():
+    stdin = json.dumps({"id": "a", "source": FLOWCHART}) + "\n" + json.dumps({"id": "b", "source": "graph LR\n A -->"})
+    r = run("--jsonl", input=stdin)
+    assert r.returncode == 1  # one request failed
+    a, b = map(json.loads, r.stdout.splitlines())
+    assert a["id"] == "a" and protocol.decode(a).startswith("<svg")
+    assert b["id"] == "b" and not b["ok"]
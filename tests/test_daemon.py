@@ -0,0 +1,241 @@
+"""Tests for mermaidx.daemon (`mermaidx serve`) and mermaidx.protocol."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from mermaidx import __version__, daemon, protocol, render
+
+FLOWCHART = "graph TD\n    A[Start] --> B{Yes?}\n    B -->|Yes| C[OK]"
+HAS_UNIX = hasattr(socket, "AF_UNIX")
+
+
+@pytest.fixture
+def address(tmp_path):
+    return str(tmp_path / "d.sock") if HAS_UNIX else "127.0.0.1:0"
+
+
+@pytest.fixture
+def server(address):
+    srv = daemon.make_server(address, allow_tcp=True)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    host_port = srv.server_address
+    yield f"{host_port[0]}:{host_port[1]}" if isinstance(host_port, tuple) else host_port
+    srv.shutdown()
+    srv.server_close()
+
+
+def run_cli(*args, address, input=None):
+    env = {**os.environ, daemon.ENV_VAR: address}
+    return subprocess.run([sys.executable, "-m", "mermaidx", *args], capture_output=True, input=input, env=env)
+
+
+# ── protocol ─────────────────────────────────────────────────────────────────
+
+def test_protocol_svg_and_png():
+    svg = protocol.handle({"id": 7, "source": FLOWCHART})
+    assert svg["id"] == 7 and svg["ok"] and svg["encoding"] == "utf-8"
+    assert protocol.decode(svg).startswith("<svg")
+    assert svg["timings"]["svg"] > 0
+
+    png = protocol.handle({"source": FLOWCHART, "format": "png", "width": 300})
+    assert png["encoding"] == "base64"
+    assert protocol.decode(png) == render(FLOWCHART).png(width=300)
+
+
+def test_protocol_errors_are_responses():
+    bad = protocol.handle({"id": "x", "source": "this is not valid mermaid {{{"})
+    assert bad == {"id": "x", "ok": False, "error": bad["error"]}
+    assert "Mermaid rendering failed" in bad["error"]
+    with pytest.raises(RuntimeError, match="Mermaid rendering failed"):
+        protocol.decode(bad)
+    assert not protocol.handle({"format": "svg"})["ok"]
+    assert "Unknown format" in protocol.handle({"source": FLOWCHART, "format": "gif"})["error"]
+
+
+def test_protocol_output_path(tmp_path):
+    response = protocol.handle({"source": FLOWCHART, "format": "png", "output": str(tmp_path / "x.png")})
+    assert response["ok"] and "data" not in response
+    assert response["bytes"] == (tmp_path / "x.png").stat().st_size
+    assert (tmp_path / "x.png").read_bytes() == render(FLOWCHART).png()
+
+
+# ── daemon ───────────────────────────────────────────────────────────────────
+
+def test_address_parsing():
+    assert daemon.parse_address("127.0.0.1:7463") == ("127.0.0.1", 7463)
+    assert daemon.parse_address(":9000") == ("127.0.0.1", 9000)
+    assert daemon.parse_address("/run/user/1000/mermaidx.sock") == "/run/user/1000/mermaidx.sock"
+
+
+def test_ping_request_and_stop(server):
+    pong = daemon.ping(server)
+    assert pong["version"] == __version__ and pong["pid"] == os.getpid()
+
+    response = daemon.request({"source": FLOWCHART, "format": "pdf"}, server)
+    assert protocol.decode(response).startswith(b"%PDF")
+    assert daemon.request({"source": "not mermaid {{{"}, server)["ok"] is False
+
+    assert daemon.stop(server)
+
+
+def test_no_daemon_means_none(tmp_path):
+    missing = str(tmp_path / "nobody.sock")
+    assert daemon.ping(missing) is None
+    assert daemon.request({"source": FLOWCHART}, missing) is None
+    assert daemon.stop(missing) is False
+
+
+def test_concurrent_clients(server):
+    results = [None] * 4
+
+    def worker(i):
+        results[i] = daemon.request({"source": f"graph LR\n    A{i} --> B{i}", "id": i}, server)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [r["id"] for r in results] == [0, 1, 2, 3]
+    assert all(f"A{i}" in r["data"] for i, r in enumerate(results))
+
+
+@pytest.mark.skipif(not HAS_UNIX, reason="Unix sockets only")
+def test_stale_socket_file_is_replaced_but_live_one_is_not(tmp_path):
+    path = tmp_path / "stale.sock"
+    with socket.socket(socket.AF_UNIX) as stale:
+        stale.bind(str(path))  # left behind by a daemon that died
+    srv = daemon.make_server(str(path))
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    try:
+        with pytest.raises(RuntimeError, match="already listening"):
+            daemon.make_server(str(path))
+    finally:
+        srv.shutdown()
+        srv.server_close()
+    assert not path.exists()  # cleaned up on close
+
+
+@pytest.mark.skipif(not HAS_UNIX, reason="Unix sockets only")
+def test_make_server_never_unlinks_a_regular_file(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("keep me")
+    with pytest.raises(RuntimeError, match="not a socket"):
+        daemon.make_server(str(path))
+    assert path.read_text() == "keep me"
+
+
+def test_tcp_needs_an_explicit_opt_in():
+    with pytest.raises(RuntimeError, match="TCP"):
+        daemon.make_server("127.0.0.1:0")
+
+
+@pytest.mark.skipif(not HAS_UNIX, reason="Unix sockets only")
+def test_default_socket_lives_in_a_private_directory(tmp_path, monkeypatch):
+    monkeypatch.delenv(daemon.ENV_VAR, raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    srv = daemon.make_server()
+    try:
+        directory = os.path.dirname(srv.server_address)
+        assert os.stat(directory).st_mode & 0o777 == 0o700
+    finally:
+        srv.server_close()
+
+    os.chmod(directory, 0o755)
+    with pytest.raises(RuntimeError, match="0700"):
+        daemon.make_server()
+
+
+@pytest.mark.skipif(not HAS_UNIX, reason="Unix sockets only")
+def test_client_ignores_sockets_it_does_not_own(server, monkeypatch):
+    assert daemon.ping(server) is not None
+    monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+    assert daemon.ping(server) is None
+    assert daemon.request({"source": FLOWCHART}, server) is None
+
+
+def test_daemon_refuses_to_write_files(server, tmp_path):
+    target = tmp_path / "x.svg"
+    response = daemon.request({"id": 3, "source": FLOWCHART, "output": str(target)}, server)
+    assert response["id"] == 3 and not response["ok"]
+    assert "doesn't write files" in response["error"]
+    assert not target.exists()
+
+
+def test_daemon_hangs_up_after_a_line_that_is_not_json(server):
+    target = daemon.parse_address(server)
+    family = socket.AF_INET if isinstance(target, tuple) else socket.AF_UNIX
+    with socket.socket(family) as sock:
+        sock.connect(target)
+        sock.sendall(b"POST / HTTP/1.1\r\n" + json.dumps({"op": "shutdown"}).encode() + b"\n")
+        with sock.makefile("rb") as replies:
+            first = json.loads(replies.readline())
+            assert first["error"].startswith("invalid request")
+            assert replies.readline() == b""  # closed; the shutdown was never read
+    assert daemon.ping(server) is not None
+
+
+# ── CLI routing ──────────────────────────────────────────────────────────────
+
+def test_cli_routes_through_daemon(server, tmp_path):
+    out = tmp_path / "out.png"
+    r = run_cli("-i", "-", "-o", str(out), "-w", "300", "--daemon", "on", address=server, input=FLOWCHART.encode())
+    assert r.returncode == 0, r.stderr
+    assert out.read_bytes() == render(FLOWCHART).png(width=300)
+
+    r = run_cli("-i", "-", "--daemon", "on", address=server, input=FLOWCHART.encode())
+    assert r.stdout.startswith(b"<svg")
+
+    r = run_cli("-i", "-", "--daemon", "on", address=server, input=b"not mermaid {{{")
+    assert r.returncode != 0
+    assert b"Mermaid rendering failed" in r.stderr
+
+
+def test_cli_daemon_modes_without_daemon(tmp_path):
+    missing = str(tmp_path / "nobody.sock")
+    r = run_cli("-i", "-", "--daemon", "on", address=missing, input=FLOWCHART.encode())
+    assert r.returncode != 0
+    assert b"no mermaidx daemon" in r.stderr
+
+    r = run_cli("-i", "-", address=missing, input=FLOWCHART.encode())  # auto: falls back
+    assert r.returncode == 0
+    assert r.stdout.startswith(b"<svg")
+
+
+def test_serve_status_and_stop(server):
+    r = run_cli("serve", "--status", address=server)
+    assert r.returncode == 0
+    assert __version__.encode() in r.stdout
+    assert run_cli("serve", "--stop", address=server).returncode == 0
+
+
+def test_serve_subprocess_end_to_end(address):
+    if not HAS_UNIX:
+        pytest.skip("needs a fixed address")
+    proc = subprocess.Popen([sys.executable, "-m", "mermaidx", "serve", "--address", address],
+                            stderr=subprocess.PIPE)
+    try:
+        deadline = time.monotonic() + 60
+        while daemon.ping(address) is None:
+            assert proc.poll() is None, proc.stderr.read()
+            assert time.monotonic() < deadline
+            time.sleep(0.1)
+        assert daemon.ping(address)["pid"] == proc.pid
+        assert protocol.decode(daemon.request({"source": FLOWCHART}, address)).startswith("<svg")
+        assert daemon.stop(address)
+        assert proc.wait(timeout=30) == 0
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stderr.close()
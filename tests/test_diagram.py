@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import re
+
 import pytest
 
 import mermaidx
@@ -90,6 +92,21 @@ def test_png_with_background_and_width():
     assert decoded.width == 400
 
 
+def test_png_variants():
+    from mermaidx.png_decode import png_dimensions
+
+    d = mermaidx.render(FLOWCHART)
+    variants = d.png_variants((1, 2), widths=(300,), thumbnails=(64,))
+    assert list(variants) == ["1x", "2x", "w300", "thumb64"]
+    w1, h1 = png_dimensions(variants["1x"])
+    assert png_dimensions(variants["2x"]) == (w1 * 2, h1 * 2)
+    assert png_dimensions(variants["w300"])[0] == 300
+    assert max(png_dimensions(variants["thumb64"])) == 64
+    assert variants["2x"] == d.png(scale=2)  # shared with png()'s cache
+    raw, w, h = d.png_variants((1,), raw=True)["1x"]
+    assert (w, h) == (w1, h1) and len(raw) == w * h * 4
+
+
 def test_raw():
     d = mermaidx.render(FLOWCHART)
     raw, w, h = d.raw()
@@ -102,6 +119,27 @@ def test_numpy():
     arr = d.numpy()
     assert arr.dtype == np.uint8
     assert arr.ndim == 3 and arr.shape[2] == 4
+    assert arr.tobytes() == d.raw()[0]
+    assert arr.base is None  # decoded into its own buffer, no bytes in between
+
+    # The array is cached: nobody gets to change what the next caller sees.
+    assert not arr.flags.writeable
+    with pytest.raises(ValueError):
+        arr[:] = 0
+    assert d.numpy() is arr and arr.any()
+
+
+def test_decode_png_into_a_strided_buffer():
+    from mermaidx.png_decode import decode_png_into, decode_png_rgba
+
+    png = mermaidx.render(FLOWCHART).png(width=40)
+    rgba, w, h = decode_png_rgba(png)
+    stride = (w + 2) * 4
+    buf = bytearray(8 + stride * h)
+    assert decode_png_into(png, buf, offset=8, row_stride=stride) == (w, h)
+    assert all(buf[8 + y * stride:8 + y * stride + w * 4] == rgba[y * w * 4:(y + 1) * w * 4] for y in range(h))
+    with pytest.raises(ValueError):
+        decode_png_into(png, bytearray(len(rgba) - 1))
 
 
 def test_pdf_fully_supported_unlike_mmdr():
@@ -168,6 +206,108 @@ def test_save_unknown_format_override_raises(tmp_path):
         d.save(str(tmp_path / "d.svg"), format="bmp")
 
 
+def test_save_deep_zoom(tmp_path):
+    d = mermaidx.render(FLOWCHART)
+    d.save(str(tmp_path / "d.dzi"), tile_size=64)
+    width, height = mermaidx.tiles.image_size(d.svg())
+    descriptor = (tmp_path / "d.dzi").read_text(encoding="utf-8")
+    assert 'TileSize="64"' in descriptor and f'<Size Width="{width}" Height="{height}"/>' in descriptor
+    levels = sorted(int(p.name) for p in (tmp_path / "d_files").iterdir())
+    assert levels == list(range(len(levels))) and 2 ** (levels[-1] - 1) < max(width, height) <= 2 ** levels[-1]
+    assert sorted(p.name for p in (tmp_path / "d_files" / "0").iterdir()) == ["0_0.png"]
+    top = tmp_path / "d_files" / str(levels[-1])
+    assert len(list(top.iterdir())) == -(-width // 64) * -(-height // 64)
+
+
+# ── tiles() ───────────────────────────────────────────────────────────────
+
+def test_tiles_cover_png_canvas_and_stitch_seamlessly():
+    from mermaidx.png_decode import decode_png_rgba, png_dimensions
+
+    d = mermaidx.render(FLOWCHART)
+    width, height = png_dimensions(d.png(scale=1.5))
+    assert mermaidx.tiles.image_size(d.svg(), 1.5) == (width, height)
+
+    (whole,) = d.tiles(10_000, scale=1.5)
+    expected, _, _ = decode_png_rgba(whole.png)
+    stitched = bytearray(width * height * 4)
+    tiles = list(d.tiles(64, scale=1.5))
+    assert len(tiles) == -(-width // 64) * -(-height // 64)
+    for tile in tiles:
+        rgba, w, h = decode_png_rgba(tile.png)
+        assert (w, h) == (tile.width, tile.height) and (tile.x, tile.y) == (tile.column * 64, tile.row * 64)
+        for row in range(h):
+            start = ((tile.y + row) * width + tile.x) * 4
+            stitched[start:start + w * 4] = rgba[row * w * 4:(row + 1) * w * 4]
+    # Each tile's crop is in floating point: a few anti-aliased edge pixels
+    # come out a shade different, nothing more.
+    diffs = [abs(a - b) for a, b in zip(stitched, expected) if a != b]
+    assert len(diffs) < len(expected) // 500 and max(diffs, default=0) < 32
+
+
+def test_tiles_line_up_with_png_on_a_fractional_view_box():
+    from mermaidx.png_decode import decode_png_rgba
+    from mermaidx.raster import render_png
+
+    # 1-unit stripes: a crop that is off by a fraction of a pixel shows up
+    # as a different shade in every stripe edge of the tile.
+    stripes = "".join(f'<rect x="{x}" y="0" width="1" height="60.4" fill="#000"/>' for x in range(0, 100, 2))
+    svg = f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100.4 60.4">{stripes}</svg>'
+    expected, width, height = decode_png_rgba(render_png(svg, scale=2.5, background="#ffffff"))
+    assert mermaidx.tiles.image_size(svg, 2.5) == (width, height)
+    for tile in mermaidx.tiles.iter_tiles(svg, 64, scale=2.5, background="#ffffff"):
+        rgba, w, h = decode_png_rgba(tile.png)
+        for row in range(h):
+            start = ((tile.y + row) * width + tile.x) * 4
+            got, want = rgba[row * w * 4:(row + 1) * w * 4], expected[start:start + w * 4]
+            assert max(abs(a - b) for a, b in zip(got, want)) < 8, (tile.column, tile.row, row)
+
+
+def test_save_png_tiled_streams_the_same_image(tmp_path):
+    from mermaidx.png_decode import decode_png_rgba
+
+    d = mermaidx.render(FLOWCHART)
+    d.save(str(tmp_path / "d.png"), scale=1.5, tile_size=64)
+    rgba, w, h = decode_png_rgba((tmp_path / "d.png").read_bytes())
+    (whole,) = d.tiles(10_000, scale=1.5)
+    expected, ew, eh = decode_png_rgba(whole.png)
+    assert (w, h) == (ew, eh)
+    assert sum(a != b for a, b in zip(rgba, expected)) < len(expected) // 500
+
+
+def test_png_writer_streams_idat_chunks():
+    import io
+    import struct
+
+    from mermaidx.png_decode import decode_png_rgba
+    from mermaidx.png_encode import PNGWriter, encode_png
+
+    width, height = 7, 5
+    pixels = bytes((x * 31 + y * 17 + c * 5) & 0xFF for y in range(height) for x in range(width) for c in range(4))
+    out = io.BytesIO()
+    writer = PNGWriter(out, width, height, level=0, chunk_size=32)
+    for y in range(height):
+        writer.write_rows(pixels[y * width * 4:(y + 1) * width * 4])
+    writer.close()
+    data = out.getvalue()
+    assert decode_png_rgba(data) == (pixels, width, height)
+    assert decode_png_rgba(encode_png(pixels, width, height)) == (pixels, width, height)
+
+    kinds, pos = [], 8
+    while pos < len(data):
+        length = struct.unpack_from(">I", data, pos)[0]
+        kinds.append(data[pos + 4:pos + 8])
+        pos += 12 + length
+    assert kinds[0] == b"IHDR" and kinds[-1] == b"IEND" and kinds.count(b"IDAT") > 1
+
+    short = PNGWriter(io.BytesIO(), width, height)
+    short.write_rows(pixels[:width * 4])
+    with pytest.raises(ValueError):
+        short.close()
+    with pytest.raises(ValueError):
+        short.write_rows(b"\x00" * 3)
+
+
 # ── misc ──────────────────────────────────────────────────────────────────
 
 def test_repr_svg_for_jupyter():
@@ -356,6 +496,39 @@ def test_embed_font_is_cached_separately_from_plain_svg():
     assert d.svg() != d.svg(embed_font=True)
 
 
+def test_embed_font_subsets_are_memoized_and_shared():
+    pytest.importorskip("fontTools")
+    from mermaidx.font_embed import _subset_font
+
+    first = mermaidx.render(FLOWCHART).svg(embed_font=True)
+    misses = _subset_font.cache_info().misses
+    # Different text, still all Latin-1: the very same font blob, no new subset.
+    second = mermaidx.render("graph LR\n  X[Zebra] --> Y[Yak]").svg(embed_font=True)
+    assert _subset_font.cache_info().misses == misses
+    blob = re.compile(r"base64,([^)]+)\)")
+    assert blob.search(first).group(1) == blob.search(second).group(1)
+
+    exact = mermaidx.render(FLOWCHART).svg(embed_font="exact")
+    assert len(exact) < len(first)
+    with pytest.raises(ValueError, match="subset"):
+        mermaidx.render(FLOWCHART).svg(embed_font="latin-2")
+
+
+def test_embed_font_scan_finds_text_weights_and_families():
+    from mermaidx.font_embed import _LATIN_1, _scan
+
+    svg = ('<svg xmlns="http://www.w3.org/2000/svg"><style>#a{font-family:&quot;trebuchet ms&quot;,sans-serif;}'
+           '.b{font-weight:700}</style><text style="font-family:Verdana">A &amp; &#916;</text>'
+           '<text><![CDATA[z]]></text></svg>')
+    characters, weights, families = _scan(svg)
+    assert {"A", "&", "Δ", "z"} <= characters and "<" not in characters
+    assert weights == {"regular", "bold"}
+    assert families == {"trebuchet ms", "Verdana"}
+    # ASCII with no character references: Latin-1 covers the text, whatever it is.
+    assert _scan('<svg><text>plain</text></svg>', "latin-1")[0] == set(_LATIN_1)
+    assert _scan('<svg><text>&#916;</text></svg>', "latin-1")[0] == {"Δ"}
+
+
 def test_embed_font_does_not_affect_png():
     """.png()/.pdf() already guarantee measure == paint via resvg's own
     font override (see raster.py) regardless of embed_font -- this option
@@ -373,6 +546,11 @@ def test_save_svg_forwards_embed_font(tmp_path):
     assert "@font-face" in out.read_text(encoding="utf-8")
 
 
+def _strip_ids(svg: str) -> str:
+    """``svg`` without its render ids (gd<N>), which differ per render."""
+    return re.sub(r"gd\d+", "gd", svg)
+
+
 def _first_node_box_height(svg: str) -> float:
     import re
     return float(re.findall(r'label-container[^>]*height="([0-9.]+)"', svg)[0])
@@ -505,4 +683,106 @@ def test_multiline_edge_label_is_centered_on_its_background():
     assert rect_top <= text_absolute_y <= rect_bottom, (
         f"text baseline y={text_absolute_y} falls outside its own "
         f"background rect [{rect_top}, {rect_bottom}]"
-    )
\ No newline at end of file
+    )
+
+def test_engine_skips_reinitialize_when_config_unchanged():
+    """Consecutive renders with the same theme/config/css only call
+    mermaid.initialize() once; changing any of them re-initializes."""
+    import re
+
+    from mermaidx.engines.quickjs_engine import Engine
+
+    engine = Engine()
+    engine.start()
+    try:
+        calls = []
+        context = engine._context
+        configure = context.configure_fn
+        context.configure_fn = lambda *a: (calls.append(a), configure(*a))
+
+        first = engine.render_svg(FLOWCHART, "default", None, None)
+        engine.render_svg(FLOWCHART, "default", None, None)
+        assert len(calls) == 1
+
+        dark = engine.render_svg(FLOWCHART, "dark", None, None)
+        assert len(calls) == 2
+        again = engine.render_svg(FLOWCHART, "default", None, None)
+        assert len(calls) == 3
+    finally:
+        engine.close()
+
+    assert _strip_ids(again) == _strip_ids(first)
+    assert _strip_ids(dark) != _strip_ids(first)
+
+
+def test_quickjs_render_svg_many_reports_any_failure_in_place():
+    from mermaidx.engines.quickjs_engine import Engine, MermaidRenderError
+
+    engine = Engine()
+    engine.start()
+    try:
+        results = engine.render_svg_many([
+            (FLOWCHART, "default", {"bad": object()}, None),  # fails in Python, not in mermaid
+            (FLOWCHART, "default", None, None),
+        ])
+    finally:
+        engine.close()
+    assert isinstance(results[0], MermaidRenderError) and "TypeError" in str(results[0])
+    assert results[1].startswith("<svg")
+
+
+def test_quickjs_engine_recycles_context_in_background():
+    import time
+
+    from mermaidx import RecyclePolicy
+    from mermaidx.engines.quickjs_engine import Engine
+
+    engine = Engine(recycle=RecyclePolicy(max_renders=2, max_heap_bytes=1 << 40))
+    engine.start()
+    try:
+        first = engine._context
+        engine.render_svg(FLOWCHART, "default", None, None)
+        stats = engine.heap_stats()
+        assert stats["renders"] == 1 and stats["heap_used_bytes"] > 0
+        assert first.heap_used is not None  # tracked because the policy has a heap limit
+        engine.render_svg(FLOWCHART, "default", None, None)  # policy now due
+        deadline = time.monotonic() + 60
+        while engine._context is first and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert engine._context is not first
+        assert engine.heap_stats()["recycles"] == 1
+        assert engine.render_svg(FLOWCHART, "default", None, None).startswith("<svg")
+    finally:
+        engine.close()
+
+
+def test_quickjs_recycle_swap_never_fails_a_pending_render():
+    """A render picks its context and queues on it in one step, so a
+    recycle that swaps contexts and shuts the old one down in between
+    can't leave it submitting to a dead executor."""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from mermaidx.engines.quickjs_engine import Engine
+
+    engine = Engine()
+    engine.start()
+    try:
+        old = engine._context
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            with engine._lock:  # what _replace_context() holds for the swap
+                pending = ex.submit(engine.render_svg, FLOWCHART, "default", None, None)
+                time.sleep(0.2)
+                engine._context = engine._new_context()
+                old.close()
+            assert pending.result().startswith("<svg")
+        assert engine._context.render_count == 1  # it waited for the swap and went to the new context
+    finally:
+        engine.close()
+
+
+def test_engine_heap_stats_of_shared_engine():
+    mermaidx.render(FLOWCHART).svg()
+    stats = mermaidx.engine_heap_stats("quickjs")
+    assert stats["renders"] >= 1
+    assert stats["heap_used_bytes"] > 0
@@ -428,4 +428,22 @@ def test_json_stringify_object_containing_a_node_does_not_throw():
     JSON.stringify(size);
     """
     result = json.loads(ctx.eval(js))
-    assert result == {"width": 10, "height": 20, "x": 0, "y": 0, "node": {}}
\ No newline at end of file
+    assert result == {"width": 10, "height": 20, "x": 0, "y": 0, "node": {}}
+
+def test_reset_document_can_keep_injected_css():
+    """__resetDocument(true) is what lets an engine skip re-injecting the
+    same custom CSS on every render (see engines/render_glue.py)."""
+    ctx = _make_ctx()
+    ctx.eval("""
+    const css = document.createElement("style");
+    css.setAttribute("id", "mermaidx-css");
+    document.head.appendChild(css);
+    document.head.appendChild(document.createElement("style"));
+    document.body.appendChild(document.createElement("div"));
+    """)
+    ctx.eval("__resetDocument(true);")
+    assert ctx.eval("document.head.childNodes.length") == 1
+    assert ctx.eval("document.head.childNodes[0].getAttribute('id')") == "mermaidx-css"
+    assert ctx.eval("document.body.childNodes.length") == 0
+    ctx.eval("__resetDocument();")
+    assert ctx.eval("document.head.childNodes.length") == 0
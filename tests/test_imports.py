@@ -0,0 +1,51 @@
+"""`import mermaidx` and the light CLI paths must not load the heavy
+dependencies (engines, resvg, termaid, ...) -- see mermaidx/__init__.py."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("quickjs", "resvg_py", "termaid", "py_mini_racer", "fontTools",
+         "mermaidx.diagram", "mermaidx.engines.quickjs_engine", "mermaidx.raster")
+
+
+def _loaded_after(code: str) -> set:
+    probe = f"{code}\nimport sys\nprint(' '.join(sorted(sys.modules)), file=sys.stderr)"
+    r = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    return set(r.stderr.split())
+
+
+def test_import_mermaidx_is_lazy():
+    assert not _loaded_after("import mermaidx") & set(HEAVY)
+
+
+# --list-backends has to try importing py_mini_racer -- that's the check.
+@pytest.mark.parametrize(("argv", "allowed"), [
+    (["--version"], set()),
+    (["--list-backends"], {"py_mini_racer"}),
+    (["bench", "--help"], set()),
+])
+def test_light_cli_paths_stay_lazy(argv, allowed):
+    code = (f"import sys\nsys.argv = ['mermaidx', *{argv!r}]\n"
+            "from mermaidx.__main__ import main\ntry:\n    main()\nexcept SystemExit:\n    pass")
+    assert not _loaded_after(code) & (set(HEAVY) - allowed)
+
+
+def test_lazy_attributes_resolve():
+    import mermaidx
+
+    assert callable(mermaidx.render)
+    assert callable(mermaidx.backends)
+    assert mermaidx.stats.RenderStats
+    assert set(mermaidx.__all__) <= set(dir(mermaidx))
+    with pytest.raises(AttributeError):
+        _ = mermaidx.no_such_thing
+
+
+def test_svg_only_render_never_loads_resvg():
+    loaded = _loaded_after("import mermaidx\nmermaidx.render('graph LR; A-->B').svg()")
+    assert "quickjs" in loaded
+    assert not {"resvg_py", "termaid", "mermaidx.pdf_writer"} & loaded
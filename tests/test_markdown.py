@@ -0,0 +1,120 @@
+"""Tests for mermaidx.markdown (render_markdown() / `mermaidx md`)."""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+
+import pytest
+
+from mermaidx import render_markdown
+from mermaidx.markdown import _scope_ids, find_fences
+
+SIMPLE = "graph LR\n    A --> B\n"
+OTHER = "graph TD\n    X --> Y\n"
+
+
+def test_find_fences_follows_commonmark():
+    text = (
+        "# t\n\n```mermaid\n" + SIMPLE + "```\n\n"
+        "````markdown\n```mermaid\ngraph LR\n    quoted --> ignored\n```\n````\n\n"
+        "  ~~~~ mermaid theme=dark\n  graph TD\n      X --> Y\n  ~~~~\n"
+        "```python\nx = 1\n```\n"
+        "```mermaid\nunclosed\n"
+    )
+    fences = find_fences(text)
+    assert [f.source for f in fences] == [SIMPLE, OTHER, "unclosed\n"]
+    assert text[fences[0].start:fences[0].end] == "```mermaid\n" + SIMPLE + "```\n"
+    assert fences[-1].end == len(text)
+
+
+def test_render_markdown_dedupes_and_links(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "guide").mkdir(parents=True)
+    (docs / "index.md").write_text(f"# Index\n\n```mermaid\n{SIMPLE}```\n\n~~~mermaid\n{OTHER}~~~\n")
+    (docs / "guide" / "page.md").write_text(f"Again:\n\n```mermaid\n{SIMPLE}```\n\nno diagrams here\n")
+    (docs / "guide" / "plain.md").write_text("nothing to render\n")
+
+    report = render_markdown([docs], tmp_path / "build")
+    assert (len(report.documents), report.fences, report.diagrams, report.errors) == (3, 3, 2, [])
+
+    index = (tmp_path / "build" / "index.md").read_text()
+    page = (tmp_path / "build" / "guide" / "page.md").read_text()
+    links = re.findall(r"!\[mermaid diagram\]\((\S+)\)", index)
+    assert len(links) == 2 and all(link.startswith("diagrams/") for link in links)
+    assert page == f"Again:\n\n![mermaid diagram](../{links[0]})\n\nno diagrams here\n"
+    assert (tmp_path / "build" / "guide" / "plain.md").read_text() == "nothing to render\n"
+    assert sorted(p.name for p in (tmp_path / "build" / "diagrams").iterdir()) == sorted(
+        link.split("/")[-1] for link in links)
+    assert (docs / "index.md").read_text().count("```mermaid") == 1  # sources untouched
+
+    # Images are content-addressed: a second run renders only what changed.
+    (docs / "guide" / "page.md").write_text(f"```mermaid\n{SIMPLE}```\n```mermaid\ngraph LR\n    New --> One\n```\n")
+    report = render_markdown([docs], tmp_path / "build", workers=1)
+    assert (report.diagrams, report.rendered) == (3, 1)
+
+
+def test_render_markdown_inline_in_place_with_failures(tmp_path):
+    doc = tmp_path / "README.md"
+    doc.write_text(f"```mermaid\n{SIMPLE}```\n\n```mermaid\n{OTHER}```\n\n```mermaid\ngraph LR\n    A -->\n```\n")
+    report = render_markdown([doc], in_place=True, inline=True, workers=2)
+
+    text = doc.read_text()
+    assert text.count("<svg") == 2
+    assert not re.search(r"\bgd\d+", text)  # per-engine ids replaced by content-derived ones
+    ids = re.findall(r'<svg id="([^"]+)"', text)
+    assert len(set(ids)) == 2
+    assert [(e[0], e[1]) for e in report.errors] == [(doc, 11)]
+    assert (report.diagrams, report.rendered) == (3, 2)
+    assert "```mermaid\ngraph LR\n    A -->\n```" in text  # a failed fence stays as it was
+
+
+def test_scope_ids_only_touches_ids_and_references():
+    svg = ('<svg id="gd1"><style>#gd1 .node{fill:#gd1aaa}</style><marker id="gd1_end"/>'
+           '<path marker-end="url(#gd1_end)"/><g id="gd1-flowchart-A-0" class="gd1"><text>gd1 or #gd12</text></g></svg>')
+    assert _scope_ids(svg, "abc") == (
+        '<svg id="mermaid-abc"><style>#mermaid-abc .node{fill:#gd1aaa}</style><marker id="mermaid-abc_end"/>'
+        '<path marker-end="url(#mermaid-abc_end)"/><g id="mermaid-abc-flowchart-A-0" class="gd1">'
+        '<text>gd1 or #gd12</text></g></svg>')
+
+
+def test_render_markdown_external_font_is_written_once(tmp_path):
+    pytest.importorskip("fontTools")
+    docs = tmp_path / "docs"
+    (docs / "guide").mkdir(parents=True)
+    (docs / "index.md").write_text(f"```mermaid\n{SIMPLE}```\n\n```mermaid\n{OTHER}```\n")
+    (docs / "guide" / "page.md").write_text(f"```mermaid\n{SIMPLE}```\n")
+
+    render_markdown([docs], tmp_path / "inline", inline=True, embed_font="external", workers=1)
+    fonts = list((tmp_path / "inline" / "diagrams").iterdir())
+    assert [p.stem for p in fonts] == ["DejaVuSans"]
+    index = (tmp_path / "inline" / "index.md").read_text()
+    assert index.count(f'url("diagrams/{fonts[0].name}")') == 2 and "base64" not in index
+    assert f'url("../diagrams/{fonts[0].name}")' in (tmp_path / "inline" / "guide" / "page.md").read_text()
+
+    # An <img> never loads the font file, so image links can't use it.
+    with pytest.raises(ValueError, match="inline"):
+        render_markdown([docs], tmp_path / "linked", embed_font="external", workers=1)
+    r = subprocess.run([sys.executable, "-m", "mermaidx", "md", str(docs), "-o", str(tmp_path / "linked"),
+                        "--embed-font", "external"], capture_output=True, text=True)
+    assert r.returncode == 2 and "needs inline" in r.stderr
+
+
+def test_render_markdown_argument_errors(tmp_path):
+    with pytest.raises(ValueError):
+        render_markdown([tmp_path])
+    with pytest.raises(ValueError):
+        render_markdown([tmp_path], tmp_path / "out", in_place=True)
+    with pytest.raises(ValueError):
+        render_markdown([tmp_path], tmp_path / "out", format="pdf")
+
+
+def test_cli_md(tmp_path):
+    (tmp_path / "a.md").write_text(f"```mermaid\n{SIMPLE}```\n")
+    r = subprocess.run([sys.executable, "-m", "mermaidx", "md", str(tmp_path / "a.md"), "-o",
+                        str(tmp_path / "out"), "--format", "png"], capture_output=True, text=True)
+    assert r.returncode == 0, r.stderr
+    assert "1 documents, 1 fences, 1 distinct diagrams (1 rendered), 0 failed" in r.stderr
+    png = next((tmp_path / "out" / "diagrams").iterdir())
+    assert png.suffix == ".png" and png.read_bytes()[:4] == b"\x89PNG"
@@ -1,7 +1,11 @@
-"""Tests for mermaidx.render_many (real parallelism via multiprocessing)."""
+"""Tests for mermaidx.render_many / rasterize_many (real parallelism via multiprocessing)."""
 
 from __future__ import annotations
 
+import os
+
+import pytest
+
 import mermaidx
 
 SOURCES = [
@@ -45,3 +49,131 @@ def test_render_many_forwards_opts():
 def test_render_many_default_workers():
     diagrams = mermaidx.render_many(SOURCES)
     assert len(diagrams) == len(SOURCES)
+
+
+def test_render_many_returns_already_rendered_diagrams():
+    diagrams = mermaidx.render_many(SOURCES, workers=2)
+    for d in diagrams:
+        assert ("svg", ()) in d._cache
+
+
+def test_render_many_defers_errors_to_svg():
+    diagrams = mermaidx.render_many(["graph LR\nA-->B", "not a diagram"], workers=1)
+    assert diagrams[0].svg().startswith("<svg")
+    with pytest.raises(RuntimeError, match="Mermaid rendering failed"):
+        diagrams[1].svg()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_many_formats_returns_outputs(workers):
+    results = mermaidx.render_many(SOURCES[:2] + ["not a diagram"], workers=workers,
+                                   formats={"png": {"width": 120}, "pdf": {}})
+    assert set(results[0]) == {"png", "pdf"}
+    assert results[0]["png"] == mermaidx.render(SOURCES[0]).png(width=120)
+    assert results[1]["pdf"] == mermaidx.render(SOURCES[1]).pdf()
+    assert isinstance(results[2], RuntimeError)
+
+    assert mermaidx.render_many(SOURCES[:1], formats="svg")[0]["svg"].startswith("<svg")
+    with pytest.raises(ValueError, match="Unknown output format"):
+        mermaidx.render_many(SOURCES, formats=("gif",))
+
+
+def test_rasterize_many():
+    svgs = [mermaidx.render(s).svg() for s in SOURCES]
+    pngs = mermaidx.rasterize_many(svgs, workers=2, scale=2.0)
+    assert pngs == [mermaidx.render(s).png(scale=2.0) for s in SOURCES]
+    raw, w, h = mermaidx.rasterize_many(svgs[:1], "raw")[0]
+    assert len(raw) == w * h * 4
+    assert mermaidx.rasterize_many(svgs[:1], "pdf", pdf_format="A4")[0].startswith(b"%PDF-")
+    assert mermaidx.rasterize_many([]) == []
+    with pytest.raises(ValueError):
+        mermaidx.rasterize_many(svgs, "svg")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_array_letterboxes_into_one_array(workers):
+    np = pytest.importorskip("numpy")
+    array = mermaidx.render_array(SOURCES, 96, 64, workers=workers, background="#ffffff")
+    assert array.shape == (len(SOURCES), 64, 96, 4) and array.dtype == np.uint8
+    assert (array[..., 3] == 255).all()  # the background fills the padding too
+
+    # Same pixels as rendering the letterboxed SVG on its own.
+    from mermaidx.png_decode import decode_png_rgba
+    from mermaidx.tiles import letterbox
+
+    svg = mermaidx.render(SOURCES[1]).svg()
+    rgba, w, h = decode_png_rgba(mermaidx.svg_to_png(letterbox(svg, 96, 64), background="#ffffff"))
+    assert (w, h) == (96, 64) and array[1].tobytes() == rgba
+
+
+def test_render_array_on_error():
+    np = pytest.importorskip("numpy")
+    with pytest.raises(ValueError, match="#1"):
+        mermaidx.render_array([SOURCES[0], "not a diagram((("], 32, 32, workers=1)
+    array = mermaidx.render_array([SOURCES[0], "not a diagram((("], 32, 32, workers=1, on_error="blank")
+    assert array[0].any() and not array[1].any()
+    assert mermaidx.render_array([], 32, 32).shape == (0, 32, 32, 4)
+    assert isinstance(array, np.ndarray)
+
+
+def test_render_array_never_writes_a_wrong_sized_image(monkeypatch):
+    pytest.importorskip("numpy")
+    import mermaidx.tiles
+
+    # Not letterboxed: each renders at its own size, which isn't the slot's.
+    monkeypatch.setattr(mermaidx.tiles, "letterbox", lambda svg, width, height: svg)
+    array = mermaidx.render_array(SOURCES[:2], 32, 32, workers=1, on_error="blank")
+    assert not array.any()
+    with pytest.raises(ValueError, match="not the 32x32 slot"):
+        mermaidx.render_array(SOURCES[:2], 32, 32, workers=1)
+
+
+def test_large_results_come_back_through_shared_memory():
+    import gc
+    import re
+
+    from mermaidx import shared
+
+    big = "pie\n" + "\n".join(f'    "slice {i}" : {i + 1}' for i in range(340))  # cheap, but a big SVG
+    expected = mermaidx.render(big).svg()
+    assert len(expected) > shared.THRESHOLD
+
+    diagrams = mermaidx.render_many([big, SOURCES[0]], workers=2)
+    payload = diagrams[0]._cache[("svg", ())]
+    assert isinstance(payload, shared.SharedPayload)  # only a handle was pickled
+    assert isinstance(diagrams[1]._cache[("svg", ())], str)  # small: inline
+    path = payload.segment.path
+    assert re.sub(r"gd\d+", "gd", diagrams[0].svg()) == re.sub(r"gd\d+", "gd", expected)
+    assert isinstance(diagrams[0]._cache[("svg", ())], str)
+
+    outputs = mermaidx.render_many([big], workers=2, formats="svg")
+    assert isinstance(outputs[0], mermaidx.pool.Outputs)
+    assert outputs[0]["svg"] == diagrams[0].svg()
+
+    del diagrams, payload, outputs
+    gc.collect()
+    assert not os.path.exists(path)  # segment removed once nothing refers to it
+
+
+def test_shared_results_have_one_owner():
+    import gc
+    import pickle
+
+    from mermaidx import shared
+
+    big = "pie\n" + "\n".join(f'    "slice {i}" : {i + 1}' for i in range(340))
+    diagrams = mermaidx.render_many([big, SOURCES[0]], workers=2)
+    payload = diagrams[0]._cache[("svg", ())]
+    path = payload.segment.path
+
+    copy = pickle.loads(pickle.dumps(diagrams[0]))  # e.g. sent on to another process
+    assert isinstance(copy._cache[("svg", ())], str)  # the data, not a second handle
+    del diagrams, payload
+    gc.collect()
+    assert not os.path.exists(path)
+    assert copy.svg().startswith("<svg")
+
+    # In this process nothing is spilled: there's no pipe to spare.
+    (d,) = mermaidx.render_many([big], workers=1)
+    assert isinstance(d._cache[("svg", ())], str)
+    assert not isinstance(mermaidx.rasterize_many([d.svg()], "png", workers=1)[0], shared.SharedPayload)
@@ -0,0 +1,126 @@
+"""Tests for mermaidx.stats (per-phase render timing and hooks)."""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+import mermaidx
+from mermaidx import stats as mstats
+
+FLOWCHART = "flowchart LR\n    A[Start] --> B{OK?}\n    B -->|Yes| C[Done]"
+
+
+def test_svg_records_engine_phases_and_counters():
+    d = mermaidx.render(FLOWCHART)
+    svg = d.svg()
+    phases, counters = d.stats.phases, d.stats.counters
+    assert phases["svg"] >= phases["js_render"] > 0
+    assert counters["measure_calls"] > 0
+    assert counters["job_pump_iterations"] > 0
+    assert counters["svg_bytes"] == len(svg)
+    assert counters["cache_misses"] == 1
+
+
+def test_raster_phases_and_cache_hits():
+    d = mermaidx.render(FLOWCHART)
+    d.png()
+    d.png()
+    d.pdf()
+    assert d.stats.phases["resvg"] > 0
+    assert d.stats.phases["png_decode"] > 0
+    assert d.stats.phases["pdf_build"] > 0
+    assert d.stats.counters["cache_hits"] >= 1
+
+
+def test_pdf_reuses_png_rasterization():
+    seen = []
+
+    def hook(stats, name, value):
+        seen.append(name)
+
+    mstats.add_hook(hook)
+    try:
+        d = mermaidx.render(FLOWCHART)
+        d.png(background="#ffffff")
+        d.pdf(background="#ffffff")
+    finally:
+        mstats.remove_hook(hook)
+    assert seen.count("resvg") == 1
+
+
+def test_second_render_with_same_config_skips_initialize():
+    mermaidx.render(FLOWCHART).svg()
+    d = mermaidx.render(FLOWCHART)
+    d.svg()
+    assert d.stats.counters.get("initialize_skipped") == 1
+    assert "js_initialize" not in d.stats.phases
+
+
+def test_hooks_receive_every_recorded_value():
+    seen = []
+
+    def hook(stats, name, value):
+        seen.append((stats, name, value))
+
+    mstats.add_hook(hook)
+    try:
+        d = mermaidx.render(FLOWCHART)
+        d.svg()
+    finally:
+        mstats.remove_hook(hook)
+    names = {name for _, name, _ in seen}
+    assert {"svg", "js_render", "measure_calls", "svg_bytes"} <= names
+    assert all(stats is d.stats for stats, _, _ in seen)
+
+    d2 = mermaidx.render(FLOWCHART)
+    d2.svg()
+    assert all(stats is not d2.stats for stats, _, _ in seen)  # removed
+
+
+def test_render_many_diagrams_carry_their_stats():
+    diagrams = mermaidx.render_many([FLOWCHART, "graph TD\nA-->B"], workers=1)
+    for d in diagrams:
+        assert d.stats.counters["svg_bytes"] == len(d.svg())
+        assert d.stats.phases["js_render"] > 0
+
+
+def test_v8_stats_come_back_from_the_child():
+    pytest.importorskip("py_mini_racer")
+    d = mermaidx.render(FLOWCHART, backend="v8")
+    d.svg()
+    assert d.stats.phases["js_render"] > 0
+    assert d.stats.counters["measure_calls"] > 0
+
+
+def test_profile_reports_shim_hot_spots_sorted():
+    d = mermaidx.render(FLOWCHART, profile=True)
+    svg = d.svg()
+    rows = d.stats.profile
+    assert {"__computeBBox", "__resolveCssProp", "__serialize", "__measureText"} <= {r["function"] for r in rows}
+    totals = [r["total_ms"] for r in rows]
+    assert totals == sorted(totals, reverse=True)
+    assert all(r["calls"] > 0 for r in rows)
+    assert "__computeBBox" in mstats.format_profile(rows)
+
+    plain = mermaidx.render(FLOWCHART)
+    # profiling doesn't change the output (beyond the per-render id)...
+    assert re.sub(r"gd\d+", "gd", plain.svg()) == re.sub(r"gd\d+", "gd", svg)
+    assert plain.stats.profile is None  # ...and the wrappers are gone afterwards
+
+
+def test_profile_report_rows():
+    rows = mstats.profile_report({
+        "a": {"calls": 4, "ms": 2.0}, "b": {"calls": 1, "ms": 5.0}, "unused": {"calls": 0, "ms": 0},
+    })
+    assert [r["function"] for r in rows] == ["b", "a"]
+    assert rows[1]["mean_us"] == 500.0
+
+
+def test_v8_profile_comes_back_from_the_child():
+    pytest.importorskip("py_mini_racer")
+    d = mermaidx.render(FLOWCHART, backend="v8", profile=True)
+    d.svg()
+    assert d.stats.profile[0]["calls"] > 0
+    assert "__computeBBox" in {r["function"] for r in d.stats.profile}
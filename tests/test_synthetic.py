@@ -0,0 +1,57 @@
+"""Tests for mermaidx.synthetic (the large-diagram generator)."""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from mermaidx import render, synthetic
+
+
+@pytest.mark.parametrize("kind", synthetic.KINDS)
+@pytest.mark.parametrize("depth", [0, 2])
+@pytest.mark.parametrize("size", [1, 2, 12])
+def test_every_kind_renders(kind, depth, size):
+    svg = render(synthetic.generate(kind, size, depth=depth)).svg()
+    assert svg.startswith("<svg")
+
+
+def test_deterministic_per_seed():
+    a = synthetic.generate("class", 30, seed=1)
+    assert a == synthetic.generate("class", 30, seed=1)
+    assert a != synthetic.generate("class", 30, seed=2)
+
+
+def test_node_count_and_edge_density():
+    src = synthetic.flowchart(50, edge_density=2.0)
+    assert len(set(re.findall(r"^\s+n(\d+)\[", src, re.M))) == 50
+    assert src.count("-->") == 98
+
+    src = synthetic.sequence(40, edge_density=1.0)
+    assert src.count("participant") == 40
+    assert src.count("->>") == 40
+
+
+def test_label_length():
+    src = synthetic.flowchart(5, label_length=0)
+    assert "[" not in src
+    labels = re.findall(r"\[([^\]]*)\]", synthetic.flowchart(20, label_length=30))
+    assert labels and all(len(label) <= 30 for label in labels)
+    assert max(len(label) for label in labels) > 20
+
+
+def test_nesting_depth():
+    assert synthetic.flowchart(20, depth=3).count("subgraph") == 3
+    assert synthetic.sequence(10, depth=2).count("loop") == 2
+    assert synthetic.state(20, depth=2).count("state c") == 2
+    assert synthetic.class_(20, depth=3).count("namespace") == 3
+    src = synthetic.mindmap(30, depth=4)
+    assert max(len(line) - len(line.lstrip()) for line in src.splitlines()) == 2 * (4 + 1)
+
+
+def test_unknown_kind_and_bad_size():
+    with pytest.raises(ValueError, match="Unknown diagram kind"):
+        synthetic.generate("gantt", 10)
+    with pytest.raises(ValueError, match="nodes"):
+        synthetic.generate("flowchart", 0)
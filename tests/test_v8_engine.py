@@ -12,14 +12,16 @@ exercise that path quickly rather than waiting out the real 8s default.
 from __future__ import annotations
 
 import os
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import psutil
 import pytest
 
 pytest.importorskip("py_mini_racer")
 
-from mermaidx.engines.v8_engine import Engine, MermaidRenderError  # noqa: E402
+from mermaidx.engines.v8_engine import Engine, EnginePool, MermaidRenderError
 
 MINDMAP = "mindmap\n  root((mindmap))\n    Origins\n      Long history\n"
 FLOWCHART = "flowchart TD\nA-->B"
@@ -33,6 +35,11 @@ def engine():
     eng.close()
 
 
+def _strip_ids(svg: str) -> str:
+    """``svg`` without its render ids (gd<N>), which differ per render."""
+    return re.sub(r"gd\d+", "gd", svg)
+
+
 def _total_rss_mb(pid: int) -> float:
     """RSS of the given process plus all of its children (the V8 child
     process isn't the test process itself)."""
@@ -103,3 +110,168 @@ def test_normal_render_matches_quickjs_output():
         v8.close()
 
     assert actual == expected
+
+
+def _wait_for_spare(eng) -> None:
+    if eng._spare_thread is not None:
+        eng._spare_thread.join(timeout=30)
+    assert eng._spare is not None
+
+
+def test_timed_out_child_is_replaced_by_warm_spare(engine):
+    """The killed child's replacement is the already-booted spare, not a
+    child booted synchronously inside the failing render."""
+    _wait_for_spare(engine)
+    spare_pid = engine._spare[0].pid
+
+    with pytest.raises(MermaidRenderError, match="killed"):
+        engine.render_svg(MINDMAP, "default", None, None)
+
+    assert engine._process.pid == spare_pid
+    start = time.perf_counter()
+    svg = engine.render_svg(FLOWCHART, "default", None, None)
+    assert svg.startswith("<svg")
+    # well under a mermaid.js boot -- the spare was already warm
+    assert time.perf_counter() - start < 2.0
+
+    # and a new spare is booted in the background for the next failure
+    _wait_for_spare(engine)
+    assert engine._spare[0].pid not in (spare_pid, engine._process.pid)
+
+
+def test_close_stops_spare_too():
+    eng = Engine(render_timeout_ms=3000)
+    eng.start()
+    _wait_for_spare(eng)
+    active, spare = eng._process, eng._spare[0]
+    eng.close()
+    assert not active.is_alive()
+    assert not spare.is_alive()
+    assert not eng.started
+
+
+def test_engine_without_spare_still_recovers():
+    eng = Engine(render_timeout_ms=3000, warm_spare=False)
+    eng.start()
+    try:
+        assert eng._spare_thread is None
+        with pytest.raises(MermaidRenderError, match="killed"):
+            eng.render_svg(MINDMAP, "default", None, None)
+        eng._spare_thread.join()  # the replacement started booting right after the kill
+        replacement = eng._spare[0]
+        assert eng.render_svg(FLOWCHART, "default", None, None).startswith("<svg")
+        assert eng._process is replacement and eng._spare is None  # no standby kept after that
+    finally:
+        eng.close()
+
+
+def test_pool_renders_concurrently_in_separate_children():
+    pool = EnginePool(2, render_timeout_ms=3000)
+    pool.start()
+    try:
+        pids = {e._process.pid for e in pool._engines}
+        assert len(pids) == 2
+        sources = [f"flowchart LR\nA{i}-->B{i}" for i in range(6)]
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            svgs = list(ex.map(lambda s: pool.render_svg(s, "default", None, None), sources))
+        for i, svg in enumerate(svgs):
+            assert svg.startswith("<svg") and f"A{i}" in svg
+    finally:
+        pool.close()
+    assert not pool.started
+
+
+def test_pool_timeout_only_kills_its_own_child():
+    pool = EnginePool(2, render_timeout_ms=3000)
+    pool.start()
+    try:
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            stuck = ex.submit(pool.render_svg, MINDMAP, "default", None, None)
+            time.sleep(0.2)  # let the mindmap claim its child first
+            ok = ex.submit(pool.render_svg, FLOWCHART, "default", None, None)
+            assert ok.result().startswith("<svg")
+            with pytest.raises(MermaidRenderError, match="killed"):
+                stuck.result()
+        assert pool.render_svg(FLOWCHART, "default", None, None).startswith("<svg")
+    finally:
+        pool.close()
+
+
+def test_pool_close_wakes_threads_waiting_for_a_child():
+    pool = EnginePool(1, render_timeout_ms=3000)
+    pool.start()
+    held = pool._acquire()  # the only child is busy
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        waiting = [ex.submit(pool.render_svg, FLOWCHART, "default", None, None) for _ in range(2)]
+        time.sleep(0.2)
+        pool.close()
+        for future in waiting:
+            with pytest.raises(RuntimeError, match="not started"):
+                future.result(timeout=5)
+    pool._idle.put(held)
+    with pytest.raises(RuntimeError, match="not started"):
+        pool.render_svg(FLOWCHART, "default", None, None)
+    pool.start()  # reusable: the sentinel and the late hand-back are cleared
+    try:
+        assert pool._idle.qsize() == 1
+        assert pool.render_svg(FLOWCHART, "default", None, None).startswith("<svg")
+    finally:
+        pool.close()
+
+
+def test_configure_engine_v8_workers_uses_a_pool():
+    import mermaidx
+    from mermaidx import diagram
+
+    mermaidx.configure_engine("v8", workers=2)
+    try:
+        d = mermaidx.render(FLOWCHART, backend="v8")
+        assert d.svg().startswith("<svg")
+        assert isinstance(diagram._engines["v8"], EnginePool)
+    finally:
+        mermaidx.configure_engine("v8")
+    assert "v8" not in diagram._engines
+
+
+def test_render_svg_many_matches_individual_renders(engine):
+    sources = [f"flowchart LR\nA{i}-->B{i}" for i in range(4)]
+    batch = engine.render_svg_many([(s, "default", None, None) for s in sources])
+    single = [engine.render_svg(s, "default", None, None) for s in sources]
+    # same diagrams, only the render ids differ
+    assert [_strip_ids(s) for s in batch] == [_strip_ids(s) for s in single]
+
+
+def test_render_svg_many_returns_errors_in_place(engine):
+    results = engine.render_svg_many([
+        (FLOWCHART, "default", None, None),
+        ("this is not mermaid", "default", None, None),
+        (MINDMAP, "default", None, None),  # times out, kills the child
+        (FLOWCHART, "default", None, None),  # re-sent to the replacement
+    ])
+    assert results[0].startswith("<svg")
+    assert isinstance(results[1], MermaidRenderError)
+    assert isinstance(results[2], MermaidRenderError) and "killed" in str(results[2])
+    assert results[3].startswith("<svg")
+
+
+def test_recycle_swaps_in_a_fresh_child_without_blocking():
+    from mermaidx import RecyclePolicy
+
+    eng = Engine(render_timeout_ms=3000, warm_spare=False, recycle=RecyclePolicy(max_renders=2))
+    eng.start()
+    try:
+        first = eng._process
+        eng.render_svg(FLOWCHART, "default", None, None)
+        stats = eng.heap_stats()
+        assert stats["renders"] == 1 and stats["heap_used_bytes"] > 0
+        eng.render_svg(FLOWCHART, "default", None, None)  # policy now due
+        assert eng._recycle_pending
+        eng._spare_thread.join(timeout=30)  # replacement boots in the background
+
+        assert eng.render_svg(FLOWCHART, "default", None, None).startswith("<svg")
+        assert eng._process is not first
+        assert eng.heap_stats()["recycles"] == 1
+        first.join(timeout=5)
+        assert not first.is_alive()
+    finally:
+        eng.close()
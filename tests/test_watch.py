@@ -0,0 +1,77 @@
+"""Tests for mermaidx.watch (`mermaidx watch`)."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mermaidx.watch import Watcher
+
+SIMPLE = "graph LR\n    A --> B\n"
+OTHER = "graph TD\n    X --> Y\n"
+
+
+def _touch_later(path, text=None):
+    """Rewrite ``path`` with a strictly newer mtime (coarse-mtime filesystems)."""
+    if text is not None:
+        path.write_text(text)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_watcher_renders_only_what_changed(tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.mmd").write_text(SIMPLE)
+    (src / "b.mmd").write_text(OTHER)
+    (src / "notes.txt").write_text("not a diagram")
+    events = []
+    w = Watcher([src], str(tmp_path / "out" / "{stem}.svg"), debounce=0.01,
+                on_event=lambda kind, payload: events.append((payload.input.name, payload.status)))
+
+    assert [f.name for f in w.step()] == ["a.mmd", "b.mmd"]
+    assert sorted(events) == [("a.mmd", "rendered"), ("b.mmd", "rendered")]
+    assert w.step() == []  # nothing changed, nothing to do
+
+    events.clear()
+    _touch_later(src / "a.mmd")  # saved without changes: same content hash
+    _touch_later(src / "b.mmd", "graph TD\n    X --> Z\n")
+    w.step()
+    assert sorted(events) == [("a.mmd", "skipped"), ("b.mmd", "rendered")]
+    assert "Z" in (tmp_path / "out" / "b.svg").read_text()
+
+    events.clear()
+    (src / "c.mmd").write_text(SIMPLE)  # new files are picked up too
+    w.step()
+    assert events == [("c.mmd", "rendered")]
+
+
+def test_watcher_markdown(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    doc = docs / "page.md"
+    doc.write_text(f"```mermaid\n{SIMPLE}```\n")
+    reports = []
+    w = Watcher([docs], md_out=tmp_path / "build", debounce=0.01,
+                on_event=lambda kind, payload: reports.append(payload[1]))
+    w.step()
+    assert (reports[-1].diagrams, reports[-1].rendered) == (1, 1)
+
+    _touch_later(doc, f"```mermaid\n{SIMPLE}```\n\n```mermaid\n{OTHER}```\n")
+    w.step()
+    assert (reports[-1].diagrams, reports[-1].rendered) == (2, 1)
+    assert (tmp_path / "build" / "page.md").read_text().count("![mermaid diagram](diagrams/") == 2
+
+
+def test_watcher_rejects_bad_template(tmp_path):
+    with pytest.raises(ValueError):
+        Watcher([tmp_path], str(tmp_path / "{stem}.gif"))
+
+
+def test_cli_watch_help():
+    r = subprocess.run([sys.executable, "-m", "mermaidx", "watch", "--help"], capture_output=True, text=True)
+    assert r.returncode == 0
+    assert "--md-out" in r.stdout